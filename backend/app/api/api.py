@@ -1,11 +1,12 @@
 # backend/app/api/api.py
 from fastapi import APIRouter
-from app.api.v1 import auth, products, cart, orders, admin
+from app.api.v1 import auth, products, reviews, cart, orders, admin
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
+api_router.include_router(reviews.router, prefix="/products", tags=["reviews"])
 api_router.include_router(cart.router, prefix="/cart", tags=["cart"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
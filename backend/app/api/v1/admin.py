@@ -1,13 +1,29 @@
 # backend/app/api/v1/admin.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import codecs
+import csv
+import io
+import json
+from dataclasses import asdict
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.schemas.schemas import Product, ProductCreate, ProductUpdate, Order
+from app.schemas.schemas import (
+    Category, CategoryCreate, CategoryUpdate, Product, ProductCreate, ProductUpdate, OrderSummaryPage, User, UserFlagsUpdate,
+    StockAdjustmentBatch, StockAdjustmentResult, Coupon, CouponCreate, CouponUpdate,
+)
+from app.core.config import settings
 from app.core.security import get_current_staff_user
-from app.db.session import get_db
+from app.core.instrumentation import query_budget
+from app.core.pagination import InvalidCursor
+from app.core.search import search_backend
+from app.core.serializers import json_bytes_response, order_summary_page_json
+from app.db.session import get_db, pool_status
+from app.utils.catalog_import import import_catalog, iter_rows
 
 router = APIRouter()
 
@@ -18,6 +34,31 @@ async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_
     """
     return await crud.create_product(db=db, product=product)
 
+@router.post("/products/import", dependencies=[Depends(get_current_staff_user)])
+async def import_products(
+    file: UploadFile,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    chunk_size: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Bulk upsert products, variants and images from a CSV or NDJSON upload (Admin only).
+
+    Streams NDJSON progress reports, one per committed chunk, each listing the
+    rows of that chunk that failed validation. The last report has `done: true`.
+    """
+    format = format or ("csv" if (file.filename or "").endswith(".csv") else "ndjson")
+    lines = codecs.getreader("utf-8")(file.file)
+
+    async def report():
+        async for progress in import_catalog(db, iter_rows(lines, format), chunk_size):
+            if progress.done:
+                # The in-memory search backend cannot see bulk writes
+                await search_backend.rebuild(db)
+            yield json.dumps(asdict(progress)) + "\n"
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
 @router.put("/products/{product_id}", response_model=Product, dependencies=[Depends(get_current_staff_user)])
 async def update_product(product_id: UUID, product: ProductUpdate, db: AsyncSession = Depends(get_db)):
     """
@@ -28,9 +69,173 @@ async def update_product(product_id: UUID, product: ProductUpdate, db: AsyncSess
         raise HTTPException(status_code=404, detail="Product not found")
     return await crud.update_product(db, product_id=product_id, product_in=product)
 
-@router.get("/orders", response_model=List[Order], dependencies=[Depends(get_current_staff_user)])
-async def list_all_orders(db: AsyncSession = Depends(get_db)):
+@router.post("/categories", response_model=Category, dependencies=[Depends(get_current_staff_user)])
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create a category, optionally below a parent (Admin only).
+    """
+    try:
+        return await crud.create_category(db=db, category=category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/categories/{category_id}", response_model=Category, dependencies=[Depends(get_current_staff_user)])
+async def update_category(category_id: UUID, category: CategoryUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Rename a category or move it, with its subcategories, under another parent (Admin only).
+    """
+    try:
+        db_category = await crud.update_category(db, category_id=category_id, category_in=category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not db_category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return db_category
+
+@router.post("/coupons", response_model=Coupon, dependencies=[Depends(get_current_staff_user)])
+async def create_coupon(coupon: CouponCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create a coupon code (Admin only). Codes are case-insensitive and stored upper-case.
+    """
+    try:
+        return await crud.create_coupon(db=db, coupon=coupon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/coupons/{coupon_id}", response_model=Coupon, dependencies=[Depends(get_current_staff_user)])
+async def update_coupon(coupon_id: UUID, coupon: CouponUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Change a coupon's usage limit or expiry, or deactivate it (Admin only).
+    """
+    try:
+        db_coupon = await crud.update_coupon(db, coupon_id=coupon_id, coupon_in=coupon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not db_coupon:
+        raise HTTPException(status_code=404, detail="Coupon not found")
+    return db_coupon
+
+@router.get("/orders", response_model=OrderSummaryPage, dependencies=[Depends(get_current_staff_user), query_budget(2)])
+async def list_all_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List order summaries for all customers, newest first (Admin only).
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
+    try:
+        summaries, next_cursor = await crud.get_order_summaries(
+            db, cursor=cursor, limit=limit, status=status,
+            created_from=created_from, created_to=created_to,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if settings.FAST_JSON_RESPONSES:
+        return json_bytes_response(order_summary_page_json(summaries, next_cursor))
+    return {"items": summaries, "next_cursor": next_cursor}
+
+_EXPORT_COLUMNS = [
+    "order_id", "created_at", "status", "email", "total_amount", "currency",
+    "sku", "quantity", "unit_price", "total_price",
+]
+# Orders per chunk written to the response
+_EXPORT_BATCH = 500
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _csv_lines(order: dict):
+    head = [order["id"], order["created_at"], order["status"], order["email"], order["total_amount"], order["currency"]]
+    for item in order["items"] or [{}]:
+        line = head + [item.get("sku"), item.get("quantity"), item.get("unit_price"), item.get("total_price")]
+        yield [None if value is None else _export_value(value) for value in line]
+
+@router.get("/orders/export", dependencies=[Depends(get_current_staff_user)])
+async def export_orders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream every matching order, oldest first, as NDJSON (one order with its
+    items per line) or CSV (one line per order item) (Admin only).
+    """
+    orders = crud.stream_orders_for_export(db, status=status, created_from=created_from, created_to=created_to)
+
+    async def ndjson():
+        batch = []
+        async for order in orders:
+            batch.append(json.dumps(order, default=_export_value))
+            if len(batch) >= _EXPORT_BATCH:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(_EXPORT_COLUMNS)
+        count = 0
+        async for order in orders:
+            writer.writerows(_csv_lines(order))
+            count += 1
+            if count % _EXPORT_BATCH == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(), media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'},
+        )
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.post("/inventory/adjustments", response_model=StockAdjustmentResult, dependencies=[Depends(get_current_staff_user)])
+async def adjust_stock(batch: StockAdjustmentBatch, db: AsyncSession = Depends(get_db)):
+    """
+    Apply stock deltas to up to 10000 variants in one transaction (Admin only).
+
+    Every change is recorded in the inventory ledger with the given `reason`.
+    Nothing is applied if a variant is unknown or would go below zero.
+    """
+    try:
+        levels = await crud.adjust_stock(db, adjustments=batch.items, reason=batch.reason)
+    except crud.UnknownVariants as e:
+        raise HTTPException(
+            status_code=404, detail={"message": str(e), "variant_ids": [str(v) for v in e.variant_ids]}
+        )
+    except crud.InsufficientStock as e:
+        raise HTTPException(
+            status_code=409, detail={"message": str(e), "variant_ids": [str(v) for v in e.variant_ids]}
+        )
+    return {"items": [{"variant_id": variant_id, "stock": stock} for variant_id, stock in levels]}
+
+@router.patch("/users/{user_id}", response_model=User, dependencies=[Depends(get_current_staff_user)])
+async def update_user_flags(user_id: UUID, flags: UserFlagsUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Activate/deactivate a user or change their staff status (Admin only).
+    """
+    db_user = await crud.update_user_flags(db, user_id=user_id, flags=flags)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+@router.get("/db/pool", dependencies=[Depends(get_current_staff_user)])
+async def read_db_pool_status():
     """
-    List all orders in the system (Admin only).
+    Live connection pool metrics (Admin only).
     """
-    return await crud.get_all_orders(db)
+    return pool_status()
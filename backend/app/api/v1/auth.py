@@ -1,14 +1,14 @@
 # backend/app/api/v1/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.core import security
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.models import User
 from app.schemas.schemas import User as UserSchema, UserCreate, Token
 
 router = APIRouter()
@@ -25,9 +25,16 @@ async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_db))
     return user
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(db: AsyncSession = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    cart_session: Optional[str] = Cookie(None, alias=settings.GUEST_CART_COOKIE),
+):
     """
     Authenticate user and return a JWT access token.
+
+    A guest cart from the same browser is merged into the user's cart.
     """
     user = await crud.authenticate_user(db, email=form_data.username, password=form_data.password)
     if not user:
@@ -38,12 +45,15 @@ async def login_for_access_token(db: AsyncSession = Depends(get_db), form_data:
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": str(user.id)}, expires_delta=access_token_expires
     )
+    if cart_session:
+        await crud.merge_guest_cart(db, user_id=user.id, session_id=cart_session)
+        response.delete_cookie(settings.GUEST_CART_COOKIE)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(security.get_current_active_user)):
+async def read_users_me(current_user: UserSchema = Depends(security.get_current_active_user)):
     """
     Get the current logged-in user.
     """
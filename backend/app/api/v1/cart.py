@@ -1,47 +1,182 @@
 # backend/app/api/v1/cart.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.models.models import User
-from app.schemas.schemas import Cart, CartItemCreate
-from app.core.security import get_current_active_user
+from app.schemas.schemas import (
+    User, Cart, CartItemCreate, CartLine, CartBatchUpdate, CartBatchResult, CouponApply, AppliedCoupon,
+)
+from app.core.config import settings
+from app.core.guest_carts import MAX_SESSION_ID_LENGTH, GuestCartConflict, GuestCartFull, new_session_id
+from app.core.security import get_optional_active_user
 from app.db.session import get_db
 
 router = APIRouter()
 
+# Visitors without a token get a guest cart keyed by this cookie
+GuestSession = Cookie(None, alias=settings.GUEST_CART_COOKIE)
+
+def _guest_session(response: Response, session_id: Optional[str]) -> str:
+    # Starts a session on the first guest mutation; every mutation renews
+    # the cookie along with the cart's TTL.
+    if not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+        session_id = new_session_id()
+    response.set_cookie(
+        settings.GUEST_CART_COOKIE, session_id, max_age=int(settings.GUEST_CART_TTL_SECONDS),
+        httponly=True, samesite="lax",
+    )
+    return session_id
+
 @router.get("/", response_model=Cart)
-async def get_cart(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def get_cart(
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
+    """
+    Get the shopping cart of the current user, or of the guest session,
+    with its subtotal, coupon discount and total.
+
+    Viewing never creates a cart; an empty cart has no `id` yet.
     """
-    Get the current user's shopping cart.
+    if current_user is not None:
+        cart = await crud.get_cart_by_user(db, user_id=current_user.id)
+        if cart is None:
+            return {"id": None, "items": []}
+        lines = [(item.price_at_add, item.quantity) for item in cart.items]
+        coupon_code = (cart.meta_data or {}).get("coupon_code")
+        return {"id": cart.id, "items": cart.items, **crud.cart_totals(lines, coupon_code)}
+    cart = await crud.get_guest_cart(db, cart_session)
+    if cart is None:
+        return {"id": None, "items": []}
+    lines = [(item["price_at_add"], item["quantity"]) for item in cart["items"]]
+    return {**cart, **crud.cart_totals(lines, cart["coupon_code"])}
+
+@router.post("/items", response_model=CartLine)
+async def add_item_to_cart(
+    item: CartItemCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
     """
-    cart = await crud.get_cart_by_user(db, user_id=current_user.id)
-    return cart
+    Add an item to the shopping cart, or increase its quantity if already present.
+    """
+    try:
+        if current_user is not None:
+            return await crud.add_item_to_cart(db, user_id=current_user.id, item=item)
+        return await crud.add_item_to_guest_cart(db, _guest_session(response, cart_session), item=item)
+    except GuestCartFull as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GuestCartConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-@router.post("/items", response_model=Cart)
-async def add_item_to_cart(item: CartItemCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+@router.post("/items/batch", response_model=CartBatchResult)
+async def update_cart_items(
+    changes: CartBatchUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
     """
-    Add an item to the shopping cart.
+    Set the quantity of several variants at once, in one transaction.
+    A quantity of 0 removes the variant; unknown variants are reported in `missing`.
     """
-    cart = await crud.add_item_to_cart(db, user_id=current_user.id, item=item)
-    return cart
+    if current_user is not None:
+        lines, removed, missing = await crud.apply_cart_changes(db, user_id=current_user.id, changes=changes.items)
+    else:
+        try:
+            lines, removed, missing = await crud.apply_guest_cart_changes(
+                db, _guest_session(response, cart_session), changes=changes.items
+            )
+        except GuestCartFull as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except GuestCartConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    return {"items": lines, "removed": removed, "missing": missing}
 
-@router.put("/items/{item_id}", response_model=Cart)
-async def update_cart_item(item_id: UUID, item: CartItemCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+@router.put("/items/{item_id}", response_model=CartLine)
+async def update_cart_item(
+    item_id: UUID,
+    item: CartItemCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
     """
     Update an item's quantity in the shopping cart.
     """
-    cart = await crud.update_cart_item(db, item_id=item_id, quantity=item.quantity, user_id=current_user.id)
-    if cart is None:
+    if current_user is not None:
+        line = await crud.update_cart_item(db, item_id=item_id, quantity=item.quantity, user_id=current_user.id)
+    else:
+        try:
+            line = await crud.update_guest_cart_item(cart_session, item_id=item_id, quantity=item.quantity)
+        except GuestCartConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    if line is None:
         raise HTTPException(status_code=404, detail="Cart item not found")
-    return cart
+    return line
 
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def remove_cart_item(item_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def remove_cart_item(
+    item_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
     """
     Remove an item from the shopping cart.
     """
-    await crud.remove_cart_item(db, item_id=item_id, user_id=current_user.id)
+    if current_user is not None:
+        await crud.remove_cart_item(db, item_id=item_id, user_id=current_user.id)
+    else:
+        try:
+            await crud.remove_guest_cart_item(cart_session, item_id=item_id)
+        except GuestCartConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    return
+
+@router.put("/coupon", response_model=AppliedCoupon)
+async def apply_coupon(
+    coupon: CouponApply,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
+    """
+    Apply a coupon code to the shopping cart, replacing any previous one.
+    The code is checked again, and its use counted, at checkout.
+    """
+    try:
+        if current_user is not None:
+            return await crud.apply_cart_coupon(db, user_id=current_user.id, code=coupon.code)
+        return await crud.apply_guest_cart_coupon(_guest_session(response, cart_session), code=coupon.code)
+    except crud.CouponUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GuestCartConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.delete("/coupon", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_coupon(
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_active_user),
+    cart_session: Optional[str] = GuestSession,
+):
+    """
+    Remove the coupon code from the shopping cart.
+    """
+    if current_user is not None:
+        await crud.remove_cart_coupon(db, user_id=current_user.id)
+    else:
+        try:
+            await crud.remove_guest_cart_coupon(cart_session)
+        except GuestCartConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
     return
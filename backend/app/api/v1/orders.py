@@ -1,13 +1,17 @@
 # backend/app/api/v1/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.models.models import User
-from app.schemas.schemas import Order
+from app.schemas.schemas import User, Order, OrderSummaryPage
+from app.core.config import settings
+from app.core.instrumentation import query_budget
+from app.core.pagination import InvalidCursor
 from app.core.security import get_current_active_user
+from app.core.serializers import json_bytes_response, order_summary_page_json
+from app.db.routing import get_read_db
 from app.db.session import get_db
 
 router = APIRouter()
@@ -17,21 +21,44 @@ async def checkout(db: AsyncSession = Depends(get_db), current_user: User = Depe
     """
     Create an order from the user's current cart.
     """
-    order = await crud.create_order_from_cart(db, user_id=current_user.id)
+    try:
+        order = await crud.create_order_from_cart(db, user_id=current_user.id)
+    except crud.InsufficientStock as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "variant_ids": [str(v) for v in e.variant_ids]},
+        )
+    except crud.CouponUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not order:
         raise HTTPException(status_code=400, detail="Cart is empty or invalid")
     return order
 
-@router.get("/", response_model=List[Order])
-async def list_orders(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+@router.get("/", response_model=OrderSummaryPage, dependencies=[query_budget(2)])
+async def list_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
     """
-    List all orders for the current user.
+    List the current user's orders, newest first, as summaries.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    Use `GET /orders/{order_id}` for an order's items.
     """
-    orders = await crud.get_orders_by_user(db, user_id=current_user.id)
-    return orders
+    try:
+        summaries, next_cursor = await crud.get_order_summaries(
+            db, user_id=current_user.id, cursor=cursor, limit=limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if settings.FAST_JSON_RESPONSES:
+        return json_bytes_response(order_summary_page_json(summaries, next_cursor))
+    return {"items": summaries, "next_cursor": next_cursor}
 
-@router.get("/{order_id}", response_model=Order)
-async def get_order(order_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+@router.get("/{order_id}", response_model=Order, dependencies=[query_budget(4)])
+async def get_order(order_id: UUID, db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
     """
     Get details for a specific order.
     """
@@ -1,36 +1,183 @@
 # backend/app/api/v1/products.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from decimal import Decimal
+from typing import List, Optional, Union
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.schemas.schemas import Product, Category
-from app.db.session import get_db
+from app.schemas.schemas import (
+    Product, ProductPage, ProductSearchResults, ProductBatchRequest, ProductBatchResult, Category, CategoryNode,
+)
+from app.core.cache import CATEGORIES_KEY, get_or_build, json_response, product_key
+from app.core.catalog_snapshot import catalog_snapshot
+from app.core.config import settings
+from app.core.category_tree import category_tree
+from app.core.filters import InvalidFilter, parse_product_filter
+from app.core.instrumentation import query_budget
+from app.core.pagination import InvalidCursor, decode_cursor
+from app.core.product_loader import ProductLoader, get_product_loader
+from app.core.serializers import json_bytes_response, product_page_json, products_json
+from app.core.search import search_backend
+from app.db.routing import get_read_db
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Product])
-async def read_products(db: AsyncSession = Depends(get_db), skip: int = 0, limit: int = 100):
+_categories_adapter = TypeAdapter(List[Category])
+
+# ProductBatchRequest field -> crud.get_products_by_keys key kind
+_BATCH_KEY_KINDS = {"ids": "id", "slugs": "slug", "variant_ids": "variant_id"}
+
+def _snapshot_page(cursor: Optional[str], limit: int) -> Optional[bytes]:
+    # Default listing pages straight from the in-memory catalog snapshot
+    snapshot = catalog_snapshot.snapshot
+    if snapshot is None:
+        return None
+    return snapshot.page(decode_cursor(cursor) if cursor else None, limit)
+
+@router.get("/", response_model=Union[ProductPage, List[Product]], dependencies=[query_budget(4)])
+async def read_products(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    skip: Optional[int] = Query(None, ge=0),
+    category: Optional[str] = None,
+    sort: str = Query("newest", pattern="^(newest|rating)$"),
+    min_rating: Optional[float] = Query(None, ge=1, le=5),
+    attr: Optional[List[str]] = Query(None, description="Product attribute filter, key:value"),
+    vattr: Optional[List[str]] = Query(None, description="Variant attribute filter, key:value"),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    facets: bool = False,
+):
+    """
+    Retrieve a page of products, newest first.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    Sending `skip` selects the legacy offset mode, which returns a bare list.
+    `category` takes a category slug and includes its subcategories.
+    `sort=rating` orders by average rating; it and `min_rating` only return
+    products that have reviews.
+
+    `attr` and `vattr` filter on product and variant attributes, e.g.
+    `attr=brand:acme&vattr=size:M&vattr=size:L`: repeated keys are OR-ed,
+    different keys AND-ed. Variant filters and the price range must match
+    the same variant. `facets=true` adds value counts for the matching products.
+
+    Unfiltered newest-first pages are served from the catalog snapshot, so
+    stock and ratings may lag by up to CATALOG_SNAPSHOT_INTERVAL_SECONDS.
     """
-    Retrieve a list of products with pagination.
+    try:
+        filters = parse_product_filter(attr, vattr, min_price, max_price)
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if skip is not None:
+        products = await crud.get_products(
+            db, skip=skip, limit=limit, category=category, sort=sort, min_rating=min_rating, filters=filters
+        )
+        if settings.FAST_JSON_RESPONSES:
+            return json_bytes_response(products_json(products))
+        return products
+    plain = category is None and sort == "newest" and min_rating is None and not filters and not facets
+    try:
+        body = _snapshot_page(cursor, limit) if plain else None
+        if body is not None:
+            return json_response(request, body)
+        products, next_cursor = await crud.get_products_page(
+            db, cursor=cursor, limit=limit, category=category, sort=sort, min_rating=min_rating, filters=filters
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    facet_counts = None
+    if facets:
+        rows = await crud.get_product_facets(db, category=category, min_rating=min_rating, filters=filters)
+        facet_counts = [
+            {"scope": scope, "key": key, "value": value, "count": count} for scope, key, value, count in rows
+        ]
+    if settings.FAST_JSON_RESPONSES:
+        return json_bytes_response(product_page_json(products, next_cursor, facet_counts))
+    return {"items": products, "next_cursor": next_cursor, "facets": facet_counts}
+
+@router.get("/search", response_model=ProductSearchResults, dependencies=[query_budget(5)])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    category_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    products = await crud.get_products(db, skip=skip, limit=limit)
-    return products
+    Full-text search over product titles, descriptions and attributes.
 
-@router.get("/{slug}", response_model=Product)
-async def read_product(slug: str, db: AsyncSession = Depends(get_db)):
+    Results are ranked by relevance. `facets` counts matches per category
+    regardless of the `category_id` filter.
     """
-    Retrieve a single product by its slug.
+    result = await search_backend.search(db, q, category_id=category_id, limit=limit, offset=offset)
+    products = await crud.get_products_by_ids(db, [product_id for product_id, _ in result.hits])
+    facets = sorted(result.facets.items(), key=lambda facet: -facet[1])
+    return {
+        "items": products,
+        "total": result.total,
+        "facets": [{"category_id": category, "count": count} for category, count in facets],
+    }
+
+@router.post("/batch", response_model=ProductBatchResult, dependencies=[query_budget(3)])
+async def read_products_batch(lookup: ProductBatchRequest, loader: ProductLoader = Depends(get_product_loader)):
     """
-    db_product = await crud.get_product_by_slug(db, slug=slug)
-    if db_product is None:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return db_product
+    Retrieve many products at once by id, slug or variant id, for pages
+    that would otherwise fetch them one by one.
 
-@router.get("/categories", response_model=List[Category])
-async def read_categories(db: AsyncSession = Depends(get_db)):
+    Each result list follows the order of its request list. Keys without a
+    product are reported in `missing`. Lookups running concurrently in this
+    process share their queries.
+    """
+    groups = {"ids": lookup.ids, "slugs": lookup.slugs, "variant_ids": lookup.variant_ids}
+    if sum(len(values) for values in groups.values()) > settings.PRODUCT_BATCH_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PRODUCT_BATCH_MAX_KEYS} keys per request")
+    keys = [(_BATCH_KEY_KINDS[group], value) for group, values in groups.items() for value in values]
+    products = iter(await loader.load_many(keys))
+    result = {"missing": {}}
+    for group, values in groups.items():
+        found = [(value, next(products)) for value in values]
+        result[group] = [product for _, product in found if product is not None]
+        result["missing"][group] = [value for value, product in found if product is None]
+    return result
+
+@router.get("/categories", response_model=List[Category], dependencies=[query_budget(1)])
+async def read_categories(request: Request, db: AsyncSession = Depends(get_read_db)):
     """
     Retrieve a list of all product categories.
     """
-    categories = await crud.get_categories(db)
-    return categories
\ No newline at end of file
+    async def build():
+        categories = await crud.get_categories(db)
+        return _categories_adapter.dump_json(categories)
+
+    body = await get_or_build(CATEGORIES_KEY, build)
+    return json_response(request, body)
+
+@router.get("/categories/tree", response_model=List[CategoryNode], dependencies=[query_budget(1)])
+async def read_category_tree(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """
+    Retrieve the category hierarchy as nested nodes, sorted by name.
+    """
+    tree = await category_tree.get(db)
+    return json_response(request, tree.body)
+
+@router.get("/{slug}", response_model=Product, dependencies=[query_budget(3)])
+async def read_product(slug: str, request: Request, loader: ProductLoader = Depends(get_product_loader)):
+    """
+    Retrieve a single product by its slug.
+    """
+    async def build():
+        # Concurrent misses for the same slug share one query
+        db_product = await loader.load(("slug", slug))
+        if db_product is None:
+            return None
+        return Product.model_validate(db_product).model_dump_json().encode()
+
+    body = await get_or_build(product_key(slug), build)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return json_response(request, body)
@@ -0,0 +1,65 @@
+# backend/app/api/v1/reviews.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.schemas.schemas import User, Review, ReviewCreate, ReviewPage
+from app.core.instrumentation import query_budget
+from app.core.pagination import InvalidCursor
+from app.core.security import get_current_active_user
+from app.db.routing import get_read_db
+from app.db.session import get_db
+
+router = APIRouter()
+
+async def _get_product_or_404(db: AsyncSession, slug: str):
+    product = await crud.get_product_by_slug(db, slug=slug)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+@router.get("/{slug}/reviews", response_model=ReviewPage, dependencies=[query_budget(4)])
+async def read_reviews(
+    slug: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Retrieve a page of a product's reviews, newest first.
+    """
+    product = await _get_product_or_404(db, slug)
+    try:
+        reviews, next_cursor = await crud.get_reviews_page(db, product_id=product.id, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": reviews, "next_cursor": next_cursor}
+
+@router.post("/{slug}/reviews", response_model=Review, status_code=status.HTTP_201_CREATED)
+async def create_review(
+    slug: str, review: ReviewCreate,
+    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user),
+):
+    """
+    Review a product. Each user can review a product once.
+    """
+    product = await _get_product_or_404(db, slug)
+    db_review = await crud.create_review(db, product=product, user_id=current_user.id, review=review)
+    if db_review is None:
+        raise HTTPException(status_code=409, detail="You have already reviewed this product")
+    return db_review
+
+@router.delete("/{slug}/reviews/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_review(
+    slug: str, review_id: UUID,
+    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_active_user),
+):
+    """
+    Delete a review. Users can delete their own reviews; staff can delete any.
+    """
+    product = await _get_product_or_404(db, slug)
+    user_id = None if current_user.is_staff else current_user.id
+    if not await crud.delete_review(db, product=product, review_id=review_id, user_id=user_id):
+        raise HTTPException(status_code=404, detail="Review not found")
@@ -0,0 +1,141 @@
+# backend/app/core/cache.py
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    Byte-oriented key/value cache used for pre-serialized responses.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache for multi-worker deployments. Any client exposing the
+    redis.asyncio get/set/delete API works, e.g. a fakeredis client in tests.
+    Redis errors are logged and treated as misses so the cache fails open.
+    """
+
+    def __init__(self, client, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "cache:") -> "RedisCacheBackend":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), prefix=prefix)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.get(self.prefix + key)
+        except Exception:
+            logger.warning("Cache get failed for %s", key, exc_info=True)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+        except Exception:
+            logger.warning("Cache set failed for %s", key, exc_info=True)
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except Exception:
+            logger.warning("Cache delete failed for %s", keys, exc_info=True)
+
+
+def _create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend.from_url(settings.REDIS_URL)
+    return MemoryCacheBackend(maxsize=settings.CACHE_MAX_ENTRIES)
+
+
+response_cache: CacheBackend = _create_backend()
+
+
+# Cache keys shared by the product routes and the crud invalidation hooks
+def product_key(slug: str) -> str:
+    return f"product:{slug}"
+
+CATEGORIES_KEY = "categories"
+
+
+async def get_or_build(key: str, build: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+    """
+    Return cached bytes for key, building and storing them on a miss.
+    A build returning None (e.g. not found) is not cached.
+    """
+    body = await response_cache.get(key)
+    if body is None:
+        body = await build()
+        if body is not None:
+            await response_cache.set(key, body, settings.CACHE_TTL_SECONDS)
+    return body
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def json_response(request: Request, body: bytes) -> Response:
+    """
+    Wrap pre-serialized JSON with an ETag, answering 304 when the client
+    already holds the same representation.
+    """
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    if _etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -0,0 +1,233 @@
+# backend/app/core/catalog_snapshot.py
+import asyncio
+import json
+import logging
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.db.routing import read_session
+from app.models import models
+from app.schemas.schemas import Product
+
+logger = logging.getLogger(__name__)
+
+# Products loaded per query while building a snapshot
+BUILD_BATCH_SIZE = 1000
+
+SortKey = Tuple[datetime, UUID]
+
+
+class CatalogRow:
+    """
+    One product in the snapshot: its listing sort key and its JSON encoding
+    as it appears in ProductPage.items.
+    """
+    __slots__ = ("id", "created_at", "body")
+
+    def __init__(self, id: UUID, created_at: datetime, body: bytes):
+        self.id = id
+        self.created_at = created_at
+        self.body = body
+
+    @property
+    def key(self) -> SortKey:
+        return (self.created_at, self.id)
+
+
+class CatalogSnapshot:
+    """
+    The head of the newest-first product listing, held as rows in ascending
+    (created_at, id) order with a parallel key array for bisection. Pages
+    are served by joining the pre-encoded rows, without ORM objects or
+    validation.
+
+    The snapshot holds at most max_products rows. While it covers the whole
+    catalog (complete) every page can be served; otherwise pages that run
+    past its oldest row return None and the caller falls back to the database.
+    """
+
+    def __init__(self, rows: Iterable[CatalogRow], max_products: int, complete: bool):
+        self.max_products = max_products
+        self.complete = complete
+        self._rows: List[CatalogRow] = sorted(rows, key=lambda row: row.key)
+        self._keys: List[SortKey] = [row.key for row in self._rows]
+        self._by_id: Dict[UUID, CatalogRow] = {row.id: row for row in self._rows}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def body_bytes(self) -> int:
+        return sum(len(row.body) for row in self._rows)
+
+    def page(self, after: Optional[SortKey], limit: int) -> Optional[bytes]:
+        """
+        JSON body of the page following the `after` cursor key, or None when
+        the snapshot cannot answer it.
+        """
+        end = bisect_left(self._keys, after) if after is not None else len(self._keys)
+        start = end - limit - 1
+        if start < 0:
+            if not self.complete:
+                return None
+            start = 0
+        rows = self._rows[start:end]
+        rows.reverse()
+        next_cursor = None
+        if len(rows) > limit:
+            del rows[limit:]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return b"".join((
+            b'{"items":[',
+            b",".join([row.body for row in rows]),
+            b'],"next_cursor":',
+            json.dumps(next_cursor).encode(),
+            b',"facets":null}',
+        ))
+
+    def put(self, row: CatalogRow) -> None:
+        self.discard(row.id)
+        # Only rows within the covered range keep the snapshot contiguous
+        if not self.complete and self._keys and row.key < self._keys[0]:
+            return
+        index = bisect_left(self._keys, row.key)
+        self._keys.insert(index, row.key)
+        self._rows.insert(index, row)
+        self._by_id[row.id] = row
+        if len(self._rows) > self.max_products:
+            oldest = self._rows.pop(0)
+            del self._keys[0]
+            del self._by_id[oldest.id]
+            self.complete = False
+
+    def discard(self, product_id: UUID) -> None:
+        row = self._by_id.pop(product_id, None)
+        if row is not None:
+            index = bisect_left(self._keys, row.key)
+            del self._keys[index]
+            del self._rows[index]
+
+
+def _product_query():
+    # Same loading options as the listing, so the encoded rows match it
+    return select(models.Product).options(
+        selectinload(models.Product.variants), selectinload(models.Product.category)
+    )
+
+
+def _encode(products) -> List[CatalogRow]:
+    return [
+        CatalogRow(product.id, product.created_at, Product.model_validate(product).model_dump_json().encode())
+        for product in products
+    ]
+
+
+class CatalogSnapshotCache:
+    """
+    Per-process holder of the current CatalogSnapshot. The app lifespan
+    builds it and rebuilds it every interval seconds, which picks up stock
+    and rating changes and writes made by other workers. Admin writes in
+    this worker call refresh() to re-encode just the products they touched.
+    """
+
+    def __init__(self, max_products: int, interval: float):
+        self.max_products = max_products
+        self.interval = interval
+        self.snapshot: Optional[CatalogSnapshot] = None
+        # Rows refreshed while a rebuild is running, replayed onto its result
+        self._pending: Optional[Dict[UUID, Optional[CatalogRow]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> CatalogSnapshot:
+        self._pending = {}
+        try:
+            rows: List[CatalogRow] = []
+            after = None
+            async with read_session() as db:
+                while len(rows) < self.max_products:
+                    query = _product_query().order_by(models.Product.created_at.desc(), models.Product.id.desc())
+                    if after is not None:
+                        query = query.filter(tuple_(models.Product.created_at, models.Product.id) < after)
+                    result = await db.execute(query.limit(min(BUILD_BATCH_SIZE, self.max_products - len(rows))))
+                    batch = _encode(result.scalars().all())
+                    # Drop the ORM objects; only the encoded rows are kept
+                    db.expunge_all()
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                    after = batch[-1].key
+                complete = len(rows) < self.max_products
+                if not complete:
+                    # Exactly max_products rows were loaded; check for more
+                    result = await db.execute(
+                        select(models.Product.id)
+                        .filter(tuple_(models.Product.created_at, models.Product.id) < after)
+                        .limit(1)
+                    )
+                    complete = result.first() is None
+            snapshot = CatalogSnapshot(rows, self.max_products, complete)
+            for product_id, row in self._pending.items():
+                if row is None:
+                    snapshot.discard(product_id)
+                else:
+                    snapshot.put(row)
+        finally:
+            self._pending = None
+        self.snapshot = snapshot
+        return snapshot
+
+    async def refresh(self, db: AsyncSession, product_ids: Iterable[UUID]) -> None:
+        """
+        Re-encode the given products after a committed write. Products that
+        no longer exist are dropped from the snapshot.
+        """
+        product_ids = list(set(product_ids))
+        if not product_ids or (self.snapshot is None and self._pending is None):
+            return
+        result = await db.execute(_product_query().filter(models.Product.id.in_(product_ids)))
+        rows: Dict[UUID, Optional[CatalogRow]] = dict.fromkeys(product_ids)
+        rows.update((row.id, row) for row in _encode(result.scalars().all()))
+        for product_id, row in rows.items():
+            if self.snapshot is not None:
+                if row is None:
+                    self.snapshot.discard(product_id)
+                else:
+                    self.snapshot.put(row)
+            if self._pending is not None:
+                self._pending[product_id] = row
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.rebuild()
+            except Exception:
+                # Keep serving the previous snapshot; the next rebuild retries
+                logger.exception("Catalog snapshot rebuild failed")
+
+    async def start(self) -> None:
+        await self.rebuild()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_snapshot = CatalogSnapshotCache(
+    max_products=settings.CATALOG_SNAPSHOT_MAX_PRODUCTS, interval=settings.CATALOG_SNAPSHOT_INTERVAL_SECONDS
+)
@@ -0,0 +1,71 @@
+# backend/app/core/category_tree.py
+import asyncio
+import time
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models import models
+from app.schemas.schemas import CategoryNode
+
+_nodes_adapter = TypeAdapter(List[CategoryNode])
+
+
+class CategoryTree:
+    """
+    Immutable snapshot of the category hierarchy, with the JSON body of
+    GET /products/categories/tree serialized once per snapshot.
+    """
+
+    def __init__(self, nodes: List[CategoryNode]):
+        self.by_id: Dict[UUID, CategoryNode] = {node.id: node for node in nodes}
+        self.roots: List[CategoryNode] = []
+        for node in nodes:
+            parent = self.by_id.get(node.parent_id) if node.parent_id else None
+            if parent is None:
+                self.roots.append(node)
+            else:
+                parent.children.append(node)
+        self.body: bytes = _nodes_adapter.dump_json(self.roots)
+
+
+class CategoryTreeCache:
+    """
+    Per-process holder of the current CategoryTree. Writes in this worker
+    call invalidate(); the TTL bounds how long other workers serve a stale
+    tree.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tree: Optional[CategoryTree] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> CategoryTree:
+        if self._tree is not None and self._expires_at > time.monotonic():
+            return self._tree
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self._tree is None or self._expires_at <= time.monotonic():
+                result = await db.execute(
+                    select(models.Category.id, models.Category.name, models.Category.slug, models.Category.parent_id)
+                    .order_by(models.Category.name)
+                )
+                nodes = [
+                    CategoryNode(id=id, name=name, slug=slug, parent_id=parent_id)
+                    for id, name, slug, parent_id in result.all()
+                ]
+                self._tree = CategoryTree(nodes)
+                self._expires_at = time.monotonic() + self.ttl
+        return self._tree
+
+    def invalidate(self) -> None:
+        self._tree = None
+
+
+category_tree = CategoryTreeCache(ttl=settings.CACHE_TTL_SECONDS)
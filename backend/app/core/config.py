@@ -1,5 +1,6 @@
 # backend/app/core/config.py
 from pydantic_settings import BaseSettings
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -10,14 +11,131 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str  # Must be set in .env
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    # Connections opened at startup before traffic is accepted
+    DB_POOL_WARMUP: int = 5
+    # asyncpg prepared statement cache (per connection)
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # Disable prepared statements for PgBouncer transaction pooling
+    DB_PGBOUNCER_MODE: bool = False
+    # Read replicas for catalog and order history GETs; empty uses the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    # "round_robin" or "least_latency" (health check round trip)
+    DB_REPLICA_SELECTION: str = "round_robin"
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0
+    # Replicas further behind than this are skipped until they catch up
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    # After a write, the client's reads go to the primary for this long. Pinned by
+    # cookie and, for authenticated users, by user id in this store ("memory" per
+    # process, or "redis" so the pin holds across workers without the cookie)
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_BACKEND: str = "memory"
+    DB_READ_YOUR_WRITES_MAX_USERS: int = 100000
 
     # JWT
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 # 7 days
 
+    # Principal cache (authenticated user lookups)
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+
+    # Password hashing pool ("thread" or "process")
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    # Hash requests allowed to wait for a worker before shedding with 503
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
     # External services
     REDIS_URL: str = "redis://redis:6379/0"
     ELASTIC_URL: str = "http://elastic:9200"
 
+    # Response cache ("memory" or "redis")
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_MAX_ENTRIES: int = 10000
+
+    # In-memory snapshot of the newest products for the default listing.
+    # Rebuilt every interval; pages past the newest MAX_PRODUCTS use the database.
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_MAX_PRODUCTS: int = 50000
+    CATALOG_SNAPSHOT_INTERVAL_SECONDS: float = 300.0
+
+    # Token-bucket rate limits ("memory" per process, or "redis" shared by all workers).
+    # Rates are requests per second per client (user if authenticated, else IP).
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Only behind a proxy that sets X-Forwarded-For
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    # Login and registration, per IP
+    RATE_LIMIT_AUTH_RATE: float = 0.2
+    RATE_LIMIT_AUTH_BURST: int = 10
+    RATE_LIMIT_CATALOG_RATE: float = 50.0
+    RATE_LIMIT_CATALOG_BURST: int = 100
+    RATE_LIMIT_DEFAULT_RATE: float = 20.0
+    RATE_LIMIT_DEFAULT_BURST: int = 60
+
+    # Anonymous carts, kept until login or expiry: "redis", or "memory" for a
+    # single worker only (each process holds its own carts, so with several a
+    # guest's cart vanishes whenever a request lands on another one). Unset
+    # picks redis whenever REDIS_URL is set.
+    GUEST_CART_BACKEND: Optional[str] = None
+    GUEST_CART_COOKIE: str = "cart_session"
+    GUEST_CART_TTL_SECONDS: float = 7 * 24 * 3600.0
+    GUEST_CART_MAX_SESSIONS: int = 100000
+    GUEST_CART_MAX_LINES: int = 100
+
+    # Background jobs. Workers run inside each app process when JOBS_ENABLED,
+    # or standalone with `python -m app.utils.job_worker`.
+    JOBS_ENABLED: bool = True
+    JOBS_WORKERS: int = 4
+    # Jobs claimed per worker round trip
+    JOBS_BATCH_SIZE: int = 20
+    JOBS_POLL_INTERVAL_SECONDS: float = 1.0
+    JOBS_LEASE_SECONDS: float = 300.0
+    JOBS_MAX_ATTEMPTS: int = 5
+    # Retry delay: base * 2^(attempt - 1), capped, with jitter
+    JOBS_BACKOFF_BASE_SECONDS: float = 2.0
+    JOBS_BACKOFF_MAX_SECONDS: float = 600.0
+    # Recorded on the payments and shipments created after checkout
+    PAYMENT_PROVIDER: str = "manual"
+    SHIPPING_PROVIDER: str = "manual"
+
+    # Coupon code index: full reload interval, and how often expired codes are dropped
+    COUPON_INDEX_REFRESH_SECONDS: float = 30.0
+    COUPON_PRUNE_INTERVAL_SECONDS: float = 5.0
+
+    # Product search ("postgres" or "memory")
+    SEARCH_BACKEND: str = "postgres"
+
+    # Serialize product and order list responses straight from the ORM rows,
+    # skipping response_model re-validation (see app/core/serializers.py)
+    FAST_JSON_RESPONSES: bool = False
+
+    # Keys accepted by POST /products/batch, and per coalesced lookup query
+    PRODUCT_BATCH_MAX_KEYS: int = 200
+
+    # Attribute keys counted in product listing facets
+    PRODUCT_FACET_ATTRIBUTES: List[str] = ["brand", "color", "material"]
+    VARIANT_FACET_ATTRIBUTES: List[str] = ["size", "color"]
+    FACET_VALUES_PER_KEY: int = 20
+
+    # Bulk catalog import: rows per INSERT/commit
+    IMPORT_CHUNK_SIZE: int = 1000
+
+    # Inventory ledger reconciliation: variants per batch/commit
+    INVENTORY_BATCH_SIZE: int = 1000
+
+    # Instrumentation
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    # Raise on the first query over a route's declared budget (tests)
+    QUERY_BUDGET_STRICT: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,143 @@
+# backend/app/core/coupons.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper()
+
+
+class CouponEntry:
+    """The parts of a coupon needed to price a cart."""
+    __slots__ = ("id", "code", "discount_type", "discount_value", "expires_at")
+
+    def __init__(self, id: UUID, code: str, discount_type: str, discount_value: Decimal,
+                 expires_at: Optional[datetime]):
+        self.id = id
+        self.code = normalize_code(code)
+        self.discount_type = discount_type
+        self.discount_value = discount_value
+        self.expires_at = expires_at
+
+    def expired(self, now: datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+    def discount(self, subtotal: Decimal) -> Decimal:
+        if self.discount_type == "percent":
+            amount = (subtotal * self.discount_value / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+        else:
+            amount = self.discount_value
+        return min(amount, subtotal)
+
+
+class CouponIndex:
+    """
+    Per-process index of redeemable coupon codes, so applying a code and
+    pricing a cart never query the database. The index is reloaded every
+    refresh interval and expired codes are pruned more often. Usage limits
+    are not tracked here: the redemption UPDATE at checkout is the authority,
+    and codes it finds used up are dropped via discard().
+    """
+
+    def __init__(self, refresh_interval: float, prune_interval: float):
+        self.refresh_interval = refresh_interval
+        self.prune_interval = prune_interval
+        self._by_code: Dict[str, CouponEntry] = {}
+        self._refreshed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def get(self, code: str) -> Optional[CouponEntry]:
+        entry = self._by_code.get(normalize_code(code))
+        if entry is None or entry.expired(datetime.now(timezone.utc)):
+            return None
+        return entry
+
+    def put(self, coupon: models.Coupon) -> None:
+        # Reflect an admin write in this process right away
+        self.discard(coupon.code)
+        if _redeemable(coupon, datetime.now(timezone.utc)):
+            entry = CouponEntry(coupon.id, coupon.code, coupon.discount_type, coupon.discount_value, coupon.expires_at)
+            self._by_code[entry.code] = entry
+
+    def discard(self, code: str) -> None:
+        self._by_code.pop(normalize_code(code), None)
+
+    def prune(self) -> int:
+        now = datetime.now(timezone.utc)
+        expired = [code for code, entry in self._by_code.items() if entry.expired(now)]
+        for code in expired:
+            del self._by_code[code]
+        return len(expired)
+
+    async def refresh(self) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    models.Coupon.id, models.Coupon.code, models.Coupon.discount_type,
+                    models.Coupon.discount_value, models.Coupon.expires_at,
+                )
+                .filter(
+                    models.Coupon.is_active.is_(True),
+                    or_(models.Coupon.expires_at.is_(None), models.Coupon.expires_at > datetime.now(timezone.utc)),
+                    or_(models.Coupon.usage_limit.is_(None), models.Coupon.used < models.Coupon.usage_limit),
+                )
+            )
+            entries = [CouponEntry(*row) for row in result.all()]
+        self._by_code = {entry.code: entry for entry in entries}
+        self._refreshed_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                    await self.refresh()
+                else:
+                    self.prune()
+            except Exception:
+                logger.exception("Coupon index refresh failed")
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _redeemable(coupon: models.Coupon, now: datetime) -> bool:
+    return (
+        coupon.is_active
+        and (coupon.expires_at is None or coupon.expires_at > now)
+        and (coupon.usage_limit is None or (coupon.used or 0) < coupon.usage_limit)
+    )
+
+
+coupon_index = CouponIndex(
+    refresh_interval=settings.COUPON_INDEX_REFRESH_SECONDS, prune_interval=settings.COUPON_PRUNE_INTERVAL_SECONDS
+)
@@ -0,0 +1,80 @@
+# backend/app/core/filters.py
+import json
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+_KEY_RE = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
+MAX_FILTER_TERMS = 20
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+@dataclass
+class ProductFilter:
+    """
+    Attribute and price filters for the product listing.
+
+    Terms are written key:value. Values for the same key are OR-ed and
+    different keys are AND-ed, so `attr=color:rojo&attr=color:azul&attr=brand:acme`
+    means (color rojo or azul) and brand acme. Variant terms and the price
+    range must all hold for the same variant.
+    """
+    attributes: Dict[str, List[str]] = field(default_factory=dict)
+    variant_attributes: Dict[str, List[str]] = field(default_factory=dict)
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+
+    @property
+    def has_variant_terms(self) -> bool:
+        return bool(self.variant_attributes) or self.min_price is not None or self.max_price is not None
+
+    def __bool__(self) -> bool:
+        return bool(self.attributes) or self.has_variant_terms
+
+
+def _parse_terms(terms: List[str]) -> Dict[str, List[str]]:
+    parsed: Dict[str, List[str]] = {}
+    for term in terms:
+        key, sep, value = term.partition(":")
+        if not sep or not value or not _KEY_RE.match(key):
+            raise InvalidFilter(f"Invalid filter '{term}', expected key:value")
+        parsed.setdefault(key, []).append(value)
+    return parsed
+
+
+def parse_product_filter(
+    attr: Optional[List[str]] = None,
+    vattr: Optional[List[str]] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+) -> ProductFilter:
+    attr, vattr = attr or [], vattr or []
+    if len(attr) + len(vattr) > MAX_FILTER_TERMS:
+        raise InvalidFilter(f"At most {MAX_FILTER_TERMS} attribute filters are allowed")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise InvalidFilter("min_price cannot be greater than max_price")
+    return ProductFilter(
+        attributes=_parse_terms(attr),
+        variant_attributes=_parse_terms(vattr),
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+
+def containment_documents(key: str, value: str) -> List[dict]:
+    """
+    JSONB documents to test with @>. Attribute values are usually strings,
+    but numeric and boolean looking values also match their JSON form.
+    """
+    documents = [{key: value}]
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return documents
+    if isinstance(parsed, (int, float, bool)):
+        documents.append({key: parsed})
+    return documents
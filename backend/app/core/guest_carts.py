@@ -0,0 +1,193 @@
+# backend/app/core/guest_carts.py
+import json
+import secrets
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, Optional, TypeVar
+from uuid import UUID
+
+from app.core.cache import CacheBackend, MemoryCacheBackend
+from app.core.config import settings
+
+# token_urlsafe(32) ids are 43 characters; anything much longer is not ours
+MAX_SESSION_ID_LENGTH = 64
+
+T = TypeVar("T")
+
+
+class GuestCartFull(ValueError):
+    pass
+
+
+class GuestCartConflict(Exception):
+    pass
+
+
+@dataclass
+class GuestCartLine:
+    id: UUID
+    variant_id: UUID
+    quantity: int
+    price_at_add: Decimal
+
+
+@dataclass
+class GuestCart:
+    """
+    An anonymous cart. Lines are keyed by variant, like the
+    (cart_id, variant_id) constraint on persisted carts.
+    """
+    id: UUID = field(default_factory=uuid.uuid4)
+    lines: Dict[UUID, GuestCartLine] = field(default_factory=dict)
+    coupon_code: Optional[str] = None
+
+    def set_quantity(self, variant_id: UUID, quantity: int, price: Decimal) -> GuestCartLine:
+        line = self.lines.get(variant_id)
+        if line is None:
+            if len(self.lines) >= settings.GUEST_CART_MAX_LINES:
+                raise GuestCartFull(f"A cart holds at most {settings.GUEST_CART_MAX_LINES} items")
+            line = self.lines[variant_id] = GuestCartLine(uuid.uuid4(), variant_id, quantity, price)
+        else:
+            line.quantity = quantity
+        return line
+
+    def line_by_id(self, item_id: UUID) -> Optional[GuestCartLine]:
+        return next((line for line in self.lines.values() if line.id == item_id), None)
+
+    def dumps(self) -> bytes:
+        return json.dumps({
+            "id": str(self.id),
+            "lines": [
+                [str(line.id), str(line.variant_id), line.quantity, str(line.price_at_add)]
+                for line in self.lines.values()
+            ],
+            "coupon": self.coupon_code,
+        }, separators=(",", ":")).encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "GuestCart":
+        raw = json.loads(data)
+        lines = [
+            GuestCartLine(UUID(id), UUID(variant_id), quantity, Decimal(price))
+            for id, variant_id, quantity, price in raw["lines"]
+        ]
+        return cls(
+            id=UUID(raw["id"]), lines={line.variant_id: line for line in lines}, coupon_code=raw.get("coupon")
+        )
+
+
+class GuestCartStore:
+    """
+    Guest carts keyed by session id, in a TTL-evicting cache backend so
+    abandoned carts expire on their own and never reach Postgres. Every
+    save pushes the expiry out by another ttl.
+
+    Over the per-process memory backend, update() is atomic because nothing
+    awaits between its read and its write; carts are not shared between
+    workers. RedisGuestCartStore shares them.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, session_id: Optional[str]) -> Optional[GuestCart]:
+        if not _valid_session_id(session_id):
+            return None
+        data = await self.backend.get(session_id)
+        return GuestCart.loads(data) if data is not None else None
+
+    async def update(self, session_id: str, change: Callable[[GuestCart], T], create: bool = True) -> Optional[T]:
+        """
+        Apply `change` to the session's cart (a new one if it has none and
+        `create`) and save it, returning what `change` returns. Without a
+        cart and with create=False, returns None and saves nothing. `change`
+        may run more than once, so it must only modify the cart.
+        """
+        cart = await self.get(session_id)
+        if cart is None:
+            if not create:
+                return None
+            cart = GuestCart()
+        result = change(cart)
+        await self.backend.set(session_id, cart.dumps(), self.ttl)
+        return result
+
+    async def delete(self, session_id: str) -> None:
+        await self.backend.delete(session_id)
+
+
+class RedisGuestCartStore(GuestCartStore):
+    """
+    Guest carts shared by all workers. update() runs optimistically under
+    WATCH and retries when another request changed the cart in between, so
+    concurrent changes to one cart are never lost. Unlike the response
+    cache, Redis errors are raised: a cart change must not be reported as
+    saved when it was not.
+    """
+
+    MAX_UPDATE_ATTEMPTS = 10
+
+    def __init__(self, client, ttl: float, prefix: str = "guest_cart:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float, prefix: str = "guest_cart:") -> "RedisGuestCartStore":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), ttl, prefix=prefix)
+
+    async def get(self, session_id: Optional[str]) -> Optional[GuestCart]:
+        if not _valid_session_id(session_id):
+            return None
+        data = await self.client.get(self.prefix + session_id)
+        return GuestCart.loads(data) if data is not None else None
+
+    async def update(self, session_id: str, change: Callable[[GuestCart], T], create: bool = True) -> Optional[T]:
+        from redis.exceptions import WatchError
+
+        if not create and not _valid_session_id(session_id):
+            return None
+        key = self.prefix + session_id
+        async with self.client.pipeline(transaction=True) as pipe:
+            for _ in range(self.MAX_UPDATE_ATTEMPTS):
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    if data is None and not create:
+                        await pipe.reset()
+                        return None
+                    cart = GuestCart.loads(data) if data is not None else GuestCart()
+                    result = change(cart)
+                    pipe.multi()
+                    pipe.set(key, cart.dumps(), px=int(self.ttl * 1000))
+                    await pipe.execute()
+                    return result
+                except WatchError:
+                    continue
+        raise GuestCartConflict("The cart is being changed by other requests; try again")
+
+    async def delete(self, session_id: str) -> None:
+        await self.client.delete(self.prefix + session_id)
+
+
+def _valid_session_id(session_id: Optional[str]) -> bool:
+    return bool(session_id) and len(session_id) <= MAX_SESSION_ID_LENGTH
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def _create_store() -> GuestCartStore:
+    backend = settings.GUEST_CART_BACKEND or ("redis" if settings.REDIS_URL else "memory")
+    if backend == "redis":
+        return RedisGuestCartStore.from_url(settings.REDIS_URL, ttl=settings.GUEST_CART_TTL_SECONDS)
+    backend = MemoryCacheBackend(maxsize=settings.GUEST_CART_MAX_SESSIONS)
+    return GuestCartStore(backend, ttl=settings.GUEST_CART_TTL_SECONDS)
+
+
+guest_carts = _create_store()
@@ -0,0 +1,209 @@
+# backend/app/core/instrumentation.py
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import gauge_lines, registry
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_query")
+
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    labels=("method", "route", "status"),
+)
+request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements issued per request.",
+    labels=("method", "route"), buckets=QUERIES_PER_REQUEST_BUCKETS,
+)
+db_query_seconds = registry.counter(
+    "db_query_duration_seconds_total", "Time spent executing SQL, by route.",
+    labels=("method", "route"),
+)
+slow_queries = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_THRESHOLD_MS.",
+    labels=("method", "route"),
+)
+query_budget_violations = registry.counter(
+    "http_query_budget_exceeded_total", "Requests that issued more SQL than their declared budget.",
+    labels=("method", "route"),
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("method", "route", "queries", "db_seconds", "budget")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.budget: Optional[int] = None
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+# ===================================================================
+# SQLAlchemy hooks
+# ===================================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_request.get()
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        route = stats.route if stats else "-"
+        if stats:
+            slow_queries.inc(stats.method, stats.route)
+        slow_query_logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, statement[:1000])
+
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if settings.QUERY_BUDGET_STRICT and stats.budget is not None and stats.queries > stats.budget:
+        raise QueryBudgetExceeded(
+            f"{stats.method} {stats.route} issued {stats.queries} queries, budget is {stats.budget}: {statement[:200]}"
+        )
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query counting and the slow-query log to a (sync) engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ===================================================================
+# ASGI middleware
+# ===================================================================
+
+def _route_template(scope) -> str:
+    # Label by route template, not raw path, to keep cardinality bounded
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        for candidate in scope["app"].routes:
+            if getattr(candidate, "endpoint", None) is endpoint:
+                return candidate.path
+    return "unmatched"
+
+
+class InstrumentationMiddleware:
+    """
+    Records per-route latency and SQL statistics. Query counting relies on
+    the hooks from instrument_engine() seeing this request's context.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], "unmatched")
+        token = _current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # The route is resolved by the time the handler responds
+                stats.route = _route_template(scope)
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            stats.route = _route_template(scope)
+            request_duration.observe(elapsed, stats.method, stats.route, str(status_code))
+            request_queries.observe(stats.queries, stats.method, stats.route)
+            db_query_seconds.inc(stats.method, stats.route, amount=stats.db_seconds)
+            if stats.budget is not None and stats.queries > stats.budget:
+                query_budget_violations.inc(stats.method, stats.route)
+                logger.warning("%s %s issued %d queries, budget is %d",
+                               stats.method, stats.route, stats.queries, stats.budget)
+
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring how many SQL statements a request may issue.
+    Overruns are logged and counted; with QUERY_BUDGET_STRICT (for tests)
+    the offending query raises QueryBudgetExceeded, catching N+1 regressions.
+
+        @router.get("/", dependencies=[query_budget(3)])
+    """
+    async def declare_budget():
+        stats = _current_request.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    return Depends(declare_budget)
+
+
+# ===================================================================
+# Scrape-time collectors for state owned by other modules
+# ===================================================================
+
+@registry.collector
+def _principal_cache_metrics():
+    from app.core.principal_cache import principal_cache
+
+    stats = principal_cache.stats()
+    yield from gauge_lines("principal_cache_size", "Cached authenticated principals.", stats["size"])
+    yield from gauge_lines("principal_cache_hits_total", "Principal cache hits.", stats["hits"])
+    yield from gauge_lines("principal_cache_misses_total", "Principal cache misses.", stats["misses"])
+
+@registry.collector
+def _rate_limit_metrics():
+    from app.core.rate_limit import MemoryRateLimitStore, rate_limit_store
+
+    if isinstance(rate_limit_store, MemoryRateLimitStore):
+        yield from gauge_lines("rate_limit_buckets", "Rate limit buckets held in this process.", len(rate_limit_store))
+
+@registry.collector
+def _db_pool_metrics():
+    from app.db.session import pool_status
+
+    status = pool_status()
+    yield from gauge_lines("db_pool_size", "Configured connection pool size.", status["size"])
+    yield from gauge_lines("db_pool_checked_out", "Connections currently in use.", status["checked_out"])
+    yield from gauge_lines("db_pool_overflow", "Connections open beyond the pool size.", status["overflow"])
+    yield from gauge_lines("db_pool_wait_seconds_total", "Time spent waiting for a connection.", status["wait_seconds_total"])
+
+@registry.collector
+def _catalog_snapshot_metrics():
+    from app.core.catalog_snapshot import catalog_snapshot
+
+    snapshot = catalog_snapshot.snapshot
+    if snapshot is None:
+        return
+    yield from gauge_lines("catalog_snapshot_products", "Products held in the listing snapshot.", len(snapshot))
+    yield from gauge_lines("catalog_snapshot_body_bytes", "Pre-encoded JSON held in the listing snapshot.", snapshot.body_bytes)
@@ -0,0 +1,248 @@
+# backend/app/core/jobs.py
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, literal_column, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import AsyncSessionLocal
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+jobs_processed = registry.counter(
+    "jobs_processed_total", "Jobs run by this process, by outcome (done, retry, failed).", ("kind", "outcome")
+)
+job_duration = registry.histogram("job_duration_seconds", "Job handler run time.", ("kind",))
+
+Handler = Callable[[AsyncSession, dict], Awaitable[None]]
+_handlers: Dict[str, Handler] = {}
+
+
+def job_handler(kind: str):
+    """
+    Register the handler for a job kind. Handlers run in their own session
+    and must not commit: the worker commits their writes together with
+    the job's deletion. A retried job runs its handler again, so handlers
+    should be idempotent.
+    """
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+@dataclass
+class ClaimedJob:
+    id: UUID
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+# ===================================================================
+# Queue operations
+# ===================================================================
+
+async def enqueue(db: AsyncSession, jobs: List[dict]) -> None:
+    """
+    Add jobs ({"kind", "payload"}, optionally "run_at") in the caller's
+    transaction; they become visible to workers when it commits.
+    """
+    if jobs:
+        await db.execute(
+            insert(models.Job),
+            [{"max_attempts": settings.JOBS_MAX_ATTEMPTS, "status": "pending", **job} for job in jobs],
+        )
+
+
+async def claim(db: AsyncSession, limit: int, lease_seconds: float) -> List[ClaimedJob]:
+    # Moves up to `limit` ready jobs to running in one statement and commits.
+    # SKIP LOCKED lets concurrent workers claim disjoint batches without waiting.
+    # The status literals let the planner use the partial indexes.
+    ready = (
+        select(models.Job.id)
+        .filter(models.Job.status == literal_column("'pending'"), models.Job.run_at <= func.now())
+        .order_by(models.Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(models.Job)
+        .where(models.Job.id.in_(ready.scalar_subquery()))
+        .values(
+            status="running",
+            attempts=models.Job.attempts + 1,
+            locked_until=func.now() + timedelta(seconds=lease_seconds),
+        )
+        .returning(models.Job.id, models.Job.kind, models.Job.payload, models.Job.attempts, models.Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = [ClaimedJob(*row) for row in result.all()]
+    await db.commit()
+    return jobs
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(settings.JOBS_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), settings.JOBS_BACKOFF_MAX_SECONDS)
+    # Full jitter on the upper half spreads retries of jobs that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def _complete(db: AsyncSession, job: ClaimedJob) -> None:
+    await db.execute(delete(models.Job).where(models.Job.id == job.id))
+
+
+async def _retry_or_fail(db: AsyncSession, job: ClaimedJob, error: str, retry: bool = True) -> str:
+    if retry and job.attempts < job.max_attempts:
+        values = {"status": "pending", "run_at": func.now() + timedelta(seconds=backoff_seconds(job.attempts))}
+        outcome = "retry"
+    else:
+        values = {"status": "failed", "finished_at": func.now()}
+        outcome = "failed"
+    await db.execute(
+        update(models.Job)
+        .where(models.Job.id == job.id)
+        .values(locked_until=None, last_error=error[:2000], **values)
+        .execution_options(synchronize_session=False)
+    )
+    return outcome
+
+
+async def requeue_expired(db: AsyncSession) -> int:
+    # Running jobs whose lease ran out belong to a worker that died or hung
+    result = await db.execute(
+        update(models.Job)
+        .where(models.Job.status == literal_column("'running'"), models.Job.locked_until < func.now())
+        .values(status="pending", locked_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def run_job(job: ClaimedJob) -> str:
+    """
+    Run one claimed job in its own session. On success its writes and the
+    job's deletion commit together. Returns the outcome.
+    """
+    handler = _handlers.get(job.kind)
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            await handler(db, job.payload)
+            await _complete(db, job)
+            await db.commit()
+            outcome = "done"
+        except Exception as e:
+            await db.rollback()
+            logger.warning("Job %s (%s) attempt %d failed", job.id, job.kind, job.attempts, exc_info=True)
+            outcome = await _retry_or_fail(db, job, repr(e), retry=handler is not None)
+            await db.commit()
+    job_duration.observe(time.perf_counter() - start, job.kind)
+    jobs_processed.inc(job.kind, outcome)
+    return outcome
+
+
+# ===================================================================
+# Worker pool
+# ===================================================================
+
+class JobWorkerPool:
+    """
+    asyncio workers that each claim a batch, run it, and claim again; an
+    idle worker sleeps for the poll interval or until wake() is called.
+    Stopping lets running batches finish; unstarted jobs in a claimed batch
+    are handed back to pending.
+    """
+
+    def __init__(self, workers: int, batch_size: int, poll_interval: float, lease_seconds: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _release(self, jobs: List[ClaimedJob]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id.in_([job.id for job in jobs]))
+                .values(status="pending", locked_until=None, attempts=models.Job.attempts - 1)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _work(self, worker_id: int) -> None:
+        while not self._stopping:
+            try:
+                async with AsyncSessionLocal() as db:
+                    if worker_id == 0:
+                        await requeue_expired(db)
+                    jobs = await claim(db, self.batch_size, self.lease_seconds)
+                for index, job in enumerate(jobs):
+                    if self._stopping:
+                        await self._release(jobs[index:])
+                        break
+                    await run_job(job)
+                if not jobs:
+                    await self._idle()
+            except Exception:
+                logger.exception("Job worker %d failed; retrying after the poll interval", worker_id)
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self.wake()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> None:
+        """Run until no job is ready, then stop. Used by benchmarks and scripts."""
+        self.start()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            async with AsyncSessionLocal() as db:
+                ready = await db.scalar(
+                    select(func.count()).select_from(models.Job)
+                    .filter(models.Job.status.in_(["pending", "running"]), models.Job.run_at <= func.now())
+                )
+            if not ready:
+                break
+        await self.stop()
+
+
+job_workers = JobWorkerPool(
+    workers=settings.JOBS_WORKERS,
+    batch_size=settings.JOBS_BATCH_SIZE,
+    poll_interval=settings.JOBS_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOBS_LEASE_SECONDS,
+)
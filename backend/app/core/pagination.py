@@ -0,0 +1,59 @@
+# backend/app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Tuple
+from uuid import UUID
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(values: List[str]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> List[str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+    """
+    return _encode([created_at.isoformat(), str(id)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Inverse of encode_cursor. Raises InvalidCursor on anything malformed,
+    including a timestamp without a UTC offset: created_at is always
+    timezone-aware, and naive and aware datetimes do not compare.
+    """
+    try:
+        created_at, id = _decode(cursor)
+        created_at, id = datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+    if created_at.tzinfo is None:
+        raise InvalidCursor("Invalid pagination cursor")
+    return created_at, id
+
+
+def encode_rating_cursor(average_rating: Decimal, id: UUID) -> str:
+    """
+    Keyset cursor for listings ordered by (average rating, id).
+    """
+    return _encode([str(average_rating), str(id)])
+
+
+def decode_rating_cursor(cursor: str) -> Tuple[Decimal, UUID]:
+    try:
+        average_rating, id = _decode(cursor)
+        return Decimal(average_rating), UUID(id)
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
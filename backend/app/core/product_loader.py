@@ -0,0 +1,103 @@
+# backend/app/core/product_loader.py
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.crud import ProductKey, get_products_by_keys
+from app.db.routing import pinned_to_primary, read_session
+from app.db.session import AsyncSessionLocal
+from app.models import models
+
+
+class ProductBatcher:
+    """
+    DataLoader-style coalescing of product lookups across all requests in
+    the process. Keys asked for in the same event loop turn are fetched
+    together, and a key whose fetch is already running joins it instead of
+    querying again. Nothing is kept once a fetch completes: caching is the
+    response cache's job.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], max_batch: int):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self._in_flight: Dict[ProductKey, asyncio.Future] = {}
+        self._queued: Dict[ProductKey, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def futures(self, keys: List[ProductKey]) -> List[asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for key in keys:
+            future = self._in_flight.get(key)
+            if future is None or future.cancelled():
+                future = self._in_flight[key] = loop.create_future()
+                if not self._queued:
+                    loop.call_soon(self._dispatch)
+                self._queued[key] = future
+            futures.append(future)
+        return futures
+
+    def _dispatch(self) -> None:
+        queued, self._queued = list(self._queued.items()), {}
+        for start in range(0, len(queued), self.max_batch):
+            task = asyncio.create_task(self._fetch(dict(queued[start:start + self.max_batch])))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: Dict[ProductKey, asyncio.Future]) -> None:
+        try:
+            async with self.session_factory() as db:
+                found = await get_products_by_keys(db, list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(key))
+        finally:
+            # Cancelled (e.g. at shutdown) before it could resolve: waiters
+            # see CancelledError and a later load starts a new fetch
+            for key, future in batch.items():
+                if not future.done():
+                    future.cancel()
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+
+product_batcher = ProductBatcher(read_session, max_batch=settings.PRODUCT_BATCH_MAX_KEYS)
+# For clients pinned to the primary after a write
+primary_product_batcher = ProductBatcher(AsyncSessionLocal, max_batch=settings.PRODUCT_BATCH_MAX_KEYS)
+
+
+class ProductLoader:
+    """
+    Request-scoped front for a ProductBatcher: a key repeated within one
+    request, in the same call or a later one, resolves to the same fetch.
+    The shared futures are awaited through asyncio.shield, so a cancelled
+    request (client disconnect, timeout) leaves the fetch running for the
+    other requests waiting on it.
+    """
+
+    def __init__(self, batcher: ProductBatcher):
+        self.batcher = batcher
+        self._memo: Dict[ProductKey, asyncio.Future] = {}
+
+    async def load_many(self, keys: List[ProductKey]) -> List[Optional[models.Product]]:
+        memo = self._memo
+        new = [key for key in dict.fromkeys(keys) if key not in memo or memo[key].cancelled()]
+        memo.update(zip(new, self.batcher.futures(new)))
+        return list(await asyncio.gather(*(asyncio.shield(memo[key]) for key in keys)))
+
+    async def load(self, key: ProductKey) -> Optional[models.Product]:
+        return (await self.load_many([key]))[0]
+
+
+async def get_product_loader(request: Request) -> ProductLoader:
+    """Route dependency; follows the same replica routing as get_read_db."""
+    return ProductLoader(primary_product_batcher if await pinned_to_primary(request) else product_batcher)
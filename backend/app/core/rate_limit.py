@@ -0,0 +1,224 @@
+# backend/app/core/rate_limit.py
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.principal_cache import bearer_token_user
+
+logger = logging.getLogger(__name__)
+
+rate_limit_decisions = registry.counter(
+    "rate_limit_decisions_total", "Rate limiter decisions, by policy (allowed, limited).", ("policy", "decision")
+)
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """
+    A token bucket: `rate` requests per second sustained, up to `burst` at
+    once. Buckets are kept per client IP, or per user for requests with a
+    valid bearer token when `per` is "client".
+    """
+    name: str
+    prefix: str
+    rate: float
+    burst: int
+    methods: Optional[FrozenSet[str]] = None
+    per: str = "client"
+
+    def matches(self, method: str, path: str) -> bool:
+        return path.startswith(self.prefix) and (self.methods is None or method in self.methods)
+
+
+def default_policies() -> List[RatePolicy]:
+    # First match wins. Login and registration hash passwords with bcrypt,
+    # so they are limited per IP whatever token the client sends.
+    api = settings.API_V1_STR
+    return [
+        RatePolicy("auth", f"{api}/auth/login", settings.RATE_LIMIT_AUTH_RATE, settings.RATE_LIMIT_AUTH_BURST,
+                   methods=frozenset({"POST"}), per="ip"),
+        RatePolicy("auth", f"{api}/auth/register", settings.RATE_LIMIT_AUTH_RATE, settings.RATE_LIMIT_AUTH_BURST,
+                   methods=frozenset({"POST"}), per="ip"),
+        RatePolicy("catalog", f"{api}/products", settings.RATE_LIMIT_CATALOG_RATE, settings.RATE_LIMIT_CATALOG_BURST,
+                   methods=frozenset({"GET", "HEAD", "POST"})),
+        RatePolicy("default", f"{api}/", settings.RATE_LIMIT_DEFAULT_RATE, settings.RATE_LIMIT_DEFAULT_BURST),
+    ]
+
+
+# ===================================================================
+# Bucket stores
+# ===================================================================
+
+class RateLimitStore:
+    async def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Take one token. Returns (allowed, seconds until a token is available)."""
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets in LRU order. Each acquire is O(1): it refills
+    lazily from the elapsed time and drops at most a couple of idle buckets
+    from the cold end. A bucket that has refilled completely is the same as
+    no bucket, so dropping it loses nothing. Past max_keys the coldest
+    bucket is dropped even if it is not full yet.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, full_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(burst)
+        else:
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+        self._evict(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        for _ in range(2):
+            key, bucket = next(iter(buckets.items()))
+            if bucket[2] > now:
+                break
+            del buckets[key]
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+
+
+# Same algorithm as MemoryRateLimitStore, atomically on the Redis server and
+# on its clock, so every worker shares one bucket per key. The key expires
+# once the bucket would be full again.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+  tokens = burst
+else
+  tokens = math.min(burst, tokens + math.max(0, now - tonumber(state[2])) * rate)
+end
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Buckets shared by all workers, updated by one Lua script call per
+    request. Like the response cache, Redis errors fail open.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "ratelimit:") -> "RedisRateLimitStore":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), prefix=prefix)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._script(keys=[self.prefix + key], args=[rate, burst])
+        except Exception:
+            logger.warning("Rate limit check failed for %s", key, exc_info=True)
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+
+
+def _create_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore.from_url(settings.REDIS_URL)
+    return MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = _create_store()
+
+
+# ===================================================================
+# Middleware
+# ===================================================================
+
+def _headers(scope) -> Dict[bytes, bytes]:
+    return dict(scope.get("headers", ()))
+
+
+def _client_ip(scope, headers: Dict[bytes, bytes]) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(b",")[0].strip().decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Applies the first matching RatePolicy to each HTTP request and answers
+    429 with Retry-After when the client's bucket is empty. Requests that
+    match no policy are not limited.
+    """
+
+    def __init__(self, app, store: Optional[RateLimitStore] = None, policies: Optional[List[RatePolicy]] = None):
+        self.app = app
+        self.store = store if store is not None else rate_limit_store
+        self.policies = policies if policies is not None else default_policies()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method, path = scope["method"], scope["path"]
+        policy = next((policy for policy in self.policies if policy.matches(method, path)), None)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = _headers(scope)
+        user = bearer_token_user(headers.get(b"authorization", b"")) if policy.per == "client" else None
+        identity = f"user:{user}" if user else f"ip:{_client_ip(scope, headers)}"
+        allowed, retry_after = await self.store.acquire(f"{policy.name}:{identity}", policy.rate, policy.burst)
+        rate_limit_decisions.inc(policy.name, "allowed" if allowed else "limited")
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
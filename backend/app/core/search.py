@@ -0,0 +1,227 @@
+# backend/app/core/search.py
+import heapq
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchResult:
+    # (product_id, score), best match first
+    hits: List[Tuple[UUID, float]]
+    total: int
+    # category_id -> number of matching products, ignoring the category filter
+    facets: Dict[Optional[UUID], int] = field(default_factory=dict)
+
+
+class SearchBackend:
+    """
+    Product full-text search. Backends rank active products against a free
+    text query and report per-category facet counts for the whole match set.
+    """
+
+    async def search(
+        self, db: AsyncSession, q: str, category_id: Optional[UUID] = None,
+        limit: int = 20, offset: int = 0,
+    ) -> SearchResult:
+        raise NotImplementedError
+
+    async def index_product(self, product: models.Product) -> None:
+        """Called after a product is created or updated."""
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Called at startup to (re)build any process-local state."""
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector search served by the ix_products_search GIN index. The index is
+    maintained by Postgres, so there is nothing to do on writes.
+    """
+
+    async def search(self, db, q, category_id=None, limit=20, offset=0):
+        query = func.websearch_to_tsquery(models.SEARCH_CONFIG, q)
+        matches = models.product_search_vector.op("@@")(query)
+        active = models.Product.is_active.is_not(False)
+
+        facet_rows = await db.execute(
+            select(models.Product.category_id, func.count())
+            .where(matches, active)
+            .group_by(models.Product.category_id)
+        )
+        facets = {category: count for category, count in facet_rows.all()}
+        total = facets.get(category_id, 0) if category_id else sum(facets.values())
+        if not total:
+            return SearchResult(hits=[], total=0, facets=facets)
+
+        rank = func.ts_rank(models.product_search_vector, query)
+        hits_query = (
+            select(models.Product.id, rank)
+            .where(matches, active)
+            .order_by(rank.desc(), models.Product.id)
+            .limit(limit).offset(offset)
+        )
+        if category_id:
+            hits_query = hits_query.where(models.Product.category_id == category_id)
+        hit_rows = await db.execute(hits_query)
+        return SearchResult(hits=[(id, float(score)) for id, score in hit_rows.all()], total=total, facets=facets)
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+def _attribute_text(attributes) -> str:
+    if not attributes:
+        return ""
+    if isinstance(attributes, dict):
+        return " ".join(f"{key} {_attribute_text(value)}" for key, value in attributes.items())
+    if isinstance(attributes, (list, tuple)):
+        return " ".join(_attribute_text(value) for value in attributes)
+    return str(attributes)
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """
+    In-process inverted index with BM25 ranking. Queries are AND-ed like
+    websearch_to_tsquery, and title terms count more than description or
+    attribute terms. Each worker holds its own copy: it is built by
+    rebuild() at startup and kept current by index_product().
+    """
+
+    TITLE_WEIGHT = 3
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[UUID, int]] = {}
+        self._doc_terms: Dict[UUID, Tuple[str, ...]] = {}
+        self._doc_length: Dict[UUID, int] = {}
+        self._doc_category: Dict[UUID, Optional[UUID]] = {}
+        self._total_length = 0
+        # Set while rebuild() runs: index_product() calls made meanwhile, by
+        # product id (None when removed), replayed onto the new index
+        self._pending: Optional[Dict[UUID, Optional[tuple]]] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_length)
+
+    def add(self, product_id: UUID, title: str, description: Optional[str],
+            attributes, category_id: Optional[UUID]) -> None:
+        self.remove(product_id)
+        counts = Counter(tokenize(title))
+        for term in counts:
+            counts[term] *= self.TITLE_WEIGHT
+        counts.update(tokenize(description))
+        counts.update(tokenize(_attribute_text(attributes)))
+
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[product_id] = tf
+        length = sum(counts.values())
+        self._doc_terms[product_id] = tuple(counts)
+        self._doc_length[product_id] = length
+        self._doc_category[product_id] = category_id
+        self._total_length += length
+
+    def remove(self, product_id: UUID) -> None:
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings[term]
+            del posting[product_id]
+            if not posting:
+                del self._postings[term]
+        self._total_length -= self._doc_length.pop(product_id)
+        del self._doc_category[product_id]
+
+    async def index_product(self, product):
+        if product.is_active is False:
+            row = None
+            self.remove(product.id)
+        else:
+            row = (product.id, product.title, product.description, product.attributes, product.category_id)
+            self.add(*row)
+        if self._pending is not None:
+            self._pending[product.id] = row
+
+    async def rebuild(self, db):
+        # Build into a fresh index and swap it in, so searches running
+        # meanwhile keep seeing the previous state. Products indexed while
+        # the rows stream in may have been read before their write, so
+        # their latest state is applied on top before the swap.
+        self._pending = {}
+        try:
+            fresh = InvertedIndexSearchBackend()
+            result = await db.stream(
+                select(
+                    models.Product.id, models.Product.title, models.Product.description,
+                    models.Product.attributes, models.Product.category_id,
+                )
+                .where(models.Product.is_active.is_not(False))
+                .execution_options(yield_per=5000)
+            )
+            async for row in result:
+                fresh.add(*row)
+            for product_id, row in self._pending.items():
+                if row is None:
+                    fresh.remove(product_id)
+                else:
+                    fresh.add(*row)
+        finally:
+            self._pending = None
+        vars(self).update(vars(fresh))
+        logger.info("Search index built with %d products", len(self))
+
+    async def search(self, db, q, category_id=None, limit=20, offset=0):
+        terms = set(tokenize(q))
+        postings = [self._postings.get(term) for term in terms]
+        if not postings or not all(postings):
+            return SearchResult(hits=[], total=0)
+
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        matched = set(postings[0])
+        for posting in postings[1:]:
+            matched.intersection_update(posting)
+
+        facets = Counter(self._doc_category[doc] for doc in matched)
+        if category_id:
+            matched = {doc for doc in matched if self._doc_category[doc] == category_id}
+
+        n_docs = len(self._doc_length)
+        avg_length = self._total_length / n_docs
+        scores = []
+        for doc in matched:
+            norm = self.K1 * (1 - self.B + self.B * self._doc_length[doc] / avg_length)
+            score = 0.0
+            for posting in postings:
+                tf = posting[doc]
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                score += idf * tf * (self.K1 + 1) / (tf + norm)
+            scores.append((doc, score))
+        top = heapq.nsmallest(offset + limit, scores, key=lambda hit: (-hit[1], hit[0]))
+        return SearchResult(hits=top[offset:], total=len(scores), facets=dict(facets))
+
+
+def _create_backend() -> SearchBackend:
+    if settings.SEARCH_BACKEND == "memory":
+        return InvertedIndexSearchBackend()
+    return PostgresSearchBackend()
+
+
+search_backend: SearchBackend = _create_backend()
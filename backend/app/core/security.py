@@ -1,4 +1,6 @@
 # backend/app/core/security.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,23 +9,69 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from uuid import UUID
+
 from app.core.config import settings
+from app.core.principal_cache import principal_cache, Principal
 from app.db.session import get_db
 from app import crud
-from app.models import models
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+# Same scheme for routes that also serve anonymous visitors
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
 
-ALGORITHM = "HS256"
+# bcrypt is CPU-bound, so it runs on a bounded pool instead of the event loop.
+# Requests beyond workers + PASSWORD_HASH_MAX_QUEUE are shed with a 503.
+_hash_executor: Optional[Executor] = None
+_hash_in_flight = 0
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+async def _run_in_hash_pool(fn, *args):
+    global _hash_in_flight
+    if _hash_in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_in_flight -= 1
+
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(_verify, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await _run_in_hash_pool(_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -34,7 +82,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.User:
+async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,20 +93,39 @@ async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depe
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError:
+        user_id = UUID(payload["uid"]) if "uid" in payload else None
+    except (JWTError, ValueError):
         raise credentials_exception
-    
-    user = await crud.get_user_by_email(db, email=email)
+
+    if user_id is not None:
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        user = await crud.get_user(db, user_id=user_id)
+    else:
+        # Tokens issued before the uid claim was added
+        user = await crud.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
-    return user
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+    principal = Principal.model_validate(user)
+    principal_cache.set(principal)
+    return principal
+
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=403, detail="Inactive user")
     return current_user
 
-async def get_current_staff_user(current_user: models.User = Depends(get_current_active_user)) -> models.User:
+async def get_optional_active_user(
+    db: AsyncSession = Depends(get_db), token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[Principal]:
+    # None without a token; an invalid token or inactive user is still an error
+    if token is None:
+        return None
+    return await get_current_active_user(await get_current_user(db, token))
+
+async def get_current_staff_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     if not current_user.is_staff:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1 +1,3 @@
-# app/crud/__init__.py
\ No newline at end of file
+# app/crud/__init__.py
+# Routes use `from app import crud` and call crud.<function> directly
+from app.crud.crud import *  # noqa
@@ -1,24 +1,45 @@
 # backend/app/crud/crud.py
+from sqlalchemy import (
+    Integer, case, column, delete, distinct, func, insert, literal, literal_column, or_, true, tuple_,
+    union_all, update, values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy.orm import aliased, contains_eager, selectinload
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
 
 from app.models import models
 from app.schemas import schemas
-from app.core.security import get_password_hash, verify_password
+from app.core import security
+from app.core.pagination import encode_cursor, decode_cursor, encode_rating_cursor, decode_rating_cursor
+from app.core.principal_cache import invalidate_principal
+from app.core.cache import CATEGORIES_KEY, response_cache, product_key
+from app.core.config import settings
+from app.core.filters import ProductFilter, containment_documents
+from app.core.catalog_snapshot import catalog_snapshot
+from app.core.category_tree import category_tree
+from app.core.coupons import CouponEntry, coupon_index, normalize_code
+from app.core.guest_carts import GuestCart, GuestCartLine, guest_carts
+from app.core.jobs import enqueue, job_handler, job_workers
+from app.core.search import search_backend
 
 # ===================================================================
 # User CRUD
 # ===================================================================
 
+async def get_user(db: AsyncSession, user_id: UUID) -> Optional[models.User]:
+    return await db.get(models.User, user_id)
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
     result = await db.execute(select(models.User).filter(models.User.email == email))
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User:
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await security.get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         full_name=user.full_name,
@@ -33,21 +54,230 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     user = await get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    # End the read first: a login waiting for the hashing pool must not hold a
+    # pooled connection, or a login storm starves every other route of them
+    await db.commit()
+    if not await security.verify_password(password, user.password_hash):
         return None
     return user
 
+async def update_user_flags(db: AsyncSession, user_id: UUID, flags: schemas.UserFlagsUpdate) -> Optional[models.User]:
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return None
+
+    for field, value in flags.dict(exclude_unset=True).items():
+        setattr(db_user, field, value)
+
+    await db.commit()
+    await db.refresh(db_user)
+    # Cached principals carry is_active/is_staff, so they must not outlive the change
+    invalidate_principal(user_id)
+    return db_user
+
 # ===================================================================
 # Product CRUD
 # ===================================================================
 
-async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Product]:
+def _in_category_subtree(query, category_slug: Optional[str]):
+    # Products in the category or any of its descendants, resolved through
+    # the closure table inside the same statement
+    if not category_slug:
+        return query
+    subtree = (
+        select(models.CategoryClosure.descendant_id)
+        .join(models.Category, models.Category.id == models.CategoryClosure.ancestor_id)
+        .filter(models.Category.slug == category_slug)
+    )
+    return query.filter(models.Product.category_id.in_(subtree))
+
+def _matching_attributes(query, filters: ProductFilter):
+    # Attribute terms become JSONB containment tests (GIN indexes on both
+    # attributes columns); variant terms and the price range must hold for
+    # the same variant and are resolved in one IN subquery.
+    for key, options in filters.attributes.items():
+        query = query.filter(or_(*(
+            models.Product.attributes.contains(document)
+            for value in options for document in containment_documents(key, value)
+        )))
+    if filters.has_variant_terms:
+        variant = models.ProductVariant
+        variants = select(variant.product_id)
+        for key, options in filters.variant_attributes.items():
+            variants = variants.filter(or_(*(
+                variant.attributes.contains(document)
+                for value in options for document in containment_documents(key, value)
+            )))
+        if filters.min_price is not None:
+            variants = variants.filter(variant.price >= filters.min_price)
+        if filters.max_price is not None:
+            variants = variants.filter(variant.price <= filters.max_price)
+        query = query.filter(models.Product.id.in_(variants))
+    return query
+
+def _filter_products(
+    query, category: Optional[str], filters: Optional[ProductFilter],
+    min_rating: Optional[float], join_rating: bool = False,
+):
+    # WHERE clauses shared by the listing and its facet counts. Filtering or
+    # sorting by rating joins the rating aggregate and only covers reviewed
+    # products, so both are served by ix_product_rating_stats_average.
+    query = _in_category_subtree(query, category)
+    if filters:
+        query = _matching_attributes(query, filters)
+    if join_rating or min_rating is not None:
+        stats = models.ProductRatingStats
+        query = (
+            query.join(stats, stats.product_id == models.Product.id)
+            # Literal so the planner can match the partial index predicate
+            .filter(stats.review_count > literal_column("0"))
+        )
+        if min_rating is not None:
+            query = query.filter(stats.average_rating >= min_rating)
+    return query
+
+def _product_listing(
+    category: Optional[str], sort: str, min_rating: Optional[float], filters: Optional[ProductFilter]
+):
+    # Returns the listing query and its (key, id) sort columns
+    query = select(models.Product).options(
+        selectinload(models.Product.variants), selectinload(models.Product.category)
+    )
+    query = _filter_products(query, category, filters, min_rating, join_rating=sort == "rating")
+    if sort == "rating" or min_rating is not None:
+        query = query.options(contains_eager(models.Product.rating))
+    if sort == "rating":
+        keys = (models.ProductRatingStats.average_rating, models.ProductRatingStats.product_id)
+    else:
+        keys = (models.Product.created_at, models.Product.id)
+    return query.order_by(keys[0].desc(), keys[1].desc()), keys
+
+async def get_products(
+    db: AsyncSession, skip: int = 0, limit: int = 100, category: Optional[str] = None,
+    sort: str = "newest", min_rating: Optional[float] = None, filters: Optional[ProductFilter] = None,
+) -> List[models.Product]:
+    # Offset pagination, kept for compatibility. Prefer get_products_page.
+    query, _ = _product_listing(category, sort, min_rating, filters)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_products_page(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, category: Optional[str] = None,
+    sort: str = "newest", min_rating: Optional[float] = None, filters: Optional[ProductFilter] = None,
+) -> Tuple[List[models.Product], Optional[str]]:
+    # Keyset pagination over (created_at, id), served by ix_products_created_at_id,
+    # or over (average_rating, product_id) when sorting by rating.
+    # Raises InvalidCursor if the cursor cannot be decoded.
+    query, keys = _product_listing(category, sort, min_rating, filters)
+    if cursor:
+        last_key, last_id = decode_rating_cursor(cursor) if sort == "rating" else decode_cursor(cursor)
+        query = query.filter(tuple_(*keys) < (last_key, last_id))
+    result = await db.execute(query.limit(limit + 1))
+    products = result.scalars().all()
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        if sort == "rating":
+            next_cursor = encode_rating_cursor(last.rating.average_rating, last.id)
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    return products, next_cursor
+
+def _attribute_pairs(attributes):
+    # key/value rows of a JSONB object; anything else yields no rows
+    document = case((func.jsonb_typeof(attributes) == "object", attributes), else_=literal_column("'{}'::jsonb"))
+    return func.jsonb_each_text(document).table_valued("key", "value").lateral()
+
+async def get_product_facets(
+    db: AsyncSession, category: Optional[str] = None, min_rating: Optional[float] = None,
+    filters: Optional[ProductFilter] = None,
+) -> List[Tuple[str, str, str, int]]:
+    # Counts of matching products per attribute value, for the keys listed in
+    # PRODUCT_FACET_ATTRIBUTES and VARIANT_FACET_ATTRIBUTES, in one statement.
+    # Returns (scope, key, value, count) with at most FACET_VALUES_PER_KEY
+    # values per key, most frequent first.
+    matching = _filter_products(
+        select(models.Product.id, models.Product.attributes), category, filters, min_rating
+    ).cte("matching")
+
+    product_pairs = _attribute_pairs(matching.c.attributes)
+    product_facets = (
+        select(literal("product").label("scope"), product_pairs.c.key, product_pairs.c.value,
+               func.count().label("count"))
+        .select_from(matching)
+        .join(product_pairs, true())
+        .filter(product_pairs.c.key.in_(settings.PRODUCT_FACET_ATTRIBUTES))
+        .group_by(product_pairs.c.key, product_pairs.c.value)
+    )
+    variant = models.ProductVariant
+    variant_pairs = _attribute_pairs(variant.attributes)
+    variant_facets = (
+        select(literal("variant"), variant_pairs.c.key, variant_pairs.c.value,
+               func.count(distinct(variant.product_id)))
+        .select_from(variant)
+        .join(matching, matching.c.id == variant.product_id)
+        .join(variant_pairs, true())
+        .filter(variant_pairs.c.key.in_(settings.VARIANT_FACET_ATTRIBUTES))
+        .group_by(variant_pairs.c.key, variant_pairs.c.value)
+    )
+    result = await db.execute(union_all(product_facets, variant_facets))
+
+    facets = sorted(result.all(), key=lambda row: (row[0], row[1], -row[3], row[2]))
+    per_key: Dict[Tuple[str, str], int] = {}
+    top = []
+    for scope, key, value, count in facets:
+        seen = per_key.get((scope, key), 0)
+        if seen < settings.FACET_VALUES_PER_KEY:
+            per_key[(scope, key)] = seen + 1
+            top.append((scope, key, value, count))
+    return top
+
+async def get_products_by_ids(db: AsyncSession, product_ids: List[UUID]) -> List[models.Product]:
+    # Returned in the order of product_ids; unknown ids are skipped
+    if not product_ids:
+        return []
     result = await db.execute(
         select(models.Product)
-        .options(selectinload(models.Product.variants))
-        .offset(skip).limit(limit)
+        .options(selectinload(models.Product.variants), selectinload(models.Product.category))
+        .filter(models.Product.id.in_(product_ids))
     )
-    return result.scalars().all()
+    by_id = {product.id: product for product in result.scalars().all()}
+    return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+# Lookup keys for get_products_by_keys: ("id", UUID), ("slug", str) or ("variant_id", UUID)
+ProductKey = Tuple[str, object]
+
+async def get_products_by_keys(db: AsyncSession, keys: List[ProductKey]) -> Dict[ProductKey, models.Product]:
+    # Resolves any mix of keys with one product query (plus the variant and
+    # category selectinloads); keys without a product are left out
+    ids = [value for kind, value in keys if kind == "id"]
+    slugs = [value for kind, value in keys if kind == "slug"]
+    variant_ids = [value for kind, value in keys if kind == "variant_id"]
+    conditions = []
+    if ids:
+        conditions.append(models.Product.id.in_(ids))
+    if slugs:
+        conditions.append(models.Product.slug.in_(slugs))
+    if variant_ids:
+        conditions.append(models.Product.id.in_(
+            select(models.ProductVariant.product_id).filter(models.ProductVariant.id.in_(variant_ids))
+        ))
+    if not conditions:
+        return {}
+    result = await db.execute(
+        select(models.Product)
+        .options(selectinload(models.Product.variants), selectinload(models.Product.category))
+        .filter(or_(*conditions))
+    )
+    found: Dict[ProductKey, models.Product] = {}
+    for product in result.scalars().all():
+        found[("id", product.id)] = product
+        found[("slug", product.slug)] = product
+        for variant in product.variants:
+            found[("variant_id", variant.id)] = product
+    return {key: found[key] for key in keys if key in found}
 
 async def get_product_by_slug(db: AsyncSession, slug: str) -> Optional[models.Product]:
     result = await db.execute(
@@ -62,148 +292,752 @@ async def get_categories(db: AsyncSession) -> List[models.Category]:
     return result.scalars().all()
 
 
+# ===================================================================
+# Category Hierarchy
+# ===================================================================
+
+# Guards the closure rebuild against parent_id cycles in existing data
+MAX_CATEGORY_DEPTH = 32
+
+async def _invalidate_categories(db: AsyncSession, category_id: UUID) -> None:
+    category_tree.invalidate()
+    await response_cache.delete(CATEGORIES_KEY)
+    # Snapshot rows embed their product's category
+    result = await db.execute(select(models.Product.id).filter(models.Product.category_id == category_id))
+    await catalog_snapshot.refresh(db, result.scalars().all())
+
+async def create_category(db: AsyncSession, category: schemas.CategoryCreate) -> models.Category:
+    # Raises ValueError if the parent does not exist
+    if category.parent_id and await db.get(models.Category, category.parent_id) is None:
+        raise ValueError("Parent category not found")
+    db_category = models.Category(
+        name=category.name,
+        slug=category.slug or slugify(category.name),
+        parent_id=category.parent_id,
+    )
+    db.add(db_category)
+    await db.flush()
+
+    # Self link, plus a link from every ancestor of the parent
+    closure = models.CategoryClosure
+    ancestors = select(closure.ancestor_id, literal(db_category.id, PG_UUID), closure.depth + 1).filter(
+        closure.descendant_id == category.parent_id
+    )
+    itself = select(literal(db_category.id, PG_UUID), literal(db_category.id, PG_UUID), literal(0))
+    await db.execute(
+        insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            union_all(itself, ancestors) if category.parent_id else itself,
+        )
+    )
+    await db.commit()
+    await db.refresh(db_category)
+    await _invalidate_categories(db, db_category.id)
+    return db_category
+
+async def _move_category_subtree(db: AsyncSession, category_id: UUID, new_parent_id: Optional[UUID]) -> None:
+    closure = models.CategoryClosure
+    subtree = select(closure.descendant_id).filter(closure.ancestor_id == category_id)
+
+    # Detach the subtree from its old ancestors, keeping links inside it
+    await db.execute(
+        delete(closure)
+        .filter(closure.descendant_id.in_(subtree))
+        .filter(closure.ancestor_id.not_in(subtree))
+    )
+    if new_parent_id is None:
+        return
+    # Link every ancestor of the new parent to every node of the subtree
+    above, below = aliased(closure), aliased(closure)
+    await db.execute(
+        insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .filter(above.descendant_id == new_parent_id, below.ancestor_id == category_id),
+        )
+    )
+
+async def update_category(
+    db: AsyncSession, category_id: UUID, category_in: schemas.CategoryUpdate
+) -> Optional[models.Category]:
+    # Raises ValueError if the new parent is unknown or inside the category's subtree
+    db_category = await db.get(models.Category, category_id)
+    if db_category is None:
+        return None
+    update_data = category_in.dict(exclude_unset=True)
+
+    new_parent_id = update_data.get("parent_id", db_category.parent_id)
+    if new_parent_id != db_category.parent_id:
+        if new_parent_id is not None:
+            if await db.get(models.Category, new_parent_id) is None:
+                raise ValueError("Parent category not found")
+            cycle = await db.execute(
+                select(models.CategoryClosure.depth).filter(
+                    models.CategoryClosure.ancestor_id == category_id,
+                    models.CategoryClosure.descendant_id == new_parent_id,
+                )
+            )
+            if cycle.first() is not None:
+                raise ValueError("A category cannot be moved below itself or its descendants")
+        await _move_category_subtree(db, category_id, new_parent_id)
+
+    for field, value in update_data.items():
+        setattr(db_category, field, value)
+    await db.commit()
+    await db.refresh(db_category)
+    await _invalidate_categories(db, db_category.id)
+    return db_category
+
+async def sync_category_closure(db: AsyncSession) -> None:
+    # Add closure rows missing for categories written outside the crud
+    # functions (seeds, manual SQL). Idempotent and safe to run from
+    # several workers at once.
+    tree = (
+        select(
+            models.Category.id.label("ancestor_id"),
+            models.Category.id.label("descendant_id"),
+            literal(0).label("depth"),
+        )
+        .cte("tree", recursive=True)
+    )
+    child = aliased(models.Category)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .join(child, child.parent_id == tree.c.descendant_id)
+        .filter(tree.c.depth < MAX_CATEGORY_DEPTH)
+    )
+    await db.execute(
+        pg_insert(models.CategoryClosure)
+        .from_select(["ancestor_id", "descendant_id", "depth"], select(tree))
+        .on_conflict_do_nothing()
+    )
+    await db.commit()
+
+
+# ===================================================================
+# Review CRUD
+# ===================================================================
+
+def _rating_delta(rating: int, sign: int) -> dict:
+    # Column increments for adding (sign=1) or removing (sign=-1) one review
+    stats = models.ProductRatingStats
+    return {
+        "review_count": stats.review_count + sign,
+        "rating_sum": stats.rating_sum + sign * rating,
+        f"rating_{rating}": getattr(stats, f"rating_{rating}") + sign,
+    }
+
+async def get_reviews_page(
+    db: AsyncSession, product_id: UUID, cursor: Optional[str] = None, limit: int = 20
+) -> Tuple[List[models.Review], Optional[str]]:
+    # Newest first, keyset over ix_reviews_product_created_at_id.
+    # Raises InvalidCursor if the cursor cannot be decoded.
+    query = (
+        select(models.Review)
+        .filter(models.Review.product_id == product_id)
+        .order_by(models.Review.created_at.desc(), models.Review.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(models.Review.created_at, models.Review.id) < (created_at, last_id))
+    result = await db.execute(query)
+    reviews = result.scalars().all()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_cursor(reviews[-1].created_at, reviews[-1].id)
+    return reviews, next_cursor
+
+async def create_review(
+    db: AsyncSession, product: models.Product, user_id: UUID, review: schemas.ReviewCreate
+) -> Optional[models.Review]:
+    # Inserts the review and bumps the product's rating aggregate in one
+    # transaction. Returns None if the user already reviewed the product.
+    result = await db.execute(
+        pg_insert(models.Review)
+        .values(product_id=product.id, user_id=user_id, **review.dict())
+        .on_conflict_do_nothing(constraint="uq_reviews_product_user")
+        .returning(models.Review)
+    )
+    db_review = result.scalars().first()
+    if db_review is None:
+        return None
+
+    stats = pg_insert(models.ProductRatingStats).values(
+        product_id=product.id, review_count=1, rating_sum=review.rating, **{f"rating_{review.rating}": 1}
+    )
+    await db.execute(
+        stats.on_conflict_do_update(
+            index_elements=[models.ProductRatingStats.product_id], set_=_rating_delta(review.rating, 1)
+        )
+    )
+    await db.commit()
+    await response_cache.delete(product_key(product.slug))
+    return db_review
+
+async def delete_review(
+    db: AsyncSession, product: models.Product, review_id: UUID, user_id: Optional[UUID] = None
+) -> bool:
+    # Deletes the review and decrements the aggregate in one transaction.
+    # With user_id, only that user's review can be deleted.
+    query = delete(models.Review).filter(
+        models.Review.id == review_id, models.Review.product_id == product.id
+    )
+    if user_id is not None:
+        query = query.filter(models.Review.user_id == user_id)
+    result = await db.execute(query.returning(models.Review.rating))
+    rating = result.scalar()
+    if rating is None:
+        return False
+
+    await db.execute(
+        update(models.ProductRatingStats)
+        .filter(models.ProductRatingStats.product_id == product.id)
+        .values(_rating_delta(rating, -1))
+    )
+    await db.commit()
+    await response_cache.delete(product_key(product.slug))
+    return True
+
+
 # ===================================================================
 # Cart CRUD (Simplified - assumes one cart per user)
 # ===================================================================
 
 async def get_cart_by_user(db: AsyncSession, user_id: UUID) -> Optional[models.Cart]:
+    # Read only: the cart row is created by the first item upsert
     result = await db.execute(
         select(models.Cart)
         .options(selectinload(models.Cart.items).selectinload(models.CartItem.variant))
         .filter(models.Cart.user_id == user_id)
     )
-    cart = result.scalars().first()
-    if not cart:
-        # Create a cart if it doesn't exist
-        cart = models.Cart(user_id=user_id)
-        db.add(cart)
-        await db.commit()
-        await db.refresh(cart)
-    return cart
-
-async def add_item_to_cart(db: AsyncSession, user_id: UUID, item: schemas.CartItemCreate) -> models.Cart:
-    cart = await get_cart_by_user(db, user_id)
-    # Check if item already in cart
-    existing_item = None
-    for cart_item in cart.items:
-        if cart_item.variant_id == item.variant_id:
-            existing_item = cart_item
-            break
-    
-    if existing_item:
-        existing_item.quantity += item.quantity
-    else:
-        # Fetch the price from the product variant
-        variant_result = await db.execute(
-            select(models.ProductVariant).filter(models.ProductVariant.id == item.variant_id)
+    return result.scalars().first()
+
+def _cart_upsert_cte(user_id: UUID):
+    # Get-or-create the user's cart inside the calling statement
+    stmt = pg_insert(models.Cart).values(user_id=user_id)
+    return (
+        stmt.on_conflict_do_update(index_elements=[models.Cart.user_id], set_={"updated_at": func.now()})
+        .returning(models.Cart.id)
+        .cte("cart")
+    )
+
+async def _upsert_cart_items(db: AsyncSession, user_id: UUID, changes: List[Tuple[UUID, int]], increment: bool):
+    # One statement: get-or-create the cart, price the variants and upsert
+    # the items. Unknown variants produce no row.
+    cart = _cart_upsert_cte(user_id)
+    changes_table = values(
+        column("variant_id", PG_UUID(as_uuid=True)),
+        column("quantity", Integer),
+        name="changes",
+    ).data(changes)
+    source = (
+        select(
+            func.gen_random_uuid(), cart.c.id, models.ProductVariant.id,
+            changes_table.c.quantity, models.ProductVariant.price,
+        )
+        .select_from(cart.join(changes_table, true()))
+        .join(models.ProductVariant, models.ProductVariant.id == changes_table.c.variant_id)
+    )
+    stmt = pg_insert(models.CartItem).from_select(
+        ["id", "cart_id", "variant_id", "quantity", "price_at_add"], source
+    )
+    quantity = models.CartItem.quantity + stmt.excluded.quantity if increment else stmt.excluded.quantity
+    stmt = (
+        stmt.on_conflict_do_update(
+            constraint="uq_cart_items_cart_variant", set_={"quantity": quantity}
         )
-        variant = variant_result.scalars().first()
-        if not variant:
-            raise ValueError("Product variant not found")
-        
-        new_item = models.CartItem(
-            cart_id=cart.id,
-            variant_id=item.variant_id,
-            quantity=item.quantity,
-            price_at_add=variant.price
+        .returning(
+            models.CartItem.id, models.CartItem.variant_id,
+            models.CartItem.quantity, models.CartItem.price_at_add,
         )
-        db.add(new_item)
-    
+        .add_cte(cart, nest_here=True)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+async def add_item_to_cart(db: AsyncSession, user_id: UUID, item: schemas.CartItemCreate):
+    # Adds to the quantity if the variant is already in the cart.
+    # Raises ValueError if the variant does not exist.
+    lines = await _upsert_cart_items(db, user_id, [(item.variant_id, item.quantity)], increment=True)
+    if not lines:
+        await db.rollback()
+        raise ValueError("Product variant not found")
+    await db.commit()
+    return lines[0]
+
+async def apply_cart_changes(
+    db: AsyncSession, user_id: UUID, changes: List[schemas.CartItemChange]
+) -> Tuple[list, List[UUID], List[UUID]]:
+    # Sets each variant's quantity (0 removes it) in one transaction.
+    # Returns (updated lines, removed variant ids, unknown variant ids).
+    targets = {change.variant_id: change.quantity for change in changes}
+    upserts = [(variant_id, qty) for variant_id, qty in targets.items() if qty > 0]
+    removals = [variant_id for variant_id, qty in targets.items() if qty == 0]
+
+    lines = await _upsert_cart_items(db, user_id, upserts, increment=False) if upserts else []
+    removed = []
+    if removals:
+        result = await db.execute(
+            delete(models.CartItem)
+            .where(
+                models.CartItem.cart_id == models.Cart.id,
+                models.Cart.user_id == user_id,
+                models.CartItem.variant_id.in_(removals),
+            )
+            .returning(models.CartItem.variant_id)
+            .execution_options(synchronize_session=False)
+        )
+        removed = result.scalars().all()
     await db.commit()
-    await db.refresh(cart)
-    return cart
 
-async def update_cart_item(db: AsyncSession, item_id: UUID, quantity: int, user_id: UUID) -> Optional[models.Cart]:
-    # Get the cart item and verify it belongs to the user
+    found = {line.variant_id for line in lines}
+    missing = [variant_id for variant_id, _ in upserts if variant_id not in found]
+    return lines, removed, missing
+
+async def update_cart_item(db: AsyncSession, item_id: UUID, quantity: int, user_id: UUID):
+    # Returns the updated line, or None if the item is not in the user's cart.
+    if quantity <= 0:
+        await remove_cart_item(db, item_id=item_id, user_id=user_id)
+        return None
     result = await db.execute(
-        select(models.CartItem)
-        .join(models.Cart)
-        .filter(models.CartItem.id == item_id)
-        .filter(models.Cart.user_id == user_id)
+        update(models.CartItem)
+        .where(
+            models.CartItem.id == item_id,
+            models.CartItem.cart_id == models.Cart.id,
+            models.Cart.user_id == user_id,
+        )
+        .values(quantity=quantity)
+        .returning(
+            models.CartItem.id, models.CartItem.variant_id,
+            models.CartItem.quantity, models.CartItem.price_at_add,
+        )
+        .execution_options(synchronize_session=False)
     )
-    cart_item = result.scalars().first()
-    
-    if not cart_item:
+    line = result.first()
+    await db.commit()
+    return line
+
+async def remove_cart_item(db: AsyncSession, item_id: UUID, user_id: UUID) -> bool:
+    result = await db.execute(
+        delete(models.CartItem)
+        .where(
+            models.CartItem.id == item_id,
+            models.CartItem.cart_id == models.Cart.id,
+            models.Cart.user_id == user_id,
+        )
+        .returning(models.CartItem.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first() is not None
+    await db.commit()
+    return deleted
+
+# ===================================================================
+# Guest Carts
+# ===================================================================
+# Anonymous carts live in the guest cart store under the visitor's session
+# id; Postgres is only read, to price and display variants, until the
+# visitor logs in and merge_guest_cart persists the cart.
+
+async def _variant_prices(db: AsyncSession, variant_ids: List[UUID]) -> Dict[UUID, Decimal]:
+    if not variant_ids:
+        return {}
+    result = await db.execute(
+        select(models.ProductVariant.id, models.ProductVariant.price)
+        .filter(models.ProductVariant.id.in_(variant_ids))
+    )
+    return dict(result.all())
+
+async def get_guest_cart(db: AsyncSession, session_id: Optional[str]) -> Optional[dict]:
+    # Returns the cart shaped like schemas.Cart, or None if the session has
+    # no cart. Lines whose variant no longer exists are left out.
+    cart = await guest_carts.get(session_id)
+    if cart is None:
         return None
-    
+    variants = {}
+    if cart.lines:
+        result = await db.execute(
+            select(models.ProductVariant).filter(models.ProductVariant.id.in_(list(cart.lines)))
+        )
+        variants = {variant.id: variant for variant in result.scalars().all()}
+    items = [
+        {"id": line.id, "variant_id": line.variant_id, "quantity": line.quantity,
+         "price_at_add": line.price_at_add, "variant": variants[line.variant_id]}
+        for line in cart.lines.values()
+        if line.variant_id in variants
+    ]
+    return {"id": cart.id, "items": items, "coupon_code": cart.coupon_code}
+
+async def add_item_to_guest_cart(
+    db: AsyncSession, session_id: str, item: schemas.CartItemCreate
+) -> GuestCartLine:
+    # Same semantics as add_item_to_cart. Raises ValueError if the variant
+    # does not exist and GuestCartFull past GUEST_CART_MAX_LINES.
+    prices = await _variant_prices(db, [item.variant_id])
+    if item.variant_id not in prices:
+        raise ValueError("Product variant not found")
+
+    def add(cart: GuestCart) -> GuestCartLine:
+        current = cart.lines.get(item.variant_id)
+        quantity = item.quantity + (current.quantity if current else 0)
+        return cart.set_quantity(item.variant_id, quantity, prices[item.variant_id])
+
+    return await guest_carts.update(session_id, add)
+
+async def apply_guest_cart_changes(
+    db: AsyncSession, session_id: str, changes: List[schemas.CartItemChange]
+) -> Tuple[List[GuestCartLine], List[UUID], List[UUID]]:
+    # Same semantics and return value as apply_cart_changes
+    targets = {change.variant_id: change.quantity for change in changes}
+    prices = await _variant_prices(db, [variant_id for variant_id, qty in targets.items() if qty > 0])
+
+    def apply(cart: GuestCart) -> Tuple[List[GuestCartLine], List[UUID], List[UUID]]:
+        lines, removed, missing = [], [], []
+        for variant_id, quantity in targets.items():
+            if quantity == 0:
+                if cart.lines.pop(variant_id, None) is not None:
+                    removed.append(variant_id)
+            elif variant_id in prices:
+                lines.append(cart.set_quantity(variant_id, quantity, prices[variant_id]))
+            else:
+                missing.append(variant_id)
+        return lines, removed, missing
+
+    return await guest_carts.update(session_id, apply)
+
+async def update_guest_cart_item(session_id: str, item_id: UUID, quantity: int) -> Optional[GuestCartLine]:
+    # Returns the updated line, or None if the item is not in the cart
     if quantity <= 0:
-        await db.delete(cart_item)
+        await remove_guest_cart_item(session_id, item_id)
+        return None
+
+    def set_quantity(cart: GuestCart) -> Optional[GuestCartLine]:
+        line = cart.line_by_id(item_id)
+        if line is not None:
+            line.quantity = quantity
+        return line
+
+    return await guest_carts.update(session_id, set_quantity, create=False)
+
+async def remove_guest_cart_item(session_id: str, item_id: UUID) -> bool:
+    def remove(cart: GuestCart) -> bool:
+        line = cart.line_by_id(item_id)
+        if line is not None:
+            del cart.lines[line.variant_id]
+        return line is not None
+
+    return bool(await guest_carts.update(session_id, remove, create=False))
+
+async def merge_guest_cart(db: AsyncSession, user_id: UUID, session_id: Optional[str]) -> int:
+    # Adds the guest cart's quantities to the user's cart with the single
+    # statement used by add_item_to_cart, then drops the guest cart.
+    # Returns the number of lines merged.
+    cart = await guest_carts.get(session_id)
+    if cart is None:
+        return 0
+    lines = []
+    if cart.lines:
+        changes = [(line.variant_id, line.quantity) for line in cart.lines.values()]
+        lines = await _upsert_cart_items(db, user_id, changes, increment=True)
+    if cart.coupon_code:
+        await _set_cart_coupon(db, user_id, cart.coupon_code)
+    await db.commit()
+    await guest_carts.delete(session_id)
+    return len(lines)
+
+
+# ===================================================================
+# Coupons
+# ===================================================================
+# Codes are looked up in the in-memory coupon_index; the database is only
+# touched to store a cart's code and to count a redemption at checkout.
+
+class CouponUnavailable(ValueError):
+    pass
+
+def cart_totals(lines: List[Tuple[Decimal, int]], coupon_code: Optional[str]) -> dict:
+    # lines: (price_at_add, quantity) pairs. A stored code that is no longer
+    # redeemable stays on the cart with no discount; checkout rejects it.
+    subtotal = sum((Decimal(price) * quantity for price, quantity in lines), Decimal(0))
+    entry = coupon_index.get(coupon_code) if coupon_code else None
+    discount = entry.discount(subtotal) if entry else Decimal(0)
+    return {"coupon_code": coupon_code, "subtotal": subtotal, "discount": discount, "total": subtotal - discount}
+
+def _coupon_entry(code: str) -> CouponEntry:
+    entry = coupon_index.get(code)
+    if entry is None:
+        raise CouponUnavailable("Coupon not found or expired")
+    return entry
+
+async def _set_cart_coupon(db: AsyncSession, user_id: UUID, code: Optional[str]) -> None:
+    # Sets (get-or-create) or clears the cart's code in one statement
+    if code:
+        stmt = pg_insert(models.Cart).values(user_id=user_id, meta_data={"coupon_code": code})
+        merged = func.coalesce(models.Cart.meta_data, literal_column("'{}'::jsonb")).op("||")(stmt.excluded.meta_data)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.Cart.user_id], set_={"meta_data": merged, "updated_at": func.now()}
+        ))
     else:
-        cart_item.quantity = quantity
-    
+        await db.execute(
+            update(models.Cart)
+            .where(models.Cart.user_id == user_id)
+            .values(meta_data=models.Cart.meta_data.op("-")(literal_column("'coupon_code'")))
+            .execution_options(synchronize_session=False)
+        )
+
+async def apply_cart_coupon(db: AsyncSession, user_id: UUID, code: str) -> CouponEntry:
+    # Raises CouponUnavailable for unknown, inactive, used up or expired codes
+    entry = _coupon_entry(code)
+    await _set_cart_coupon(db, user_id, entry.code)
     await db.commit()
-    
-    # Return the updated cart
-    return await get_cart_by_user(db, user_id)
+    return entry
 
-async def remove_cart_item(db: AsyncSession, item_id: UUID, user_id: UUID) -> bool:
-    # Get the cart item and verify it belongs to the user
+async def remove_cart_coupon(db: AsyncSession, user_id: UUID) -> None:
+    await _set_cart_coupon(db, user_id, None)
+    await db.commit()
+
+async def apply_guest_cart_coupon(session_id: str, code: str) -> CouponEntry:
+    entry = _coupon_entry(code)
+
+    def apply(cart: GuestCart) -> None:
+        cart.coupon_code = entry.code
+
+    await guest_carts.update(session_id, apply)
+    return entry
+
+async def remove_guest_cart_coupon(session_id: Optional[str]) -> None:
+    def remove(cart: GuestCart) -> None:
+        cart.coupon_code = None
+
+    await guest_carts.update(session_id, remove, create=False)
+
+async def redeem_coupon(db: AsyncSession, entry: CouponEntry) -> bool:
+    # Counts one use in a single conditional UPDATE, so concurrent
+    # redemptions can never exceed usage_limit. Fails if the code became
+    # unredeemable or its discount changed since the cart was priced. The
+    # row stays locked until the caller commits, so checkout runs it last.
+    coupon = models.Coupon
     result = await db.execute(
-        select(models.CartItem)
-        .join(models.Cart)
-        .filter(models.CartItem.id == item_id)
-        .filter(models.Cart.user_id == user_id)
+        update(coupon)
+        .where(
+            coupon.id == entry.id,
+            coupon.is_active.is_(True),
+            or_(coupon.usage_limit.is_(None), coupon.used < coupon.usage_limit),
+            or_(coupon.expires_at.is_(None), coupon.expires_at > func.now()),
+            coupon.discount_type == entry.discount_type,
+            coupon.discount_value == entry.discount_value,
+        )
+        .values(used=coupon.used + 1)
+        .returning(coupon.id)
+        .execution_options(synchronize_session=False)
     )
-    cart_item = result.scalars().first()
-    
-    if not cart_item:
-        return False
-    
-    await db.delete(cart_item)
+    return result.first() is not None
+
+async def create_coupon(db: AsyncSession, coupon: schemas.CouponCreate) -> models.Coupon:
+    # Raises ValueError for a duplicate code or a percentage over 100
+    code = normalize_code(coupon.code)
+    if coupon.discount_type == "percent" and coupon.discount_value > 100:
+        raise ValueError("A percent discount cannot exceed 100")
+    existing = await db.scalar(select(models.Coupon.id).filter(func.upper(models.Coupon.code) == code))
+    if existing is not None:
+        raise ValueError(f"Coupon code '{code}' already exists")
+    db_coupon = models.Coupon(**coupon.dict(exclude={"code"}), code=code)
+    db.add(db_coupon)
     await db.commit()
-    return True
+    await db.refresh(db_coupon)
+    coupon_index.put(db_coupon)
+    return db_coupon
+
+async def update_coupon(
+    db: AsyncSession, coupon_id: UUID, coupon_in: schemas.CouponUpdate
+) -> Optional[models.Coupon]:
+    # Raises ValueError if the new usage_limit is below the uses so far
+    db_coupon = await db.get(models.Coupon, coupon_id)
+    if db_coupon is None:
+        return None
+    changes = coupon_in.dict(exclude_unset=True)
+    if changes.get("usage_limit") is not None and changes["usage_limit"] < db_coupon.used:
+        raise ValueError(f"Coupon has already been used {db_coupon.used} times")
+    for field, value in changes.items():
+        setattr(db_coupon, field, value)
+    await db.commit()
+    await db.refresh(db_coupon)
+    coupon_index.put(db_coupon)
+    return db_coupon
+
 
 # ===================================================================
 # Order CRUD
 # ===================================================================
 
-async def get_orders_by_user(db: AsyncSession, user_id: UUID) -> List[models.Order]:
-    result = await db.execute(
-        select(models.Order)
-        .filter(models.Order.user_id == user_id)
-        .order_by(models.Order.created_at.desc())
-    )
-    return result.scalars().all()
+class InsufficientStock(ValueError):
+    def __init__(self, variant_ids: List[UUID]):
+        super().__init__("Insufficient stock")
+        self.variant_ids = variant_ids
+
+class UnknownVariants(ValueError):
+    def __init__(self, variant_ids: List[UUID]):
+        super().__init__("Unknown variants")
+        self.variant_ids = variant_ids
 
 async def create_order_from_cart(db: AsyncSession, user_id: UUID) -> Optional[models.Order]:
-    # Get the user's cart with items
-    cart = await get_cart_by_user(db, user_id)
-    if not cart or not cart.items:
+    # Checkout runs a fixed number of statements regardless of cart size:
+    # lock, insert order, insert items, insert summary, insert inventory
+    # events, decrement stock, clear cart, enqueue post-processing, plus
+    # clearing and redeeming the coupon when the cart has one. Raises
+    # InsufficientStock or CouponUnavailable (nothing is written) if any
+    # variant cannot cover the requested quantity or the cart's coupon can
+    # no longer be redeemed.
+    # Payment and shipment creation run later, from the job queue.
+
+    # Lock the variants (and the cart items, so a concurrent checkout of the
+    # same cart waits and then finds it empty). Rows are locked in variant id
+    # order so overlapping carts cannot deadlock.
+    result = await db.execute(
+        select(
+            models.CartItem.id,
+            models.CartItem.added_at,
+            models.CartItem.cart_id,
+            models.CartItem.variant_id,
+            models.CartItem.quantity,
+            models.CartItem.price_at_add,
+            models.ProductVariant.stock,
+            models.ProductVariant.product_id,
+            models.Cart.meta_data,
+        )
+        .join(models.Cart, models.Cart.id == models.CartItem.cart_id)
+        .join(models.ProductVariant, models.ProductVariant.id == models.CartItem.variant_id)
+        .filter(models.Cart.user_id == user_id)
+        .order_by(models.CartItem.variant_id, models.CartItem.id)
+        .with_for_update(of=(models.ProductVariant, models.CartItem))
+    )
+    rows = result.all()
+    if not rows:
+        await db.rollback()
         return None
-    
-    # Calculate total amount
-    total_amount = 0.0
-    for item in cart.items:
-        total_amount += float(item.price_at_add) * item.quantity
-    
-    # Create the order
+
+    cart_id = rows[0].cart_id
+    requested: Dict[UUID, int] = {}
+    available: Dict[UUID, int] = {}
+    for row in rows:
+        requested[row.variant_id] = requested.get(row.variant_id, 0) + row.quantity
+        available[row.variant_id] = row.stock or 0
+
+    short = [variant_id for variant_id, qty in requested.items() if qty > available[variant_id]]
+    if short:
+        await db.rollback()
+        raise InsufficientStock(short)
+
+    # Priced from the in-memory index; redeem_coupon below re-checks the code
+    coupon_code = (rows[0].meta_data or {}).get("coupon_code")
+    coupon = coupon_index.get(coupon_code) if coupon_code else None
+    if coupon_code and coupon is None:
+        await db.rollback()
+        raise CouponUnavailable("Coupon not found or expired")
+
+    subtotal = sum(row.price_at_add * row.quantity for row in rows)
+    discount = coupon.discount(subtotal) if coupon else Decimal(0)
+
     db_order = models.Order(
         user_id=user_id,
         status="pending",
-        total_amount=total_amount,
+        total_amount=subtotal - discount,
+        discount_amount=discount,
+        coupon_id=coupon.id if coupon else None,
         currency="USD"
     )
     db.add(db_order)
     await db.flush()  # Get the order ID
-    
-    # Create order items from cart items
-    for cart_item in cart.items:
-        order_item = models.OrderItem(
-            order_id=db_order.id,
-            variant_id=cart_item.variant_id,
-            quantity=cart_item.quantity,
-            unit_price=cart_item.price_at_add,
-            total_price=float(cart_item.price_at_add) * cart_item.quantity
-        )
-        db.add(order_item)
-    
-    # Clear the cart
-    for item in cart.items:
-        await db.delete(item)
-    
+
+    await db.execute(
+        insert(models.OrderItem),
+        [
+            {
+                "order_id": db_order.id,
+                "variant_id": row.variant_id,
+                "quantity": row.quantity,
+                "unit_price": row.price_at_add,
+                "total_price": row.price_at_add * row.quantity,
+            }
+            for row in rows
+        ],
+    )
+    # The order history row; title and thumbnail come from the line added first
+    first = min(rows, key=lambda row: (row.added_at, row.id))
+    first_product = (
+        select(models.ProductVariant.product_id)
+        .filter(models.ProductVariant.id == first.variant_id)
+        .scalar_subquery()
+    )
+    await db.execute(insert(models.OrderSummary).values(
+        order_id=db_order.id,
+        user_id=user_id,
+        status=db_order.status,
+        total_amount=db_order.total_amount,
+        discount_amount=discount,
+        currency=db_order.currency,
+        item_count=sum(requested.values()),
+        first_item_title=select(models.Product.title).filter(models.Product.id == first_product).scalar_subquery(),
+        first_item_thumbnail=_first_image_url(first_product),
+        # now() is the transaction start, the same value as orders.created_at
+        created_at=func.now(),
+    ))
+    await _append_inventory_events(
+        db, {variant_id: -qty for variant_id, qty in requested.items()}, reason="checkout"
+    )
+
+    await db.execute(delete(models.CartItem).where(models.CartItem.cart_id == cart_id))
+    await enqueue(db, [{"kind": "order.payment", "payload": {"order_id": str(db_order.id)}}])
+
+    if coupon is not None:
+        await _set_cart_coupon(db, user_id, None)
+        # Last, so the coupon row is locked only until the commit right after
+        if not await redeem_coupon(db, coupon):
+            await db.rollback()
+            coupon_index.discard(coupon.code)
+            raise CouponUnavailable("Coupon is no longer available")
+
     await db.commit()
-    await db.refresh(db_order)
-    return db_order
+    job_workers.wake()
+    # Stock changed for every product in the cart
+    await invalidate_products(db, {row.product_id for row in rows})
+    return await get_order(db, order_id=db_order.id, user_id=user_id)
+
+# Order post-processing jobs. Each runs in one transaction with its job's
+# deletion and is a no-op when retried after its work already committed.
+
+@job_handler("order.payment")
+async def create_order_payment(db: AsyncSession, payload: dict) -> None:
+    # Records the payment for a new order, then queues its shipment. The
+    # insert is a no-op when a retry or a concurrent run already recorded it.
+    order = await db.get(models.Order, UUID(payload["order_id"]))
+    if order is None:
+        return
+    result = await db.execute(
+        pg_insert(models.Payment)
+        .values(
+            order_id=order.id,
+            provider=settings.PAYMENT_PROVIDER,
+            amount=order.total_amount,
+            currency=order.currency,
+            status="pending",
+        )
+        .on_conflict_do_nothing(constraint="uq_payments_order_id")
+        .returning(models.Payment.id)
+    )
+    if result.scalar() is not None:
+        await enqueue(db, [{"kind": "order.shipment", "payload": {"order_id": str(order.id)}}])
+
+@job_handler("order.shipment")
+async def create_order_shipment(db: AsyncSession, payload: dict) -> None:
+    await db.execute(
+        pg_insert(models.Shipment)
+        .values(order_id=UUID(payload["order_id"]), provider=settings.SHIPPING_PROVIDER, status="pending")
+        .on_conflict_do_nothing(constraint="uq_shipments_order_id")
+    )
 
 async def get_order(db: AsyncSession, order_id: UUID, user_id: UUID) -> Optional[models.Order]:
     result = await db.execute(
@@ -216,21 +1050,228 @@ async def get_order(db: AsyncSession, order_id: UUID, user_id: UUID) -> Optional
     )
     return result.scalars().first()
 
-async def get_all_orders(db: AsyncSession) -> List[models.Order]:
-    result = await db.execute(
-        select(models.Order)
-        .options(
-            selectinload(models.Order.items).selectinload(models.OrderItem.variant),
-            selectinload(models.Order.user)
+def _filter_orders(query, status: Optional[str] = None,
+                   created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    if status:
+        query = query.filter(models.Order.status == status)
+    if created_from:
+        query = query.filter(models.Order.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Order.created_at < created_to)
+    return query
+
+async def get_order_summaries(
+    db: AsyncSession, user_id: Optional[UUID] = None, cursor: Optional[str] = None, limit: int = 100,
+    status: Optional[str] = None, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+) -> Tuple[List[models.OrderSummary], Optional[str]]:
+    # Keyset pagination over (created_at, order_id), newest first, on the
+    # order_summaries indexes: one query whatever the orders contain.
+    # Raises InvalidCursor if the cursor cannot be decoded.
+    summary = models.OrderSummary
+    query = select(summary).order_by(summary.created_at.desc(), summary.order_id.desc()).limit(limit + 1)
+    if user_id is not None:
+        query = query.filter(summary.user_id == user_id)
+    if status:
+        query = query.filter(summary.status == status)
+    if created_from:
+        query = query.filter(summary.created_at >= created_from)
+    if created_to:
+        query = query.filter(summary.created_at < created_to)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(summary.created_at, summary.order_id) < (created_at, last_id))
+    result = await db.execute(query)
+    summaries = result.scalars().all()
+
+    next_cursor = None
+    if len(summaries) > limit:
+        summaries = summaries[:limit]
+        next_cursor = encode_cursor(summaries[-1].created_at, summaries[-1].order_id)
+    return summaries, next_cursor
+
+def _first_image_url(product_id):
+    # Thumbnail: the product's first image in display order
+    return (
+        select(models.ProductImage.url)
+        .filter(models.ProductImage.product_id == product_id)
+        .order_by(models.ProductImage.order, models.ProductImage.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+async def backfill_order_summaries(db: AsyncSession, batch_size: int = 1000) -> int:
+    # Writes the summaries of orders that have none (orders from before the
+    # projection, or bulk-inserted ones), committing per batch of order ids.
+    # Their first item is the first order item by id, since the cart order
+    # is gone. Returns the number of summaries written.
+    items = models.OrderItem
+    item_count = (
+        select(func.coalesce(func.sum(items.quantity), 0))
+        .filter(items.order_id == models.Order.id)
+        .scalar_subquery()
+    )
+    first_item = (
+        select(models.Product.title.label("title"), _first_image_url(models.Product.id).label("thumbnail"))
+        .join(models.ProductVariant, models.ProductVariant.product_id == models.Product.id)
+        .join(items, items.variant_id == models.ProductVariant.id)
+        .filter(items.order_id == models.Order.id)
+        .order_by(items.id)
+        .limit(1)
+        .lateral("first_item")
+    )
+    columns = [
+        "order_id", "user_id", "status", "total_amount", "discount_amount", "currency",
+        "item_count", "first_item_title", "first_item_thumbnail", "created_at",
+    ]
+    written, after = 0, None
+    while True:
+        batch = select(models.Order.id).order_by(models.Order.id).limit(batch_size)
+        if after is not None:
+            batch = batch.filter(models.Order.id > after)
+        order_ids = (await db.execute(batch)).scalars().all()
+        if not order_ids:
+            return written
+        after = order_ids[-1]
+        rows = (
+            select(
+                models.Order.id, models.Order.user_id, models.Order.status, models.Order.total_amount,
+                models.Order.discount_amount, models.Order.currency, item_count,
+                first_item.c.title, first_item.c.thumbnail, models.Order.created_at,
+            )
+            .outerjoin(first_item, true())
+            .filter(models.Order.id.in_(order_ids))
+        )
+        result = await db.execute(
+            pg_insert(models.OrderSummary).from_select(columns, rows).on_conflict_do_nothing()
         )
-        .order_by(models.Order.created_at.desc())
+        await db.commit()
+        written += result.rowcount
+
+async def stream_orders_for_export(
+    db: AsyncSession, status: Optional[str] = None,
+    created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+) -> AsyncIterator[dict]:
+    # Yields one dict per order, with its items, oldest first. Reads through a
+    # server-side cursor, so memory stays flat however many orders match.
+    query = (
+        select(
+            models.Order.id, models.Order.created_at, models.Order.status,
+            models.Order.total_amount, models.Order.currency, models.User.email,
+            models.OrderItem.quantity, models.OrderItem.unit_price,
+            models.OrderItem.total_price, models.ProductVariant.sku,
+        )
+        .outerjoin(models.User, models.User.id == models.Order.user_id)
+        .outerjoin(models.OrderItem, models.OrderItem.order_id == models.Order.id)
+        .outerjoin(models.ProductVariant, models.ProductVariant.id == models.OrderItem.variant_id)
+        .order_by(models.Order.created_at, models.Order.id)
+        .execution_options(yield_per=1000)
     )
-    return result.scalars().all()
+    result = await db.stream(_filter_orders(query, status, created_from, created_to))
+
+    order = None
+    async for row in result:
+        if order is None or order["id"] != row.id:
+            if order is not None:
+                yield order
+            order = {
+                "id": row.id,
+                "created_at": row.created_at,
+                "status": row.status,
+                "total_amount": row.total_amount,
+                "currency": row.currency,
+                "email": row.email,
+                "items": [],
+            }
+        if row.sku is not None:
+            order["items"].append({
+                "sku": row.sku,
+                "quantity": row.quantity,
+                "unit_price": row.unit_price,
+                "total_price": row.total_price,
+            })
+    if order is not None:
+        yield order
+
+# ===================================================================
+# Inventory
+# ===================================================================
+
+async def _append_inventory_events(db: AsyncSession, deltas: Dict[UUID, int], reason: str) -> None:
+    # Append one ledger event per variant and move the stock snapshot by the
+    # same amount: two statements for any number of variants. The caller
+    # holds the variant row locks and commits.
+    await db.execute(
+        insert(models.InventoryEvent),
+        [{"variant_id": variant_id, "delta": delta, "reason": reason} for variant_id, delta in deltas.items()],
+    )
+    rows = values(
+        column("variant_id", PG_UUID(as_uuid=True)),
+        column("delta", Integer),
+        name="deltas",
+    ).data(list(deltas.items()))
+    await db.execute(
+        update(models.ProductVariant)
+        .where(models.ProductVariant.id == rows.c.variant_id)
+        .values(stock=func.coalesce(models.ProductVariant.stock, 0) + rows.c.delta)
+        .execution_options(synchronize_session=False)
+    )
+
+async def invalidate_products(db: AsyncSession, product_ids: Iterable[UUID]) -> None:
+    # After a committed write to the given products or their variants: drop
+    # their cached detail responses and re-encode their catalog snapshot rows.
+    # Every path that changes stock (checkout, adjust_stock, the catalog
+    # import, the ledger rebuild) calls this rather than either cache directly.
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    result = await db.execute(select(models.Product.slug).filter(models.Product.id.in_(product_ids)))
+    await response_cache.delete(*(product_key(slug) for slug in result.scalars().all()))
+    await catalog_snapshot.refresh(db, product_ids)
+
+async def adjust_stock(
+    db: AsyncSession, adjustments: List[schemas.StockAdjustment], reason: str
+) -> List[Tuple[UUID, int]]:
+    # Apply all adjustments in one transaction, or none of them. Raises
+    # UnknownVariants or InsufficientStock (stock would go negative).
+    # Returns (variant_id, new stock) per distinct variant.
+    deltas: Dict[UUID, int] = {}
+    for adjustment in adjustments:
+        deltas[adjustment.variant_id] = deltas.get(adjustment.variant_id, 0) + adjustment.delta
+
+    result = await db.execute(
+        select(models.ProductVariant.id, models.ProductVariant.stock, models.ProductVariant.product_id)
+        .filter(models.ProductVariant.id.in_(list(deltas)))
+        .order_by(models.ProductVariant.id)
+        .with_for_update()
+    )
+    rows = result.all()
+    current = {variant_id: stock or 0 for variant_id, stock, _ in rows}
+
+    unknown = [variant_id for variant_id in deltas if variant_id not in current]
+    if unknown:
+        await db.rollback()
+        raise UnknownVariants(unknown)
+    short = [variant_id for variant_id, delta in deltas.items() if current[variant_id] + delta < 0]
+    if short:
+        await db.rollback()
+        raise InsufficientStock(short)
+
+    changed = {variant_id: delta for variant_id, delta in deltas.items() if delta}
+    if changed:
+        await _append_inventory_events(db, changed, reason=reason)
+    await db.commit()
+    await invalidate_products(db, {product_id for variant_id, _, product_id in rows if variant_id in changed})
+    return [(variant_id, current[variant_id] + delta) for variant_id, delta in deltas.items()]
+
 
 # ===================================================================
 # Admin CRUD
 # ===================================================================
 
+def slugify(title: str) -> str:
+    # Simplified slug generation
+    return title.lower().replace(" ", "-").strip()
+
 async def get_product(db: AsyncSession, product_id: UUID) -> Optional[models.Product]:
     result = await db.execute(
         select(models.Product)
@@ -243,8 +1284,7 @@ async def get_product(db: AsyncSession, product_id: UUID) -> Optional[models.Pro
     return result.scalars().first()
 
 async def create_product(db: AsyncSession, product: schemas.ProductCreate) -> models.Product:
-    # Simplified slug generation
-    slug = product.title.lower().replace(" ", "-").strip()
+    slug = slugify(product.title)
     db_product = models.Product(
         title=product.title,
         slug=slug,
@@ -254,22 +1294,144 @@ async def create_product(db: AsyncSession, product: schemas.ProductCreate) -> mo
     db.add(db_product)
     await db.commit()
     await db.refresh(db_product)
+    await response_cache.delete(product_key(slug))
+    await search_backend.index_product(db_product)
+    await catalog_snapshot.refresh(db, [db_product.id])
     return db_product
 
 async def update_product(db: AsyncSession, product_id: UUID, product_in: schemas.ProductUpdate) -> Optional[models.Product]:
     db_product = await get_product(db, product_id)
     if not db_product:
         return None
+    old_slug = db_product.slug
     
     update_data = product_in.dict(exclude_unset=True)
     
     # Update slug if title is being updated
     if "title" in update_data:
-        update_data["slug"] = update_data["title"].lower().replace(" ", "-").strip()
+        update_data["slug"] = slugify(update_data["title"])
     
     for field, value in update_data.items():
         setattr(db_product, field, value)
     
     await db.commit()
     await db.refresh(db_product)
-    return db_product
\ No newline at end of file
+    await response_cache.delete(product_key(old_slug), product_key(db_product.slug))
+    await search_backend.index_product(db_product)
+    await catalog_snapshot.refresh(db, [db_product.id])
+    return db_product
+
+# ===================================================================
+# Bulk Catalog Import
+# ===================================================================
+
+async def get_category_ids_by_slug(db: AsyncSession, slugs: List[str]) -> Dict[str, UUID]:
+    if not slugs:
+        return {}
+    result = await db.execute(
+        select(models.Category.slug, models.Category.id).filter(models.Category.slug.in_(slugs))
+    )
+    return dict(result.all())
+
+async def upsert_catalog_rows(
+    db: AsyncSession, rows: List[schemas.ProductImportRow], category_ids: Dict[str, UUID]
+) -> Tuple[Dict[str, UUID], int]:
+    # One INSERT ... ON CONFLICT per table for the whole chunk. Rows are one
+    # variant each; product and image fields repeat per variant and the last
+    # occurrence in the chunk wins. Does not commit.
+    # Returns ({slug: product id} for upserted products, variants upserted).
+    products: Dict[str, dict] = {}
+    for row in rows:
+        slug = row.slug or slugify(row.title)
+        products[slug] = {
+            "slug": slug,
+            "title": row.title,
+            "description": row.description,
+            "category_id": category_ids.get(row.category_slug) if row.category_slug else None,
+            "attributes": row.attributes,
+        }
+
+    product_stmt = pg_insert(models.Product).values(list(products.values()))
+    result = await db.execute(
+        product_stmt.on_conflict_do_update(
+            index_elements=[models.Product.slug],
+            set_={
+                "title": product_stmt.excluded.title,
+                "description": product_stmt.excluded.description,
+                "category_id": product_stmt.excluded.category_id,
+                "attributes": product_stmt.excluded.attributes,
+                "updated_at": func.now(),
+            },
+        ).returning(models.Product.slug, models.Product.id)
+    )
+    product_ids = dict(result.all())
+
+    variants: Dict[str, dict] = {}
+    images: Dict[Tuple[UUID, str], dict] = {}
+    for row in rows:
+        product_id = product_ids[row.slug or slugify(row.title)]
+        variants[row.variant_sku] = {
+            "product_id": product_id,
+            "sku": row.variant_sku,
+            "price": row.price,
+            "compare_at_price": row.compare_at_price,
+            "currency": row.currency,
+            "stock": row.stock,
+            "attributes": row.variant_attributes,
+        }
+        if row.image_url:
+            images[(product_id, row.image_url)] = {
+                "product_id": product_id,
+                "url": row.image_url,
+                "alt": row.image_alt,
+                "sku": row.variant_sku,
+            }
+
+    # Stock is imported as an absolute level; the ledger records the change
+    result = await db.execute(
+        select(models.ProductVariant.sku, models.ProductVariant.stock)
+        .filter(models.ProductVariant.sku.in_(list(variants)))
+        .order_by(models.ProductVariant.id)
+        .with_for_update()
+    )
+    previous_stock = {sku: stock or 0 for sku, stock in result.all()}
+
+    variant_stmt = pg_insert(models.ProductVariant).values(list(variants.values()))
+    result = await db.execute(
+        variant_stmt.on_conflict_do_update(
+            index_elements=[models.ProductVariant.sku],
+            set_={
+                "product_id": variant_stmt.excluded.product_id,
+                "price": variant_stmt.excluded.price,
+                "compare_at_price": variant_stmt.excluded.compare_at_price,
+                "currency": variant_stmt.excluded.currency,
+                "stock": variant_stmt.excluded.stock,
+                "attributes": variant_stmt.excluded.attributes,
+                "updated_at": func.now(),
+            },
+        ).returning(models.ProductVariant.sku, models.ProductVariant.id)
+    )
+    variant_ids = dict(result.all())
+
+    events = [
+        {"variant_id": variant_ids[sku], "delta": variant["stock"] - previous_stock.get(sku, 0), "reason": "import"}
+        for sku, variant in variants.items()
+        if variant["stock"] != previous_stock.get(sku, 0)
+    ]
+    if events:
+        await db.execute(insert(models.InventoryEvent), events)
+
+    if images:
+        image_stmt = pg_insert(models.ProductImage).values([
+            {"product_id": image["product_id"], "variant_id": variant_ids[image["sku"]],
+             "url": image["url"], "alt": image["alt"]}
+            for image in images.values()
+        ])
+        await db.execute(
+            image_stmt.on_conflict_do_update(
+                constraint="uq_product_images_product_url",
+                set_={"variant_id": image_stmt.excluded.variant_id, "alt": image_stmt.excluded.alt},
+            )
+        )
+
+    return product_ids, len(variant_ids)
@@ -0,0 +1,195 @@
+# backend/app/db/routing.py
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+from app.core.principal_cache import bearer_token_user
+from app.db.session import AsyncSessionLocal, _engine_options
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to writes; while it is in the future, reads use the primary
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Replay lag in seconds: 0 on a primary, or on a replica that has replayed
+# everything it received (replay timestamps stop moving when writes do)
+_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() AND pg_last_wal_receive_lsn() IS DISTINCT FROM pg_last_wal_replay_lsn() "
+    "THEN coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        options = _engine_options(url)
+        # Keep replica waits out of the primary's pool statistics
+        options["poolclass"] = AsyncAdaptedQueuePool
+        self.engine = create_async_engine(url, future=True, **options)
+        self.sessionmaker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        # Trusted until the first health check says otherwise
+        self.healthy = True
+        # Smoothed health check round trip, seconds
+        self.latency: Optional[float] = None
+        self.lag = 0.0
+
+
+class ReplicaRouter:
+    """
+    Picks a replica for read-only sessions. A background loop checks each
+    replica's connectivity, latency and replay lag; unhealthy or lagging
+    replicas are skipped, and with none available reads use the primary.
+    """
+
+    def __init__(self, urls: List[str], selection: str, max_lag: float, interval: float):
+        if selection not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown replica selection: {selection}")
+        self.replicas = [Replica(url) for url in urls]
+        self.selection = selection
+        self.max_lag = max_lag
+        self.interval = interval
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.selection == "least_latency":
+            return min(healthy, key=lambda replica: replica.latency if replica.latency is not None else math.inf)
+        return healthy[next(self._next) % len(healthy)]
+
+    async def check(self, replica: Replica) -> None:
+        start = time.perf_counter()
+        try:
+            async with replica.engine.connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(_LAG_QUERY), timeout=self.interval)
+        except Exception as e:
+            if replica.healthy:
+                logger.warning("Replica %s failed its health check: %s", replica.name, e)
+            replica.healthy = False
+            return
+        elapsed = time.perf_counter() - start
+        replica.latency = elapsed if replica.latency is None else 0.8 * replica.latency + 0.2 * elapsed
+        replica.lag = float(lag or 0)
+        healthy = replica.lag <= self.max_lag
+        if healthy != replica.healthy:
+            logger.warning("Replica %s is %s (lag %.1fs)", replica.name, "back" if healthy else "lagging", replica.lag)
+        replica.healthy = healthy
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check_all()
+
+    async def start(self) -> None:
+        if self.replicas:
+            await self.check_all()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*(replica.engine.dispose() for replica in self.replicas))
+
+
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    selection=settings.DB_REPLICA_SELECTION,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    interval=settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS,
+)
+
+
+def read_session() -> AsyncSession:
+    """A session on a healthy replica, or on the primary if there is none."""
+    replica = replica_router.choose()
+    return replica.sessionmaker() if replica is not None else AsyncSessionLocal()
+
+
+def _create_pin_store() -> CacheBackend:
+    if settings.DB_READ_YOUR_WRITES_BACKEND == "redis":
+        return RedisCacheBackend.from_url(settings.REDIS_URL, prefix="db_primary_until:")
+    return MemoryCacheBackend(maxsize=settings.DB_READ_YOUR_WRITES_MAX_USERS)
+
+
+# User id -> pin, for clients that write with a bearer token but do not keep cookies
+primary_pins: CacheBackend = _create_pin_store()
+
+
+async def pinned_to_primary(request: Request) -> bool:
+    if not replica_router.replicas:
+        return False
+    try:
+        if float(request.cookies.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user = bearer_token_user(request.headers.get("authorization", "").encode("latin-1"))
+    return user is not None and await primary_pins.get(user) is not None
+
+
+async def get_read_db(request: Request):
+    """
+    Session dependency for read-only routes. Clients that wrote within the
+    last DB_READ_YOUR_WRITES_SECONDS stay on the primary so they see their
+    own changes.
+    """
+    session = AsyncSessionLocal() if await pinned_to_primary(request) else read_session()
+    async with session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client's reads to the primary for a while after any successful
+    unsafe request: with a cookie, which holds across workers, and for
+    authenticated requests also by user id in primary_pins, so the pin
+    follows the user's token to clients without a cookie jar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        authorization = next((value for name, value in scope["headers"] if name == b"authorization"), b"")
+        user = bearer_token_user(authorization)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.DB_READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{PIN_COOKIE}={time.time() + window:.3f}; Max-Age={math.ceil(window)}; "
+                    f"Path=/; HttpOnly; SameSite=lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+                if user is not None:
+                    await primary_pins.set(user, b"1", window)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
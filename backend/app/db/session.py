@@ -1,12 +1,104 @@
 # backend/app/db/session.py
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    def __init__(self):
+        self.acquisitions = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquisitions += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long callers wait to get a connection,
+    including the time to open a new one.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
+def _engine_options(url: str) -> dict:
+    connect_args = {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        if settings.DB_PGBOUNCER_MODE:
+            # PgBouncer in transaction mode cannot keep named prepared statements
+            # across transactions, so disable both statement caches and use
+            # unique names for the unnamed ones asyncpg still prepares.
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        else:
+            connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True, **_engine_options(settings.DATABASE_URL))
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "acquisitions": pool_stats.acquisitions,
+        "wait_seconds_total": pool_stats.wait_seconds_total,
+        "wait_seconds_max": pool_stats.wait_seconds_max,
+    }
+
+
+async def warm_up_pool(connections: int) -> None:
+    """
+    Open `connections` connections concurrently and return them to the pool,
+    so the first requests after startup do not pay the connect cost.
+    """
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    await asyncio.gather(*(r.close() for r in results if not isinstance(r, BaseException)))
+    if errors:
+        logger.warning("Database pool warm-up opened %d of %d connections: %s",
+                       connections - len(errors), connections, errors[0])
@@ -1,16 +1,68 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.api.api import api_router
 from app.core.config import settings
+from app.crud import crud
+from app.core.catalog_snapshot import catalog_snapshot
+from app.core.coupons import coupon_index
+from app.core.jobs import job_workers
+from app.core.instrumentation import InstrumentationMiddleware, instrument_engine
+from app.core.metrics import registry
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.security import shutdown_hash_pool
+from app.core.search import search_backend
+from app.db.routing import ReadYourWritesMiddleware, replica_router
+from app.db.session import AsyncSessionLocal, engine, warm_up_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_POOL_WARMUP > 0:
+        await warm_up_pool(min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+    await replica_router.start()
+    async with AsyncSessionLocal() as db:
+        await crud.sync_category_closure(db)
+        await search_backend.rebuild(db)
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        await catalog_snapshot.start()
+    if settings.JOBS_ENABLED:
+        job_workers.start()
+    await coupon_index.start()
+    yield
+    await coupon_index.stop()
+    await job_workers.stop()
+    await catalog_snapshot.stop()
+    await replica_router.stop()
+    shutdown_hash_pool()
+    await engine.dispose()
 
 def create_app():
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        openapi_url=f"{settings.API_V1_STR}/openapi.json"
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
+    if replica_router.replicas:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # Inside instrumentation, so limited requests are still measured
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine.sync_engine)
+        for replica in replica_router.replicas:
+            instrument_engine(replica.engine.sync_engine)
+        app.add_middleware(InstrumentationMiddleware)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
     return app
 
 app = create_app()
\ No newline at end of file
@@ -1,8 +1,8 @@
 # backend/app/models/models.py
 import uuid
 from sqlalchemy import (
-    Column, String, Boolean, Integer, Text, ForeignKey,
-    Numeric, DateTime, CheckConstraint
+    Column, String, Boolean, Integer, Text, ForeignKey, Computed,
+    Numeric, DateTime, CheckConstraint, Index, UniqueConstraint, cast, literal_column
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
@@ -54,6 +54,33 @@ class Category(Base):
     parent = relationship("Category", remote_side=[id])
     products = relationship("Product", back_populates="category")
 
+class CategoryClosure(Base):
+    """
+    Transitive closure of the category hierarchy: one row per (ancestor,
+    descendant) pair, including each category paired with itself at depth 0.
+    Maintained by the category crud functions.
+    """
+    __tablename__ = "category_closure"
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+
+# Full-text document for product search, shared by the GIN index on products
+# and the Postgres search backend. Constants are literals rather than bound
+# parameters so queries match the index expression exactly.
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+def _search_field(column, weight):
+    document = func.coalesce(column, literal_column("''"))
+    return func.setweight(func.to_tsvector(SEARCH_CONFIG, document), literal_column(f"'{weight}'"))
+
+def search_document(title, description, attributes):
+    return (
+        _search_field(title, "A")
+        .op("||")(_search_field(description, "B"))
+        .op("||")(_search_field(cast(attributes, Text), "C"))
+    )
+
 class Product(Base):
     __tablename__ = "products"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -71,6 +98,52 @@ class Product(Base):
     variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan")
     images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="product", cascade="all, delete-orphan")
+    # One-to-one and small, so it is joined into every product load
+    rating = relationship("ProductRatingStats", uselist=False, lazy="joined", viewonly=True)
+
+    __table_args__ = (
+        # Keyset pagination order for the catalog listing
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_search", search_document(title, description, attributes), postgresql_using="gin"),
+        # Attribute filters (attributes @> ...)
+        Index("ix_products_attributes", "attributes", postgresql_using="gin",
+              postgresql_ops={"attributes": "jsonb_path_ops"}),
+    )
+
+product_search_vector = search_document(
+    Product.__table__.c.title, Product.__table__.c.description, Product.__table__.c.attributes
+)
+
+class ProductRatingStats(Base):
+    """
+    Review aggregate per product, updated in the same transaction as every
+    review insert and delete so listings never scan reviews.
+    """
+    __tablename__ = "product_rating_stats"
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    average_rating = Column(
+        Numeric(3, 2),
+        Computed("CASE WHEN review_count > 0 THEN round(rating_sum::numeric / review_count, 2) ELSE 0 END"),
+    )
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f"rating_{star}") for star in range(1, 6)}
+
+    __table_args__ = (
+        # Sort and filter by rating over reviewed products only
+        Index(
+            "ix_product_rating_stats_average", "average_rating", "product_id",
+            postgresql_where=literal_column("review_count > 0"),
+        ),
+    )
 
 class ProductVariant(Base):
     __tablename__ = "product_variants"
@@ -81,6 +154,8 @@ class ProductVariant(Base):
     compare_at_price = Column(Numeric(12, 2))
     currency = Column(String(10), default="USD")
     attributes = Column(JSONB)
+    # Snapshot of the inventory_events ledger for this variant, updated in
+    # the same transaction as every event appended
     stock = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -89,6 +164,13 @@ class ProductVariant(Base):
     images = relationship("ProductImage", back_populates="variant")
     inventory_events = relationship("InventoryEvent", back_populates="variant")
 
+    __table_args__ = (
+        # Variant attribute filters and price ranges on the product listing
+        Index("ix_product_variants_attributes", "attributes", postgresql_using="gin",
+              postgresql_ops={"attributes": "jsonb_path_ops"}),
+        Index("ix_product_variants_price_product_id", "price", "product_id"),
+    )
+
 class ProductImage(Base):
     __tablename__ = "product_images"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -101,6 +183,11 @@ class ProductImage(Base):
     product = relationship("Product", back_populates="images")
     variant = relationship("ProductVariant", back_populates="images")
 
+    __table_args__ = (
+        # Upsert key for bulk catalog imports
+        UniqueConstraint("product_id", "url", name="uq_product_images_product_url"),
+    )
+
 class InventoryEvent(Base):
     __tablename__ = "inventory_events"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -111,6 +198,11 @@ class InventoryEvent(Base):
 
     variant = relationship("ProductVariant", back_populates="inventory_events")
 
+    __table_args__ = (
+        # Per-variant ledger sums can be answered from the index alone
+        Index("ix_inventory_events_variant_id", "variant_id", postgresql_include=["delta"]),
+    )
+
 class Cart(Base):
     __tablename__ = "carts"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -122,6 +214,11 @@ class Cart(Base):
 
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # One cart per user; also the get-or-create upsert key
+        UniqueConstraint("user_id", name="uq_carts_user_id"),
+    )
+
 class CartItem(Base):
     __tablename__ = "cart_items"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -134,6 +231,11 @@ class CartItem(Base):
     cart = relationship("Cart", back_populates="items")
     variant = relationship("ProductVariant")
 
+    __table_args__ = (
+        # Upsert key for cart mutations
+        UniqueConstraint("cart_id", "variant_id", name="uq_cart_items_cart_variant"),
+    )
+
 class Order(Base):
     __tablename__ = "orders"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -143,6 +245,9 @@ class Order(Base):
     currency = Column(String(10), default="USD")
     shipping_address = Column(JSONB)
     billing_address = Column(JSONB)
+    coupon_id = Column(UUID(as_uuid=True), ForeignKey("coupons.id"))
+    # Already subtracted from total_amount
+    discount_amount = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -151,10 +256,15 @@ class Order(Base):
     payments = relationship("Payment", back_populates="order", cascade="all, delete-orphan")
     shipments = relationship("Shipment", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination and export order for the admin order listing
+        Index("ix_orders_created_at_id", "created_at", "id"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
     variant_id = Column(UUID(as_uuid=True), ForeignKey("product_variants.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(12, 2), nullable=False)
@@ -163,6 +273,34 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
     variant = relationship("ProductVariant")
 
+class OrderSummary(Base):
+    """
+    Denormalised projection of an order for history and admin listings,
+    written in the checkout transaction so lists never join items. Code
+    that changes orders.status must update it here too.
+    """
+    __tablename__ = "order_summaries"
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    status = Column(String(50), nullable=False)
+    total_amount = Column(Numeric(12, 2), nullable=False)
+    discount_amount = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    currency = Column(String(10))
+    # Units across all lines
+    item_count = Column(Integer, nullable=False)
+    # The line added to the cart first
+    first_item_title = Column(String(255))
+    first_item_thumbnail = Column(Text)
+    # Same as orders.created_at
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Keyset pages of one customer's history, newest first
+        Index("ix_order_summaries_user_created", user_id, created_at.desc(), order_id.desc()),
+        # Admin listing across all customers
+        Index("ix_order_summaries_created", created_at.desc(), order_id.desc()),
+    )
+
 class Payment(Base):
     __tablename__ = "payments"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -176,6 +314,11 @@ class Payment(Base):
 
     order = relationship("Order", back_populates="payments")
 
+    __table_args__ = (
+        # One payment per order; the order.payment job's insert conflicts on it
+        UniqueConstraint("order_id", name="uq_payments_order_id"),
+    )
+
 class Shipment(Base):
     __tablename__ = "shipments"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -188,6 +331,40 @@ class Shipment(Base):
 
     order = relationship("Order", back_populates="shipments")
 
+    __table_args__ = (
+        # One shipment per order; the order.shipment job's insert conflicts on it
+        UniqueConstraint("order_id", name="uq_shipments_order_id"),
+    )
+
+class Job(Base):
+    """
+    Durable job queue, doubling as the transactional outbox: producers add
+    jobs in the same transaction as the change that needs follow-up work,
+    so a job exists if and only if that change committed. Workers claim
+    pending jobs with FOR UPDATE SKIP LOCKED and delete them on success.
+    """
+    __tablename__ = "jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    # pending -> running -> deleted on success, back to pending to retry,
+    # or failed once max_attempts is used up
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Lease of a running job; expired leases are returned to pending
+    locked_until = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Claim order over ready jobs only; failed jobs stay out of the index
+        Index("ix_jobs_pending_run_at", "run_at", postgresql_where=literal_column("status = 'pending'")),
+        Index("ix_jobs_running_locked_until", "locked_until", postgresql_where=literal_column("status = 'running'")),
+    )
+
 class Coupon(Base):
     __tablename__ = "coupons"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -195,7 +372,17 @@ class Coupon(Base):
     discount_type = Column(String(20), nullable=False) # percent or fixed
     discount_value = Column(Numeric(12, 2))
     usage_limit = Column(Integer)
+    # Redemptions so far; only ever moved by the conditional UPDATE at checkout
+    used = Column(Integer, nullable=False, default=0, server_default="0")
     expires_at = Column(DateTime(timezone=True))
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("discount_type IN ('percent', 'fixed')", name="ck_coupons_discount_type"),
+        # Backstop for the redemption UPDATE: a code can never be oversold
+        CheckConstraint("usage_limit IS NULL OR used <= usage_limit", name="ck_coupons_used_within_limit"),
+    )
 
 class Review(Base):
     __tablename__ = "reviews"
@@ -212,4 +399,8 @@ class Review(Base):
 
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='review_rating_check'),
+        # One review per user and product
+        UniqueConstraint("product_id", "user_id", name="uq_reviews_product_user"),
+        # Newest-first review listing per product
+        Index("ix_reviews_product_created_at_id", "product_id", "created_at", "id"),
     )
@@ -1,8 +1,10 @@
 # backend/app/schemas/schemas.py
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Any
+import json
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Dict, Optional, List, Any
 from uuid import UUID
 from datetime import datetime
+from decimal import Decimal
 
 # ===================================================================
 # Base & Generic Schemas
@@ -29,6 +31,10 @@ class UserCreate(UserBase):
 class UserUpdate(UserBase):
     password: Optional[str] = None
 
+class UserFlagsUpdate(BaseModel):
+    is_active: Optional[bool] = None
+    is_staff: Optional[bool] = None
+
 class User(UserBase):
     id: UUID
     is_active: bool
@@ -50,6 +56,20 @@ class Category(BaseModel):
     class Config:
         from_attributes = True
 
+class CategoryNode(Category):
+    parent_id: Optional[UUID] = None
+    children: List["CategoryNode"] = []
+
+class CategoryCreate(BaseModel):
+    name: str
+    slug: Optional[str] = None
+    parent_id: Optional[UUID] = None
+
+class CategoryUpdate(BaseModel):
+    name: Optional[str] = None
+    # Explicitly null moves the category to the top level
+    parent_id: Optional[UUID] = None
+
 class ProductVariant(BaseModel):
     id: UUID
     sku: str
@@ -60,6 +80,15 @@ class ProductVariant(BaseModel):
     class Config:
         from_attributes = True
 
+class ProductRating(BaseModel):
+    review_count: int
+    average_rating: float
+    # stars -> number of reviews
+    histogram: Dict[int, int]
+
+    class Config:
+        from_attributes = True
+
 class Product(BaseModel):
     id: UUID
     title: str
@@ -67,10 +96,71 @@ class Product(BaseModel):
     description: Optional[str]
     category: Optional[Category]
     variants: List[ProductVariant] = []
+    rating: Optional[ProductRating] = None
 
     class Config:
         from_attributes = True
 
+class AttributeFacet(BaseModel):
+    # "product" or "variant" attributes
+    scope: str
+    key: str
+    value: str
+    count: int
+
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_cursor: Optional[str] = None
+    # Only when requested with facets=true
+    facets: Optional[List[AttributeFacet]] = None
+
+class CategoryFacet(BaseModel):
+    category_id: Optional[UUID]
+    count: int
+
+class ProductSearchResults(BaseModel):
+    items: List[Product]
+    total: int
+    facets: List[CategoryFacet] = []
+
+class ProductBatchRequest(BaseModel):
+    ids: List[UUID] = []
+    slugs: List[str] = []
+    variant_ids: List[UUID] = []
+
+class ProductBatchMisses(BaseModel):
+    ids: List[UUID] = []
+    slugs: List[str] = []
+    variant_ids: List[UUID] = []
+
+class ProductBatchResult(BaseModel):
+    # Each list follows the order of the request; unknown keys are in `missing`
+    ids: List[Product] = []
+    slugs: List[Product] = []
+    variant_ids: List[Product] = []
+    missing: ProductBatchMisses
+
+# ===================================================================
+# Review Schemas
+# ===================================================================
+
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    title: Optional[str] = Field(None, max_length=255)
+    body: Optional[str] = None
+
+class Review(ReviewCreate):
+    id: UUID
+    user_id: UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReviewPage(BaseModel):
+    items: List[Review]
+    next_cursor: Optional[str] = None
+
 # ===================================================================
 # Cart Schemas
 # ===================================================================
@@ -90,9 +180,36 @@ class CartItem(CartItemBase):
     class Config:
         from_attributes = True
 
-class Cart(BaseModel):
+class CartLine(BaseModel):
     id: UUID
+    variant_id: UUID
+    quantity: int
+    price_at_add: float
+
+    class Config:
+        from_attributes = True
+
+class CartItemChange(BaseModel):
+    variant_id: UUID
+    # Target quantity; 0 removes the item
+    quantity: int = Field(..., ge=0)
+
+class CartBatchUpdate(BaseModel):
+    items: List[CartItemChange] = Field(..., min_length=1, max_length=100)
+
+class CartBatchResult(BaseModel):
+    items: List[CartLine]
+    removed: List[UUID] = []
+    missing: List[UUID] = []
+
+class Cart(BaseModel):
+    # None until the cart's first item is added
+    id: Optional[UUID] = None
     items: List[CartItem] = []
+    coupon_code: Optional[str] = None
+    subtotal: float = 0
+    discount: float = 0
+    total: float = 0
     # Add other fields like total amount if calculated on the fly
     
     class Config:
@@ -115,12 +232,32 @@ class Order(BaseModel):
     id: UUID
     status: str
     total_amount: float
+    discount_amount: float = 0
     items: List[OrderItem] = []
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class OrderSummary(BaseModel):
+    order_id: UUID
+    user_id: Optional[UUID]
+    status: str
+    total_amount: float
+    discount_amount: float
+    currency: Optional[str]
+    item_count: int
+    first_item_title: Optional[str]
+    first_item_thumbnail: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class OrderSummaryPage(BaseModel):
+    items: List[OrderSummary]
+    next_cursor: Optional[str] = None
+
 class OrderCreate(BaseModel):
     # Typically created from a cart, so might not need a complex body
     pass
@@ -138,4 +275,79 @@ class ProductCreate(BaseModel):
 class ProductUpdate(BaseModel):
     title: Optional[str]
     description: Optional[str]
-    category_id: Optional[UUID]
\ No newline at end of file
+    category_id: Optional[UUID]
+
+class CouponApply(BaseModel):
+    code: str = Field(..., min_length=1, max_length=50)
+
+class AppliedCoupon(BaseModel):
+    code: str
+    discount_type: str
+    discount_value: float
+
+    class Config:
+        from_attributes = True
+
+class CouponCreate(BaseModel):
+    code: str = Field(..., min_length=1, max_length=50)
+    discount_type: str = Field(..., pattern="^(percent|fixed)$")
+    discount_value: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
+    usage_limit: Optional[int] = Field(None, ge=1)
+    expires_at: Optional[datetime] = None
+
+class CouponUpdate(BaseModel):
+    usage_limit: Optional[int] = Field(None, ge=1)
+    expires_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+class Coupon(BaseModel):
+    id: UUID
+    code: str
+    discount_type: str
+    discount_value: float
+    usage_limit: Optional[int]
+    used: int
+    expires_at: Optional[datetime]
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+class StockAdjustment(BaseModel):
+    variant_id: UUID
+    delta: int
+
+class StockAdjustmentBatch(BaseModel):
+    reason: str = Field("adjustment", min_length=1, max_length=100)
+    items: List[StockAdjustment] = Field(..., min_length=1, max_length=10000)
+
+class StockLevel(BaseModel):
+    variant_id: UUID
+    stock: int
+
+class StockAdjustmentResult(BaseModel):
+    items: List[StockLevel]
+
+class ProductImportRow(BaseModel):
+    # One variant per row; product fields repeat across a product's variants
+    title: str = Field(..., min_length=1, max_length=255)
+    slug: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = None
+    category_slug: Optional[str] = None
+    attributes: Optional[dict] = None
+    variant_sku: str = Field(..., min_length=1, max_length=100)
+    price: Decimal = Field(..., ge=0, max_digits=12, decimal_places=2)
+    compare_at_price: Optional[Decimal] = Field(None, ge=0, max_digits=12, decimal_places=2)
+    currency: str = Field("USD", max_length=10)
+    stock: int = Field(0, ge=0)
+    variant_attributes: Optional[dict] = None
+    image_url: Optional[str] = None
+    image_alt: Optional[str] = None
+
+    @field_validator("attributes", "variant_attributes", mode="before")
+    @classmethod
+    def parse_json_text(cls, value):
+        # CSV cells carry JSON objects as text
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
@@ -0,0 +1,164 @@
+# backend/app/utils/catalog_import.py
+"""
+Streaming bulk catalog import.
+
+Reads CSV or NDJSON one row per product variant, validates rows in chunks and
+upserts products, variants and images with INSERT ... ON CONFLICT, committing
+once per chunk. Only the current chunk is held in memory. Reading, parsing and
+validating a chunk run in a worker thread, off the event loop.
+
+    python -m app.utils.catalog_import catalog.csv --chunk-size 2000
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+from dataclasses import dataclass, field, asdict
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.schemas.schemas import ProductImportRow
+
+# Each row binds roughly ten parameters per table; stay well under the
+# 32767 bind parameter limit of the Postgres wire protocol.
+MAX_CHUNK_SIZE = 2500
+
+
+@dataclass
+class ImportProgress:
+    rows_read: int = 0
+    rows_imported: int = 0
+    products_upserted: int = 0
+    variants_upserted: int = 0
+    # Errors from the chunk that produced this report: {"line", "errors"}
+    errors: List[dict] = field(default_factory=list)
+    done: bool = False
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # Empty cells mean "not set", not empty strings
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def iter_ndjson_rows(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, {"__error__": f"Invalid JSON: {e}"}
+
+
+def iter_rows(lines: Iterable[str], format: str) -> Iterator[Tuple[int, dict]]:
+    if format == "csv":
+        return iter_csv_rows(lines)
+    if format in ("ndjson", "jsonl"):
+        return iter_ndjson_rows(lines)
+    raise ValueError(f"Unsupported import format: {format}")
+
+
+def _validate_chunk(chunk: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, ProductImportRow]], List[dict]]:
+    valid, errors = [], []
+    for line_num, raw in chunk:
+        if "__error__" in raw:
+            errors.append({"line": line_num, "errors": [raw["__error__"]]})
+            continue
+        try:
+            valid.append((line_num, ProductImportRow.model_validate(raw)))
+        except ValidationError as e:
+            errors.append({
+                "line": line_num,
+                "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()],
+            })
+    return valid, errors
+
+
+def _read_chunk(
+    rows: Iterator[Tuple[int, dict]], chunk_size: int
+) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, ProductImportRow]], List[dict]]:
+    # Runs in a worker thread: pulling rows reads and parses the file, and
+    # validation is CPU-bound, so neither should stall other requests
+    chunk = list(itertools.islice(rows, chunk_size))
+    return (chunk, *_validate_chunk(chunk))
+
+
+async def _import_chunk(
+    db: AsyncSession, chunk: List[Tuple[int, dict]], valid: List[Tuple[int, ProductImportRow]],
+    errors: List[dict], progress: ImportProgress,
+) -> None:
+    progress.errors = errors
+
+    category_slugs = {row.category_slug for _, row in valid if row.category_slug}
+    category_ids = await crud.get_category_ids_by_slug(db, list(category_slugs))
+    rows = []
+    for line_num, row in valid:
+        if row.category_slug and row.category_slug not in category_ids:
+            errors.append({"line": line_num, "errors": [f"category_slug: unknown category '{row.category_slug}'"]})
+        else:
+            rows.append(row)
+    if not rows:
+        return
+
+    try:
+        product_ids, variant_count = await crud.upsert_catalog_rows(db, rows, category_ids)
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        first, last = chunk[0][0], chunk[-1][0]
+        errors.append({"line": first, "errors": [f"lines {first}-{last} rolled back: {getattr(e, 'orig', None) or e}"]})
+        return
+
+    await crud.invalidate_products(db, product_ids.values())
+    progress.rows_imported += len(rows)
+    progress.products_upserted += len(product_ids)
+    progress.variants_upserted += variant_count
+
+
+async def import_catalog(
+    db: AsyncSession, rows: Iterable[Tuple[int, dict]], chunk_size: Optional[int] = None
+) -> AsyncIterator[ImportProgress]:
+    """
+    Import (line number, raw row) pairs, yielding cumulative progress after
+    every chunk and a final report with done=True.
+    """
+    chunk_size = min(chunk_size or settings.IMPORT_CHUNK_SIZE, MAX_CHUNK_SIZE)
+    progress = ImportProgress()
+    rows = iter(rows)
+    while True:
+        chunk, valid, errors = await asyncio.to_thread(_read_chunk, rows, chunk_size)
+        if not chunk:
+            break
+        progress.rows_read += len(chunk)
+        await _import_chunk(db, chunk, valid, errors, progress)
+        yield progress
+
+    progress.errors = []
+    progress.done = True
+    yield progress
+
+
+async def _main(path: str, format: str, chunk_size: int) -> None:
+    with open(path, newline="", encoding="utf-8") as f:
+        async with AsyncSessionLocal() as db:
+            async for progress in import_catalog(db, iter_rows(f, format), chunk_size):
+                print(json.dumps(asdict(progress)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import products from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    asyncio.run(_main(args.path, format, args.chunk_size))
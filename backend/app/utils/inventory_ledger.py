@@ -0,0 +1,144 @@
+# backend/app/utils/inventory_ledger.py
+"""
+Inventory ledger reconciliation.
+
+ProductVariant.stock is a snapshot of the inventory_events ledger. This job
+walks variants in id order, one batch at a time, and compares each snapshot
+with the sum of its events:
+
+    verify   report mismatches only
+    rebuild  reset the snapshot to the ledger sum
+    adopt    append a correction event so the ledger matches the snapshot
+             (for stock levels that predate the ledger)
+
+    python -m app.utils.inventory_ledger verify --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import Integer, column, func, insert, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app import crud
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import models
+
+MODES = ("verify", "rebuild", "adopt")
+# Mismatches listed per progress report; the counters cover all of them
+MAX_REPORTED_MISMATCHES = 100
+
+
+@dataclass
+class ReconcileProgress:
+    variants_checked: int = 0
+    mismatched: int = 0
+    repaired: int = 0
+    # Mismatches from the batch that produced this report: {"variant_id", "stock", "ledger"}
+    mismatches: List[dict] = field(default_factory=list)
+    done: bool = False
+
+
+def _batch_query(after: Optional[UUID], batch_size: int, lock: bool):
+    batch = select(models.ProductVariant.id, models.ProductVariant.stock).order_by(models.ProductVariant.id)
+    if after is not None:
+        batch = batch.filter(models.ProductVariant.id > after)
+    batch = batch.limit(batch_size)
+    if lock:
+        batch = batch.with_for_update()
+    batch = batch.subquery("batch")
+
+    # One grouped scan of ix_inventory_events_variant_id per batch
+    ledger = func.coalesce(func.sum(models.InventoryEvent.delta), 0)
+    return (
+        select(batch.c.id, batch.c.stock, ledger)
+        .outerjoin(models.InventoryEvent, models.InventoryEvent.variant_id == batch.c.id)
+        .group_by(batch.c.id, batch.c.stock)
+        .order_by(batch.c.id)
+    )
+
+
+async def _repair(db: AsyncSession, mismatches: List[tuple], mode: str) -> Set[UUID]:
+    # Returns the ids of products whose stock changed
+    if mode == "rebuild":
+        rows = values(
+            column("variant_id", PG_UUID(as_uuid=True)), column("ledger", Integer), name="ledger"
+        ).data([(variant_id, ledger) for variant_id, _, ledger in mismatches])
+        result = await db.execute(
+            update(models.ProductVariant)
+            .where(models.ProductVariant.id == rows.c.variant_id)
+            .values(stock=rows.c.ledger)
+            .returning(models.ProductVariant.product_id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars().all())
+    else:
+        await db.execute(
+            insert(models.InventoryEvent),
+            [
+                {"variant_id": variant_id, "delta": (stock or 0) - ledger, "reason": "reconciliation"}
+                for variant_id, stock, ledger in mismatches
+            ],
+        )
+        # The ledger moves to the snapshot; stock is unchanged
+        return set()
+
+
+async def reconcile_inventory(
+    db: AsyncSession, mode: str = "verify", batch_size: Optional[int] = None
+) -> AsyncIterator[ReconcileProgress]:
+    """
+    Compare every variant's stock snapshot with its ledger, yielding
+    cumulative progress after each batch and a final report with done=True.
+    Repairing modes lock and commit one batch at a time.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown reconcile mode: {mode}")
+    batch_size = batch_size or settings.INVENTORY_BATCH_SIZE
+    progress = ReconcileProgress()
+    after = None
+    while True:
+        result = await db.execute(_batch_query(after, batch_size, lock=mode != "verify"))
+        rows = result.all()
+        if not rows:
+            break
+        after = rows[-1][0]
+        mismatches = [(variant_id, stock, ledger) for variant_id, stock, ledger in rows if (stock or 0) != ledger]
+        changed: Set[UUID] = set()
+        if mismatches and mode != "verify":
+            changed = await _repair(db, mismatches, mode)
+            progress.repaired += len(mismatches)
+        await db.commit()
+        await crud.invalidate_products(db, changed)
+
+        progress.variants_checked += len(rows)
+        progress.mismatched += len(mismatches)
+        progress.mismatches = [
+            {"variant_id": str(variant_id), "stock": stock, "ledger": ledger}
+            for variant_id, stock, ledger in mismatches[:MAX_REPORTED_MISMATCHES]
+        ]
+        yield progress
+
+    progress.mismatches = []
+    progress.done = True
+    yield progress
+
+
+async def _main(mode: str, batch_size: int) -> None:
+    async with AsyncSessionLocal() as db:
+        async for progress in reconcile_inventory(db, mode, batch_size):
+            print(json.dumps(asdict(progress)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify or repair stock snapshots against the inventory ledger.")
+    parser.add_argument("mode", choices=MODES)
+    parser.add_argument("--batch-size", type=int, default=settings.INVENTORY_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(_main(args.mode, args.batch_size))
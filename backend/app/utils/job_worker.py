@@ -0,0 +1,43 @@
+# backend/app/utils/job_worker.py
+"""
+Standalone background job worker.
+
+Runs the same worker pool the API starts when JOBS_ENABLED is set, for
+deployments that keep job processing out of the web processes. Stops on
+SIGINT/SIGTERM after the batches in progress finish.
+
+    python -m app.utils.job_worker --workers 8 --batch-size 50
+"""
+import argparse
+import asyncio
+import signal
+
+from app.core.config import settings
+from app.core.jobs import JobWorkerPool
+from app.crud import crud  # noqa: F401  registers the job handlers
+from app.db.session import engine
+
+
+async def _main(workers: int, batch_size: int) -> None:
+    pool = JobWorkerPool(
+        workers=workers,
+        batch_size=batch_size,
+        poll_interval=settings.JOBS_POLL_INTERVAL_SECONDS,
+        lease_seconds=settings.JOBS_LEASE_SECONDS,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    pool.start()
+    await stop.wait()
+    await pool.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process background jobs from the Postgres queue.")
+    parser.add_argument("--workers", type=int, default=settings.JOBS_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=settings.JOBS_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(_main(args.workers, args.batch_size))
@@ -0,0 +1,29 @@
+# backend/app/utils/order_summaries.py
+"""
+Backfill the order_summaries projection.
+
+Checkout writes each order's summary in its own transaction; this fills in
+orders created before the projection existed, or inserted in bulk. It can
+run while the app serves traffic and is safe to repeat.
+
+    python -m app.utils.order_summaries --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+
+from app.crud import crud
+from app.db.session import AsyncSessionLocal
+
+
+async def _main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as db:
+        written = await crud.backfill_order_summaries(db, batch_size=batch_size)
+    print(json.dumps({"summaries_written": written}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write missing order summaries.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size))
@@ -0,0 +1,30 @@
+# backend/benchmarks/__init__.py
+"""
+Benchmark and load-test harness for the API hot paths.
+
+Runs against the database in DATABASE_URL, which must be a disposable
+Postgres instance: `seed --reset` drops and recreates every table.
+
+    python -m benchmarks seed --reset --scale medium
+    python -m benchmarks run --concurrency 16 --baseline baseline.json
+
+    python -m benchmarks seed --reset --scale xxlarge
+    python -m benchmarks run --scenarios product_list_deep,product_list_offset
+
+    python -m benchmarks inventory --events 10000000
+    python -m benchmarks snapshot --pages 200 --limit 100
+    python -m benchmarks seed --reset --scale search && python -m benchmarks search --queries 400
+    python -m benchmarks catalogimport --variants 1000000
+    python -m benchmarks jobs --jobs 20000 --workers 1,4,16
+    python -m benchmarks coupons --attempts 5000 --usage-limit 1000
+    python -m benchmarks contention --checkouts 500 --variants 3 --stock 50
+    python -m benchmarks loginstorm --requests 2000 --storm 64
+    python -m benchmarks ratelimit --requests 100000
+    python -m benchmarks serialization --page-size 100
+
+`run` prints throughput and p50/p95/p99 latency per scenario as JSON. With
+--baseline it exits non-zero when a scenario regressed beyond --tolerance.
+`coupons` exits non-zero if a code was redeemed more times than its limit,
+`contention` if checkouts oversold stock, left the ledger inconsistent or
+failed with anything other than a 409.
+"""
@@ -0,0 +1,283 @@
+# backend/benchmarks/__main__.py
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, fields
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from benchmarks import (
+    catalog_import, contention, coupons, inventory, jobs, login_storm, rate_limit, search, serialization, snapshot,
+)
+from benchmarks.runner import asgi_client, compare, run_scenario, uvicorn_client
+from benchmarks.scenarios import HEAVY_SCENARIOS, SCENARIOS, load_context
+from benchmarks.seed import Scale, reset_schema, seed
+
+
+async def _seed(args) -> None:
+    scale = Scale.preset(args.scale)
+    for f in fields(Scale):
+        override = getattr(args, f.name)
+        if override is not None:
+            setattr(scale, f.name, override)
+    if args.reset:
+        await reset_schema()
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await seed(db, scale, random_seed=args.seed)
+    print(json.dumps({"scale": asdict(scale), "seconds": round(time.perf_counter() - start, 2)}))
+
+
+async def _run(args) -> int:
+    # Every simulated client shares one address, which the limiter would throttle
+    settings.RATE_LIMIT_ENABLED = args.rate_limit
+    from app.main import app
+
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+
+    if args.transport == "uvicorn":
+        client_context = uvicorn_client(app, args.concurrency)
+    else:
+        client_context = asgi_client(app)
+
+    results = {
+        "meta": {
+            "transport": args.transport,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "scenarios": {},
+    }
+    async with client_context as client:
+        async with AsyncSessionLocal() as db:
+            ctx = await load_context(db, client, args.concurrency)
+        for name in names:
+            requests = args.heavy_requests if name in HEAVY_SCENARIOS else args.requests
+            # Warm caches, pools and prepared statements before measuring
+            await run_scenario(client, SCENARIOS[name], ctx, min(args.concurrency, requests), args.concurrency)
+            result = await run_scenario(client, SCENARIOS[name], ctx, requests, args.concurrency)
+            results["scenarios"][name] = result.summary()
+            print(f"{name}: {json.dumps(results['scenarios'][name])}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+async def _inventory(args) -> None:
+    async with AsyncSessionLocal() as db:
+        result = await inventory.run(db, args.events, args.batch_size, seed=not args.no_seed)
+    print(json.dumps(result, indent=2))
+
+
+async def _jobs(args) -> None:
+    async with AsyncSessionLocal() as db:
+        workers = [int(count) for count in args.workers.split(",")]
+        result = await jobs.run(db, args.jobs, workers, args.batch_size)
+    print(json.dumps(result, indent=2))
+
+
+async def _coupons(args) -> int:
+    async with AsyncSessionLocal() as db:
+        result = await coupons.run(db, args.attempts, args.usage_limit, args.concurrency)
+    print(json.dumps(result, indent=2))
+    return 0 if result["correct"] else 1
+
+
+async def _catalogimport(args) -> None:
+    async with AsyncSessionLocal() as db:
+        result = await catalog_import.run(db, args.variants, args.variants_per_product, args.format, args.chunk_size)
+    print(json.dumps(result, indent=2))
+
+
+async def _contention(args) -> int:
+    # Every checkout comes from one address, and the cleanup runs before any payment job would
+    settings.RATE_LIMIT_ENABLED = False
+    settings.JOBS_ENABLED = False
+    from app.main import app
+
+    if args.transport == "uvicorn":
+        client_context = uvicorn_client(app, args.checkouts)
+    else:
+        client_context = asgi_client(app)
+    async with client_context as client:
+        async with AsyncSessionLocal() as db:
+            result = await contention.run(db, client, args.checkouts, args.variants, args.stock)
+    print(json.dumps(result, indent=2))
+    return 0 if result["correct"] else 1
+
+
+async def _loginstorm(args) -> None:
+    # The storm comes from one address, which the login limit would throttle to a trickle
+    settings.RATE_LIMIT_ENABLED = False
+    settings.PASSWORD_HASH_EXECUTOR = args.executor
+    from app.main import app
+
+    if args.transport == "uvicorn":
+        client_context = uvicorn_client(app, args.concurrency + args.storm)
+    else:
+        client_context = asgi_client(app)
+    async with client_context as client:
+        async with AsyncSessionLocal() as db:
+            ctx = await load_context(db, client, args.concurrency)
+        result = await login_storm.run(client, ctx, args.requests, args.concurrency, args.storm)
+    result["executor"] = args.executor
+    print(json.dumps(result, indent=2))
+
+
+async def _ratelimit(args) -> None:
+    result = await rate_limit.run(args.requests, args.clients, redis_url=args.redis_url)
+    print(json.dumps(result, indent=2))
+
+
+async def _search(args) -> None:
+    async with AsyncSessionLocal() as db:
+        result = await search.run(db, args.queries, args.limit)
+    print(json.dumps(result, indent=2))
+
+
+async def _snapshot(args) -> None:
+    async with AsyncSessionLocal() as db:
+        result = await snapshot.run(db, args.pages, args.limit)
+    print(json.dumps(result, indent=2))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="insert synthetic benchmark data")
+    seed_parser.add_argument("--scale", choices=["small", "medium", "large", "xlarge", "xxlarge", "search"], default="medium")
+    seed_parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    seed_parser.add_argument("--seed", type=int, default=42, help="random seed")
+    for f in fields(Scale):
+        seed_parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, type=int)
+
+    run_parser = commands.add_parser("run", help="drive the API and report latency")
+    run_parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    run_parser.add_argument("--scenarios", help=f"comma separated, from: {', '.join(SCENARIOS)}")
+    run_parser.add_argument("--requests", type=int, default=500, help="iterations per scenario")
+    run_parser.add_argument("--heavy-requests", type=int, default=20, help="iterations for export scenarios")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--output", help="write results JSON here instead of stdout")
+    run_parser.add_argument("--baseline", help="results JSON to compare against")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    run_parser.add_argument("--rate-limit", action="store_true", help="keep the rate limiting middleware on")
+
+    inventory_parser = commands.add_parser("inventory", help="time ledger verify/rebuild over many events")
+    inventory_parser.add_argument("--events", type=int, default=10_000_000)
+    inventory_parser.add_argument("--batch-size", type=int, default=settings.INVENTORY_BATCH_SIZE)
+    inventory_parser.add_argument("--no-seed", action="store_true", help="reuse events already in the ledger")
+
+    snapshot_parser = commands.add_parser("snapshot", help="compare listing CPU and memory: database vs snapshot")
+    snapshot_parser.add_argument("--pages", type=int, default=200)
+    snapshot_parser.add_argument("--limit", type=int, default=100)
+
+    search_parser = commands.add_parser("search", help="search latency per backend over the seeded catalog")
+    search_parser.add_argument("--queries", type=int, default=400)
+    search_parser.add_argument("--limit", type=int, default=20, help="hits per query")
+
+    catalogimport_parser = commands.add_parser(
+        "catalogimport", help="bulk catalog import throughput and event loop lag, inserting then updating"
+    )
+    catalogimport_parser.add_argument("--variants", type=int, default=1_000_000, help="import rows")
+    catalogimport_parser.add_argument("--variants-per-product", type=int, default=4)
+    catalogimport_parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    catalogimport_parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+
+    jobs_parser = commands.add_parser("jobs", help="measure job queue throughput")
+    jobs_parser.add_argument("--jobs", type=int, default=20000)
+    jobs_parser.add_argument("--workers", default="1,4,16", help="comma separated worker counts")
+    jobs_parser.add_argument("--batch-size", type=int, default=settings.JOBS_BATCH_SIZE)
+
+    coupons_parser = commands.add_parser("coupons", help="flash sale: concurrent redemptions of one coupon code")
+    coupons_parser.add_argument("--attempts", type=int, default=5000)
+    coupons_parser.add_argument("--usage-limit", type=int, default=1000)
+    coupons_parser.add_argument("--concurrency", type=int, default=settings.DB_POOL_SIZE)
+
+    contention_parser = commands.add_parser(
+        "contention", help="concurrent checkouts of a few low-stock variants: no overselling, no deadlocks"
+    )
+    contention_parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    contention_parser.add_argument("--checkouts", type=int, default=500)
+    contention_parser.add_argument("--variants", type=int, default=3, help="hot variants shared by every cart")
+    contention_parser.add_argument("--stock", type=int, default=50, help="opening stock per hot variant")
+
+    loginstorm_parser = commands.add_parser(
+        "loginstorm", help="product listing p99 on its own and during a /auth/login storm"
+    )
+    loginstorm_parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="uvicorn")
+    loginstorm_parser.add_argument("--requests", type=int, default=2000, help="listing requests per phase")
+    loginstorm_parser.add_argument("--concurrency", type=int, default=16, help="listing workers")
+    loginstorm_parser.add_argument("--storm", type=int, default=64, help="concurrent login workers")
+    loginstorm_parser.add_argument("--executor", choices=["thread", "process"], default=settings.PASSWORD_HASH_EXECUTOR)
+
+    ratelimit_parser = commands.add_parser("ratelimit", help="per-request overhead of the rate limiter")
+    ratelimit_parser.add_argument("--requests", type=int, default=100000)
+    ratelimit_parser.add_argument("--clients", type=int, default=10000, help="distinct IPs and users")
+    ratelimit_parser.add_argument("--redis-url", help="also measure the Redis store")
+
+    serialization_parser = commands.add_parser(
+        "serialization", help="list responses: response_model validation vs FAST_JSON_RESPONSES"
+    )
+    serialization_parser.add_argument("--page-size", type=int, default=100)
+    serialization_parser.add_argument("--variants", type=int, default=4, help="variants per product")
+    serialization_parser.add_argument("--rounds", type=int, default=200)
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        asyncio.run(_seed(args))
+        return 0
+    if args.command == "inventory":
+        asyncio.run(_inventory(args))
+        return 0
+    if args.command == "jobs":
+        asyncio.run(_jobs(args))
+        return 0
+    if args.command == "catalogimport":
+        asyncio.run(_catalogimport(args))
+        return 0
+    if args.command == "coupons":
+        return asyncio.run(_coupons(args))
+    if args.command == "contention":
+        return asyncio.run(_contention(args))
+    if args.command == "loginstorm":
+        asyncio.run(_loginstorm(args))
+        return 0
+    if args.command == "ratelimit":
+        asyncio.run(_ratelimit(args))
+        return 0
+    if args.command == "serialization":
+        result = serialization.run(args.page_size, args.variants, args.rounds)
+        print(json.dumps(result, indent=2))
+        return 0 if all(case["identical_output"] for case in result["cases"]) else 1
+    if args.command == "search":
+        asyncio.run(_search(args))
+        return 0
+    if args.command == "snapshot":
+        asyncio.run(_snapshot(args))
+        return 0
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
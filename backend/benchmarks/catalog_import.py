@@ -0,0 +1,134 @@
+# backend/benchmarks/catalog_import.py
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import models
+from app.utils.catalog_import import import_catalog, iter_rows
+from benchmarks.runner import percentile
+from benchmarks.seed import BRANDS, COLORS, SIZES, WORDS
+
+SLUG = "bench-import-{}"
+CATEGORY_SLUG = "bench-import"
+COLUMNS = [
+    "title", "slug", "description", "category_slug", "attributes", "variant_sku", "price",
+    "currency", "stock", "variant_attributes", "image_url",
+]
+# How often the loop-lag probe wakes up
+PROBE_INTERVAL = 0.01
+
+
+def write_catalog(path: str, variants: int, per_product: int, format: str, price_cents: int, seed: int = 7) -> None:
+    """`variants` import rows, `per_product` per product, as CSV or NDJSON."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, COLUMNS) if format == "csv" else None
+        if writer:
+            writer.writeheader()
+        for i in range(variants):
+            product = i // per_product
+            row = {
+                "title": f"{' '.join(rng.sample(WORDS, 3)).title()} {product}",
+                "slug": SLUG.format(product),
+                "description": " ".join(rng.choices(WORDS, k=20)),
+                "category_slug": CATEGORY_SLUG,
+                "attributes": {"brand": rng.choice(BRANDS), "color": rng.choice(COLORS)},
+                "variant_sku": f"BENCH-IMPORT-{product}-{i % per_product}",
+                "price": f"{price_cents / 100:.2f}",
+                "currency": "USD",
+                "stock": rng.randint(0, 100),
+                "variant_attributes": {"size": SIZES[i % per_product % len(SIZES)]},
+                "image_url": f"https://cdn.example.com/import/{product}.jpg",
+            }
+            if writer:
+                writer.writerow({**row, "attributes": json.dumps(row["attributes"]),
+                                 "variant_attributes": json.dumps(row["variant_attributes"])})
+            else:
+                f.write(json.dumps(row) + "\n")
+
+
+async def _cleanup(db: AsyncSession) -> None:
+    products = select(models.Product.id).where(models.Product.slug.like(SLUG.format("%")))
+    variants = select(models.ProductVariant.id).where(models.ProductVariant.product_id.in_(products))
+    await db.execute(delete(models.InventoryEvent).where(models.InventoryEvent.variant_id.in_(variants)))
+    # Variants and images cascade
+    await db.execute(delete(models.Product).where(models.Product.slug.like(SLUG.format("%"))))
+    await db.commit()
+
+
+async def _probe(lags: List[float], stop: asyncio.Event) -> None:
+    # How late the loop runs a timer while the import is going on
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def _import(db: AsyncSession, path: str, format: str, chunk_size: int) -> dict:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    start = time.perf_counter()
+    with open(path, newline="", encoding="utf-8") as f:
+        async for progress in import_catalog(db, iter_rows(f, format), chunk_size):
+            pass
+    seconds = time.perf_counter() - start
+    stop.set()
+    await probe
+    lags.sort()
+    return {
+        "rows": progress.rows_read,
+        "rows_imported": progress.rows_imported,
+        "products_upserted": progress.products_upserted,
+        "seconds": round(seconds, 2),
+        "rows_per_s": round(progress.rows_read / seconds) if seconds else None,
+        "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+    }
+
+
+async def run(db: AsyncSession, variants: int, per_product: int, format: str, chunk_size: int) -> dict:
+    """
+    Import a generated catalog of `variants` rows through import_catalog,
+    then import it again with new prices: the first pass inserts, the
+    second updates every row. While each pass runs, a probe measures how
+    late the event loop wakes a 10ms timer, i.e. how long other requests
+    would wait on a worker doing the import.
+    """
+    await db.execute(
+        pg_insert(models.Category).values(name="Bench Import", slug=CATEGORY_SLUG)
+        .on_conflict_do_nothing(index_elements=[models.Category.slug])
+    )
+    await _cleanup(db)
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        passes = {}
+        for name, price_cents in (("insert", 1999), ("update", 2499)):
+            write_catalog(path, variants, per_product, format, price_cents)
+            passes[name] = await _import(db, path, format, chunk_size)
+        file_mib = os.path.getsize(path) / 2**20
+    finally:
+        os.unlink(path)
+        await _cleanup(db)
+    return {
+        "variants": variants,
+        "variants_per_product": per_product,
+        "format": format,
+        "chunk_size": chunk_size,
+        "file_mib": round(file_mib, 1),
+        "passes": passes,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
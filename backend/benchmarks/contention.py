@@ -0,0 +1,166 @@
+# backend/benchmarks/contention.py
+import asyncio
+import random
+import time
+import uuid
+from decimal import Decimal
+from typing import Dict, List
+from uuid import UUID
+
+import httpx
+from sqlalchemy import String, cast, delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models import models
+from benchmarks.runner import percentile
+
+SLUG = "bench-contention"
+EMAIL = "bench-contention-{}@example.com"
+
+
+async def _cleanup(db: AsyncSession) -> None:
+    # Everything a previous run left: its users' orders and jobs, carts, and the hot variants
+    users = select(models.User.id).where(models.User.email.like(EMAIL.format("%")))
+    orders = select(models.Order.id).where(models.Order.user_id.in_(users))
+    variants = select(models.ProductVariant.id).join(models.Product).where(models.Product.slug == SLUG)
+    await db.execute(delete(models.Job).where(
+        models.Job.payload["order_id"].astext.in_(
+            select(cast(models.Order.id, String)).where(models.Order.user_id.in_(users))
+        )
+    ))
+    await db.execute(delete(models.Payment).where(models.Payment.order_id.in_(orders)))
+    await db.execute(delete(models.Shipment).where(models.Shipment.order_id.in_(orders)))
+    await db.execute(delete(models.Order).where(models.Order.id.in_(orders)))
+    await db.execute(delete(models.Cart).where(models.Cart.user_id.in_(users)))
+    await db.execute(delete(models.User).where(models.User.id.in_(users)))
+    await db.execute(delete(models.InventoryEvent).where(models.InventoryEvent.variant_id.in_(variants)))
+    await db.execute(delete(models.Product).where(models.Product.slug == SLUG))
+    await db.commit()
+
+
+async def _setup(db: AsyncSession, checkouts: int, variants: int, stock: int, rng: random.Random) -> List[UUID]:
+    """
+    `variants` hot variants with `stock` units each, and one user per
+    checkout whose cart holds a random subset of them. Lines are added in
+    random order, so only checkout's own lock ordering keeps overlapping
+    carts from deadlocking. Returns the user ids.
+    """
+    product_id = uuid.uuid4()
+    await db.execute(insert(models.Product).values(
+        id=product_id, title="Bench Contention", slug=SLUG, description="Low stock, high demand",
+    ))
+    hot = [
+        {"id": uuid.uuid4(), "product_id": product_id, "sku": f"BENCH-CONTENTION-{i}",
+         "price": Decimal("10.00"), "currency": "USD", "stock": stock}
+        for i in range(variants)
+    ]
+    await db.execute(insert(models.ProductVariant), hot)
+    await db.execute(insert(models.InventoryEvent), [
+        {"variant_id": variant["id"], "delta": stock, "reason": "opening_balance"} for variant in hot
+    ])
+
+    users, carts, items = [], [], []
+    for i in range(checkouts):
+        user_id, cart_id = uuid.uuid4(), uuid.uuid4()
+        users.append({"id": user_id, "email": EMAIL.format(i), "password_hash": "!", "is_active": True})
+        carts.append({"id": cart_id, "user_id": user_id})
+        for variant in rng.sample(hot, rng.randint(1, variants)):
+            items.append({
+                "id": uuid.uuid4(), "cart_id": cart_id, "variant_id": variant["id"],
+                "quantity": rng.randint(1, 2), "price_at_add": variant["price"],
+            })
+    await db.execute(insert(models.User), users)
+    await db.execute(insert(models.Cart), carts)
+    await db.execute(insert(models.CartItem), items)
+    await db.commit()
+    return [user["id"] for user in users]
+
+
+async def _verify(db: AsyncSession, stock: int) -> Dict[str, dict]:
+    # Per hot variant: units sold to the benchmark users, stock snapshot and ledger sum
+    sold = (
+        select(func.coalesce(func.sum(models.OrderItem.quantity), 0))
+        .join(models.Order, models.Order.id == models.OrderItem.order_id)
+        .join(models.User, models.User.id == models.Order.user_id)
+        .where(models.OrderItem.variant_id == models.ProductVariant.id)
+        .where(models.User.email.like(EMAIL.format("%")))
+        .scalar_subquery()
+    )
+    ledger = (
+        select(func.coalesce(func.sum(models.InventoryEvent.delta), 0))
+        .where(models.InventoryEvent.variant_id == models.ProductVariant.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(models.ProductVariant.sku, models.ProductVariant.stock, sold, ledger)
+        .join(models.Product)
+        .where(models.Product.slug == SLUG)
+        .order_by(models.ProductVariant.sku)
+    )
+    return {
+        sku: {"stock": current, "sold": units, "ledger": total, "consistent": current == total == stock - units}
+        for sku, current, units, total in result.all()
+    }
+
+
+async def run(
+    db: AsyncSession, client: httpx.AsyncClient, checkouts: int, variants: int, stock: int, seed: int = 7
+) -> dict:
+    """
+    Fire `checkouts` POST /orders/checkout requests at once, every cart
+    drawing on the same few low-stock variants. Checkouts either complete
+    or get a 409; stock must never go negative, every variant's snapshot
+    must equal its ledger and its opening stock minus the units sold, and
+    no request may fail otherwise (a deadlock surfaces as a 500).
+    """
+    await _cleanup(db)
+    user_ids = await _setup(db, checkouts, variants, stock, random.Random(seed))
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': EMAIL.format(i), 'uid': str(user_id)})}"}
+        for i, user_id in enumerate(user_ids)
+    ]
+    url = f"{settings.API_V1_STR}/orders/checkout"
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def checkout(user_headers: Dict[str, str]) -> None:
+        start = time.perf_counter()
+        try:
+            status = str((await client.post(url, headers=user_headers)).status_code)
+        except Exception as e:
+            # The in-process transport re-raises application errors
+            status = type(e).__name__
+            if "deadlock" in str(e).lower():
+                status = "deadlock"
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(checkout(user_headers) for user_headers in headers))
+    seconds = time.perf_counter() - start
+
+    stock_levels = await _verify(db, stock)
+    latencies.sort()
+    completed, rejected = statuses.get("201", 0), statuses.get("409", 0)
+    failed = {status: count for status, count in statuses.items() if status not in ("201", "409")}
+    result = {
+        "checkouts": checkouts,
+        "hot_variants": variants,
+        "stock_per_variant": stock,
+        "completed": completed,
+        "rejected_409": rejected,
+        "failed": failed,
+        "deadlocks": statuses.get("deadlock", 0),
+        "oversold": any(level["stock"] < 0 for level in stock_levels.values()),
+        "variants": stock_levels,
+        "correct": not failed and all(level["consistent"] and level["stock"] >= 0 for level in stock_levels.values()),
+        "seconds": round(seconds, 3),
+        "checkouts_per_s": round(checkouts / seconds) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    await _cleanup(db)
+    return result
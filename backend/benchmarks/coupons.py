@@ -0,0 +1,70 @@
+# backend/benchmarks/coupons.py
+import asyncio
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.coupons import CouponEntry
+from app.crud.crud import redeem_coupon
+from app.db.session import AsyncSessionLocal
+from app.models import models
+
+CODE = "BENCH-FLASH"
+
+
+async def _redeem(entry: CouponEntry, gate: asyncio.Semaphore, latencies: list) -> bool:
+    # One checkout's worth of coupon work: its own session, the conditional
+    # UPDATE, and the commit that releases the row lock
+    async with gate:
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            redeemed = await redeem_coupon(db, entry)
+            await db.commit()
+        latencies.append(time.perf_counter() - start)
+        return redeemed
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run(db: AsyncSession, attempts: int, usage_limit: int, concurrency: int) -> dict:
+    """
+    Flash sale: `attempts` concurrent redemptions of one code limited to
+    `usage_limit` uses. Exactly min(attempts, usage_limit) must succeed and
+    the stored counter must never pass the limit.
+    """
+    await db.execute(delete(models.Coupon).where(models.Coupon.code == CODE))
+    coupon = models.Coupon(code=CODE, discount_type="percent", discount_value=10, usage_limit=usage_limit)
+    db.add(coupon)
+    await db.commit()
+    await db.refresh(coupon)
+    entry = CouponEntry(coupon.id, coupon.code, coupon.discount_type, coupon.discount_value, coupon.expires_at)
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list = []
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(_redeem(entry, gate, latencies) for _ in range(attempts)))
+    seconds = time.perf_counter() - start
+
+    await db.refresh(coupon)
+    redeemed = sum(outcomes)
+    expected = min(attempts, usage_limit)
+    await db.execute(delete(models.Coupon).where(models.Coupon.id == coupon.id))
+    await db.commit()
+    return {
+        "attempts": attempts,
+        "usage_limit": usage_limit,
+        "concurrency": concurrency,
+        "redeemed": redeemed,
+        "rejected": attempts - redeemed,
+        "stored_used": coupon.used,
+        "oversold": max(0, redeemed - usage_limit),
+        "correct": redeemed == expected == coupon.used,
+        "seconds": round(seconds, 3),
+        "attempts_per_s": round(attempts / seconds) if seconds else None,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
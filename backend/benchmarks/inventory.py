@@ -0,0 +1,71 @@
+# backend/benchmarks/inventory.py
+import time
+
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import models
+from app.utils.inventory_ledger import reconcile_inventory
+
+
+async def seed_events(db: AsyncSession, events: int) -> int:
+    """
+    Append about `events` random ledger events spread evenly over all
+    variants, generated server side in one INSERT ... SELECT.
+    """
+    variants = await db.scalar(select(func.count()).select_from(models.ProductVariant))
+    if not variants:
+        raise RuntimeError("No variants found; run `python -m benchmarks seed` first")
+    per_variant = -(-events // variants)
+    await db.execute(
+        text(
+            "INSERT INTO inventory_events (id, variant_id, delta, reason, created_at) "
+            "SELECT gen_random_uuid(), v.id, (random() * 20)::int - 10, 'benchmark', now() "
+            "FROM product_variants v CROSS JOIN generate_series(1, :per_variant)"
+        ),
+        {"per_variant": per_variant},
+    )
+    await db.commit()
+    await db.execute(text("ANALYZE inventory_events"))
+    return per_variant * variants
+
+
+async def _timed(db: AsyncSession, mode: str, batch_size: int) -> dict:
+    start = time.perf_counter()
+    async for progress in reconcile_inventory(db, mode, batch_size):
+        pass
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "variants": progress.variants_checked,
+        "mismatched": progress.mismatched,
+        "repaired": progress.repaired,
+    }
+
+
+async def run(db: AsyncSession, events: int, batch_size: int, seed: bool = True) -> dict:
+    """
+    Time verify, rebuild and a second verify of the whole ledger. Random
+    seeded events leave nearly every snapshot stale, so rebuild rewrites
+    them all and the final verify should find no mismatches.
+    """
+    if seed:
+        start = time.perf_counter()
+        seeded = await seed_events(db, events)
+        seed_seconds = round(time.perf_counter() - start, 3)
+    else:
+        seeded, seed_seconds = None, None
+    total = await db.scalar(select(func.count()).select_from(models.InventoryEvent))
+
+    verify = await _timed(db, "verify", batch_size)
+    rebuild = await _timed(db, "rebuild", batch_size)
+    reverify = await _timed(db, "verify", batch_size)
+    return {
+        "events": total,
+        "events_seeded": seeded,
+        "seed_s": seed_seconds,
+        "batch_size": batch_size,
+        "verify": dict(verify, events_per_s=round(total / verify["seconds"]) if verify["seconds"] else None),
+        "rebuild": dict(rebuild, events_per_s=round(total / rebuild["seconds"]) if rebuild["seconds"] else None),
+        "verify_after_rebuild": reverify,
+    }
@@ -0,0 +1,58 @@
+# backend/benchmarks/jobs.py
+import time
+from typing import List
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.jobs import JobWorkerPool, job_handler
+from app.models import models
+
+NOOP_KIND = "benchmark.noop"
+
+
+@job_handler(NOOP_KIND)
+async def _noop(db: AsyncSession, payload: dict) -> None:
+    # Measures the queue itself: claim, per-job session, delete, commit
+    pass
+
+
+async def _enqueue(db: AsyncSession, jobs: int) -> float:
+    start = time.perf_counter()
+    await db.execute(
+        text(
+            "INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, run_at, created_at) "
+            "SELECT gen_random_uuid(), :kind, jsonb_build_object('n', n), 'pending', 0, :max_attempts, now(), now() "
+            "FROM generate_series(1, :jobs) AS n"
+        ),
+        {"kind": NOOP_KIND, "jobs": jobs, "max_attempts": settings.JOBS_MAX_ATTEMPTS},
+    )
+    await db.commit()
+    return time.perf_counter() - start
+
+
+async def run(db: AsyncSession, jobs: int, workers: List[int], batch_size: int) -> dict:
+    """
+    For each worker count, enqueue `jobs` no-op jobs and time a pool
+    draining them. Leftover benchmark jobs are removed first.
+    """
+    await db.execute(delete(models.Job).where(models.Job.kind == NOOP_KIND))
+    await db.commit()
+    results = []
+    for count in workers:
+        enqueue_seconds = await _enqueue(db, jobs)
+        pool = JobWorkerPool(workers=count, batch_size=batch_size, poll_interval=0.05, lease_seconds=60)
+        start = time.perf_counter()
+        await pool.drain()
+        seconds = time.perf_counter() - start
+        left = await db.scalar(select(func.count()).select_from(models.Job).filter(models.Job.kind == NOOP_KIND))
+        results.append({
+            "workers": count,
+            "seconds": round(seconds, 3),
+            "jobs_per_s": round(jobs / seconds) if seconds else None,
+            "enqueue_jobs_per_s": round(jobs / enqueue_seconds) if enqueue_seconds else None,
+            "left_in_queue": left,
+        })
+    return {"jobs": jobs, "batch_size": batch_size, "pool_size": settings.DB_POOL_SIZE, "runs": results}
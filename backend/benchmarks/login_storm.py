@@ -0,0 +1,67 @@
+# backend/benchmarks/login_storm.py
+import asyncio
+import time
+
+import httpx
+
+from benchmarks import scenarios
+from benchmarks.runner import ScenarioResult, run_scenario
+from benchmarks.scenarios import Context
+
+# Lets the storm fill the hashing pool before the listing is measured under it
+RAMP_UP_SECONDS = 1.0
+
+
+async def _storm(client: httpx.AsyncClient, ctx: Context, workers: int, stop: asyncio.Event) -> ScenarioResult:
+    """Log in from `workers` workers back to back until `stop` is set."""
+    result = ScenarioResult()
+
+    async def worker(worker_id: int):
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                response = await scenarios.login(client, ctx, worker_id)
+                ok, status = response.is_success, str(response.status_code)
+            except httpx.HTTPError as e:
+                ok, status = False, type(e).__name__
+            result.latencies.append(time.perf_counter() - start)
+            result.requests += 1
+            if not ok:
+                result.errors += 1
+                result.error_statuses[status] = result.error_statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(workers)))
+    result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+async def run(client: httpx.AsyncClient, ctx: Context, requests: int, concurrency: int, storm: int) -> dict:
+    """
+    GET /products/ on its own, then again while `storm` workers hammer
+    POST /auth/login. Password hashing runs off the event loop, so the
+    listing's p99 should barely move; logins beyond the hashing pool's
+    queue are shed with 503 rather than queueing behind it.
+    """
+    # Warm caches, pools and prepared statements before measuring
+    await run_scenario(client, scenarios.product_list, ctx, concurrency, concurrency)
+    alone = (await run_scenario(client, scenarios.product_list, ctx, requests, concurrency)).summary()
+
+    stop = asyncio.Event()
+    storm_task = asyncio.create_task(_storm(client, ctx, storm, stop))
+    await asyncio.sleep(RAMP_UP_SECONDS)
+    try:
+        under_storm = (await run_scenario(client, scenarios.product_list, ctx, requests, concurrency)).summary()
+    finally:
+        stop.set()
+        logins = (await storm_task).summary()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "storm_workers": storm,
+        "product_list": alone,
+        "product_list_during_storm": under_storm,
+        "login_storm": logins,
+        "p99_ratio": round(under_storm["p99_ms"] / alone["p99_ms"], 2) if alone["p99_ms"] else None,
+    }
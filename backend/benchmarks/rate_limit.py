@@ -0,0 +1,76 @@
+# backend/benchmarks/rate_limit.py
+import time
+from dataclasses import replace
+from typing import Optional
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    MemoryRateLimitStore, RateLimitMiddleware, RateLimitStore, RedisRateLimitStore, default_policies,
+)
+from app.core.security import create_access_token
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _scope(path: str, client: str, headers=()) -> dict:
+    return {
+        "type": "http", "method": "GET", "path": path, "headers": list(headers),
+        "client": (client, 50000), "query_string": b"",
+    }
+
+
+async def _time(app, scopes, requests: int) -> float:
+    # Mean microseconds per request through app
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % len(scopes)], _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def _measure(store: RateLimitStore, requests: int, clients: int) -> dict:
+    # Rates high enough that every request is allowed: this times the
+    # decision itself, not the 429 path
+    policies = [replace(policy, rate=1e9, burst=10**9) for policy in default_policies()]
+    limited = RateLimitMiddleware(_empty_app, store=store, policies=policies)
+    path = f"{settings.API_V1_STR}/products/"
+    anonymous = [_scope(path, f"10.0.{i // 250}.{i % 250}") for i in range(clients)]
+    authenticated = [
+        _scope(path, "10.1.0.1", [(b"authorization", f"Bearer {create_access_token({'sub': f'u{i}@x'})}".encode())])
+        for i in range(clients)
+    ]
+    bare = await _time(_empty_app, anonymous, requests)
+    by_ip = await _time(limited, anonymous, requests)
+    by_user = await _time(limited, authenticated, requests)
+    return {
+        "bare_us": round(bare, 2),
+        "per_ip_us": round(by_ip, 2),
+        "per_user_us": round(by_user, 2),
+        "per_ip_overhead_us": round(by_ip - bare, 2),
+        "per_user_overhead_us": round(by_user - bare, 2),
+    }
+
+
+async def run(requests: int, clients: int, redis_url: Optional[str] = None) -> dict:
+    """
+    Per-request cost of the rate limiting middleware over an empty ASGI
+    app, keyed by IP and by bearer token (which adds a JWT decode), for
+    the in-memory store and optionally Redis.
+    """
+    results = {"requests": requests, "clients": clients, "memory": None, "redis": None}
+    results["memory"] = await _measure(MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS), requests, clients)
+    if redis_url:
+        store = RedisRateLimitStore.from_url(redis_url, prefix="bench-ratelimit:")
+        results["redis"] = await _measure(store, requests, clients)
+        await store.client.aclose()
+    return results
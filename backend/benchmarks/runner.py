@@ -0,0 +1,142 @@
+# backend/benchmarks/runner.py
+import asyncio
+import math
+import socket
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+from benchmarks.scenarios import Context, Scenario
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int = 0
+    errors: int = 0
+    duration_seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    # status code -> count, for the non-2xx responses
+    error_statuses: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_statuses": self.error_statuses,
+            "duration_s": round(self.duration_seconds, 3),
+            "throughput_rps": round(self.requests / self.duration_seconds, 2) if self.duration_seconds else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int
+) -> ScenarioResult:
+    """
+    Issue `requests` iterations of a scenario from `concurrency` workers. Each
+    worker sticks to one benchmark user, so per-user state such as carts is
+    never contended between workers.
+    """
+    result = ScenarioResult()
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int):
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, worker_id)
+                ok = response.is_success
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                ok, status = False, type(e).__name__
+            result.latencies.append(time.perf_counter() - start)
+            result.requests += 1
+            if not ok:
+                result.errors += 1
+                result.error_statuses[status] = result.error_statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+# ===================================================================
+# Transports
+# ===================================================================
+
+@asynccontextmanager
+async def asgi_client(app) -> AsyncIterator[httpx.AsyncClient]:
+    """In-process client; measures the app without any network stack."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(app, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Serve the app with uvicorn on a local socket and talk to it over HTTP."""
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if serve_task.done():
+                serve_task.result()
+            await asyncio.sleep(0.05)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await serve_task
+
+
+# ===================================================================
+# Baseline comparison
+# ===================================================================
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Return a line per regression: a scenario whose p95 latency grew, or whose
+    throughput dropped, by more than `tolerance` (0.2 = 20%) against the
+    baseline, or which now returns errors it did not before.
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
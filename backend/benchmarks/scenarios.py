@@ -0,0 +1,204 @@
+# backend/benchmarks/scenarios.py
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.models import models
+from benchmarks.seed import ADMIN_EMAIL, BENCH_PASSWORD, BRANDS, COLORS, SIZES, USER_EMAIL, WORDS
+
+API = settings.API_V1_STR
+
+
+@dataclass
+class Context:
+    product_slugs: List[str]
+    variant_ids: List[UUID]
+    user_emails: List[str]
+    # Seeded products, and listing cursors into the older half of them
+    product_count: int = 0
+    deep_cursors: List[str] = field(default_factory=list)
+    # Where each worker's walk through the listing stands
+    cursors: Dict[int, Optional[str]] = field(default_factory=dict)
+    # Bearer headers, one per worker
+    user_headers: List[Dict[str, str]] = field(default_factory=list)
+    admin_headers: Dict[str, str] = field(default_factory=dict)
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+
+    def user(self, worker_id: int) -> Dict[str, str]:
+        return self.user_headers[worker_id % len(self.user_headers)]
+
+    def variant(self) -> str:
+        return str(self.rng.choice(self.variant_ids))
+
+
+Scenario = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post(f"{API}/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+
+async def _bearer(client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    response = await _login(client, email)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def load_context(db: AsyncSession, client: httpx.AsyncClient, workers: int) -> Context:
+    """Collect ids from the seeded database and log in one user per worker."""
+    slugs = await db.execute(
+        select(models.Product.slug).where(models.Product.slug.like("bench-product-%")).limit(5000)
+    )
+    variants = await db.execute(
+        select(models.ProductVariant.id).where(models.ProductVariant.sku.like("BENCH-%")).limit(5000)
+    )
+    emails = await db.execute(
+        select(models.User.email).where(models.User.email.like(USER_EMAIL.format("%"))).order_by(models.User.email)
+    )
+    ctx = Context(
+        product_slugs=list(slugs.scalars()),
+        variant_ids=list(variants.scalars()),
+        user_emails=list(emails.scalars()),
+    )
+    if not ctx.product_slugs or not ctx.user_emails:
+        raise RuntimeError("No benchmark data found; run `python -m benchmarks seed` first")
+
+    ctx.product_count = await db.scalar(
+        select(func.count()).select_from(models.Product).where(models.Product.slug.like("bench-product-%"))
+    )
+    # bench-product-{i} is the i-th newest, so depth in the listing is a slug lookup, not an OFFSET
+    depths = ctx.rng.sample(range(ctx.product_count // 2, ctx.product_count), min(64, ctx.product_count // 2 or 1))
+    deep = await db.execute(
+        select(models.Product.created_at, models.Product.id)
+        .where(models.Product.slug.in_([f"bench-product-{depth}" for depth in depths]))
+    )
+    ctx.deep_cursors = [encode_cursor(created_at, product_id) for created_at, product_id in deep.all()]
+
+    for email in ctx.user_emails[:workers]:
+        ctx.user_headers.append(await _bearer(client, email))
+    ctx.admin_headers = await _bearer(client, ADMIN_EMAIL)
+    return ctx
+
+
+# ===================================================================
+# Scenarios. Each one is a single iteration; its latency is what gets
+# recorded. Multi-request iterations say so in their docstring.
+# ===================================================================
+
+async def login(client, ctx, worker_id):
+    return await _login(client, ctx.user_emails[worker_id % len(ctx.user_emails)])
+
+async def product_list(client, ctx, worker_id):
+    return await client.get(f"{API}/products/", params={"limit": 50})
+
+async def product_list_by_rating(client, ctx, worker_id):
+    return await client.get(f"{API}/products/", params={"limit": 50, "sort": "rating", "min_rating": 3})
+
+async def product_list_filtered(client, ctx, worker_id):
+    """Attribute, variant and price filters with facet counts."""
+    params = {
+        "limit": 50,
+        "attr": [f"brand:{ctx.rng.choice(BRANDS)}", f"color:{ctx.rng.choice(COLORS)}"],
+        "vattr": [f"size:{size}" for size in ctx.rng.sample(SIZES, 2)],
+        "min_price": 50,
+        "max_price": 300,
+        "facets": "true",
+    }
+    return await client.get(f"{API}/products/", params=params)
+
+async def product_list_offset(client, ctx, worker_id):
+    # Legacy offset mode, anywhere in the catalog
+    skip = ctx.rng.randrange(max(ctx.product_count - 50, 1))
+    return await client.get(f"{API}/products/", params={"limit": 50, "skip": skip})
+
+async def product_list_deep(client, ctx, worker_id):
+    """
+    Cursor pagination deep in the catalog: each worker starts at a page in
+    the older half of the listing and follows next_cursor one page per
+    iteration, starting again deep when its walk reaches the end.
+    """
+    cursor = ctx.cursors.get(worker_id) or ctx.rng.choice(ctx.deep_cursors)
+    response = await client.get(f"{API}/products/", params={"limit": 50, "cursor": cursor})
+    ctx.cursors[worker_id] = response.json()["next_cursor"] if response.is_success else None
+    return response
+
+async def product_detail(client, ctx, worker_id):
+    return await client.get(f"{API}/products/{ctx.rng.choice(ctx.product_slugs)}")
+
+async def product_batch(client, ctx, worker_id):
+    """A cart-sized page: 20 products by slug and 10 by variant id in one call."""
+    body = {
+        "slugs": ctx.rng.sample(ctx.product_slugs, min(20, len(ctx.product_slugs))),
+        "variant_ids": [ctx.variant() for _ in range(10)],
+    }
+    return await client.post(f"{API}/products/batch", json=body)
+
+async def categories(client, ctx, worker_id):
+    return await client.get(f"{API}/products/categories")
+
+async def search(client, ctx, worker_id):
+    q = " ".join(ctx.rng.sample(WORDS, 2))
+    return await client.get(f"{API}/products/search", params={"q": q, "limit": 20})
+
+async def add_to_cart(client, ctx, worker_id):
+    return await client.post(
+        f"{API}/cart/items", json={"variant_id": ctx.variant(), "quantity": 1}, headers=ctx.user(worker_id)
+    )
+
+async def cart_batch(client, ctx, worker_id):
+    items = [{"variant_id": ctx.variant(), "quantity": ctx.rng.randint(0, 3)} for _ in range(10)]
+    return await client.post(f"{API}/cart/items/batch", json={"items": items}, headers=ctx.user(worker_id))
+
+async def checkout(client, ctx, worker_id):
+    """Adds two items to the cart, then checks out: three requests."""
+    headers = ctx.user(worker_id)
+    for _ in range(2):
+        response = await client.post(
+            f"{API}/cart/items", json={"variant_id": ctx.variant(), "quantity": 1}, headers=headers
+        )
+        if not response.is_success:
+            return response
+    return await client.post(f"{API}/orders/checkout", headers=headers)
+
+async def order_history(client, ctx, worker_id):
+    return await client.get(f"{API}/orders/", params={"limit": 20}, headers=ctx.user(worker_id))
+
+async def admin_orders(client, ctx, worker_id):
+    return await client.get(f"{API}/admin/orders", params={"limit": 100}, headers=ctx.admin_headers)
+
+async def admin_orders_export(client, ctx, worker_id):
+    """Streams the full order export; latency is time to the last byte."""
+    async with client.stream("GET", f"{API}/admin/orders/export", headers=ctx.admin_headers) as response:
+        async for _ in response.aiter_bytes():
+            pass
+    return response
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "product_list": product_list,
+    "product_list_by_rating": product_list_by_rating,
+    "product_list_filtered": product_list_filtered,
+    "product_list_offset": product_list_offset,
+    "product_list_deep": product_list_deep,
+    "product_detail": product_detail,
+    "product_batch": product_batch,
+    "categories": categories,
+    "search": search,
+    "add_to_cart": add_to_cart,
+    "cart_batch": cart_batch,
+    "checkout": checkout,
+    "order_history": order_history,
+    "admin_orders": admin_orders,
+    "admin_orders_export": admin_orders_export,
+}
+
+# Scenarios whose iterations are much heavier than a single API call
+HEAVY_SCENARIOS = {"admin_orders_export"}
@@ -0,0 +1,102 @@
+# backend/benchmarks/search.py
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.search import InvertedIndexSearchBackend, PostgresSearchBackend, SearchBackend
+from app.models import models
+from benchmarks.runner import percentile
+from benchmarks.seed import WORDS
+
+# Seeded descriptions draw 30 of WORDS, so plain word queries match most of
+# the catalog (the worst case for ranking); a word with a product number, as
+# titles end with one, matches a single product.
+QUERY_KINDS = ("one_term", "two_terms", "three_terms", "title")
+
+
+def _queries(rng: random.Random, count: int, corpus: int) -> List[Tuple[str, str]]:
+    queries = []
+    for i in range(count):
+        kind = QUERY_KINDS[i % len(QUERY_KINDS)]
+        if kind == "title":
+            q = f"{rng.choice(WORDS)} {rng.randrange(corpus)}"
+        else:
+            q = " ".join(rng.sample(WORDS, QUERY_KINDS.index(kind) + 1))
+        queries.append((kind, q))
+    return queries
+
+
+def _latencies(timings: List[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+    }
+
+
+async def _measure(backend: SearchBackend, db: AsyncSession, queries: List[Tuple[str, str]], limit: int) -> dict:
+    by_kind: Dict[str, List[float]] = {kind: [] for kind in QUERY_KINDS}
+    matches: Dict[str, int] = {kind: 0 for kind in QUERY_KINDS}
+    for kind, q in queries:
+        start = time.perf_counter()
+        result = await backend.search(db, q, limit=limit)
+        by_kind[kind].append(time.perf_counter() - start)
+        matches[kind] += result.total
+    result = _latencies([timing for timings in by_kind.values() for timing in timings])
+    result["by_query"] = {
+        kind: dict(_latencies(timings), mean_matches=round(matches[kind] / len(timings)) if timings else 0)
+        for kind, timings in by_kind.items()
+    }
+    return result
+
+
+async def run(db: AsyncSession, queries: int, limit: int, seed: int = 7) -> dict:
+    """
+    The same query mix against both search backends over the products in
+    the database. The in-memory index is built first; its build time and
+    size (traced Python allocations, from a second build) are reported too.
+    """
+    corpus = await db.scalar(
+        select(func.count()).select_from(models.Product).where(models.Product.is_active.is_not(False))
+    )
+    if not corpus:
+        raise RuntimeError("No products found; run `python -m benchmarks seed` first")
+    mix = _queries(random.Random(seed), queries, corpus)
+
+    memory = InvertedIndexSearchBackend()
+    start = time.perf_counter()
+    await memory.rebuild(db)
+    build_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        traced = InvertedIndexSearchBackend()
+        await traced.rebuild(db)
+        index_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del traced
+
+    postgres = PostgresSearchBackend()
+    # Warm the GIN index and the memory index's dicts before measuring
+    for backend in (postgres, memory):
+        for _, q in mix[:len(QUERY_KINDS)]:
+            await backend.search(db, q, limit=limit)
+
+    memory_result = await _measure(memory, db, mix, limit)
+    memory_result.update(build_seconds=round(build_seconds, 2), index_mib=round(index_bytes / 2**20, 1))
+    return {
+        "corpus_products": corpus,
+        "queries": queries,
+        "limit": limit,
+        "backends": {
+            "postgres": await _measure(postgres, db, mix, limit),
+            "memory": memory_result,
+        },
+    }
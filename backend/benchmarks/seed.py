@@ -0,0 +1,202 @@
+# backend/benchmarks/seed.py
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_password_hash
+from app.crud import crud
+from app.db.base import Base
+from app.db.session import engine
+from app.models import models
+
+BENCH_PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+USER_EMAIL = "bench-user-{}@example.com"
+# Rows per INSERT statement; keeps bind parameters well under the limit
+INSERT_BATCH = 1000
+
+BRANDS = ["acme", "globex", "initech", "umbrella", "hooli", "stark"]
+COLORS = ["rojo", "azul", "negro", "blanco", "verde"]
+SIZES = ["S", "M", "L", "XL"]
+# Products generated and inserted per step
+PRODUCT_CHUNK = 5000
+
+WORDS = (
+    "camisa pantalon zapato reloj bolso lampara mesa silla cable cargador "
+    "auricular teclado raton monitor taza botella mochila gorra chaqueta vestido"
+).split()
+
+
+@dataclass
+class Scale:
+    categories: int = 20
+    products: int = 2000
+    variants_per_product: int = 3
+    users: int = 100
+    orders: int = 5000
+    items_per_order: int = 3
+    cart_items: int = 2
+    reviews_per_product: int = 3
+
+    @classmethod
+    def preset(cls, name: str) -> "Scale":
+        return {
+            "small": cls(categories=10, products=500, users=20, orders=1000),
+            "medium": cls(),
+            "large": cls(categories=100, products=50000, users=1000, orders=200000),
+            # 1M variants, for the attribute filter and facet benchmarks
+            "xlarge": cls(categories=200, products=250000, variants_per_product=4, users=1000, orders=200000),
+            # 500k products and little else, the corpus for `python -m benchmarks search`
+            "search": cls(categories=200, products=500000, variants_per_product=1, users=100, orders=1000,
+                          reviews_per_product=0),
+            # 1M products, for deep cursor pagination (`product_list_deep`)
+            "xxlarge": cls(categories=500, products=1_000_000, variants_per_product=2, users=1000, orders=200000,
+                           reviews_per_product=1),
+        }[name]
+
+
+def _batches(rows: List[dict]) -> Iterable[List[dict]]:
+    for start in range(0, len(rows), INSERT_BATCH):
+        yield rows[start:start + INSERT_BATCH]
+
+
+async def _bulk_insert(db: AsyncSession, model, rows: List[dict]) -> None:
+    for batch in _batches(rows):
+        await db.execute(insert(model), batch)
+
+
+async def reset_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed(db: AsyncSession, scale: Scale, random_seed: int = 42) -> None:
+    """
+    Insert a synthetic catalog, users with carts, and order history. Data is
+    deterministic for a given scale and seed so runs are comparable.
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc)
+    password_hash = await get_password_hash(BENCH_PASSWORD)
+
+    categories = [
+        {"id": uuid.uuid4(), "name": f"Categoria {i}", "slug": f"bench-category-{i}"}
+        for i in range(scale.categories)
+    ]
+    await _bulk_insert(db, models.Category, categories)
+
+    # Written in chunks so million-variant catalogs stay within memory; only
+    # ids and prices are kept for the carts, reviews and orders below.
+    products, variants = [], []
+    for chunk_start in range(0, scale.products, PRODUCT_CHUNK):
+        product_rows, variant_rows = [], []
+        for i in range(chunk_start, min(chunk_start + PRODUCT_CHUNK, scale.products)):
+            product_id = uuid.uuid4()
+            title = " ".join(rng.sample(WORDS, 3)).title()
+            product_rows.append({
+                "id": product_id,
+                "sku": f"BENCH-{i}",
+                "title": f"{title} {i}",
+                "slug": f"bench-product-{i}",
+                "description": " ".join(rng.choices(WORDS, k=30)),
+                "category_id": rng.choice(categories)["id"],
+                "attributes": {
+                    "brand": rng.choice(BRANDS),
+                    "color": rng.choice(COLORS),
+                    "material": rng.choice(WORDS),
+                },
+                "created_at": now - timedelta(minutes=i),
+                "is_active": True,
+            })
+            for v in range(scale.variants_per_product):
+                variant_rows.append({
+                    "id": uuid.uuid4(),
+                    "product_id": product_id,
+                    "sku": f"BENCH-{i}-{v}",
+                    "price": Decimal(rng.randint(500, 50000)) / 100,
+                    "currency": "USD",
+                    "attributes": {"size": SIZES[v % len(SIZES)], "color": rng.choice(COLORS)},
+                    # Effectively unlimited so checkout throughput runs never hit stock-outs;
+                    # `python -m benchmarks contention` covers low stock
+                    "stock": 1_000_000,
+                })
+        await _bulk_insert(db, models.Product, product_rows)
+        await _bulk_insert(db, models.ProductVariant, variant_rows)
+        # Opening balances, so the stock snapshots agree with the ledger
+        await _bulk_insert(db, models.InventoryEvent, [
+            {"id": uuid.uuid4(), "variant_id": variant["id"], "delta": variant["stock"], "reason": "opening_balance"}
+            for variant in variant_rows
+        ])
+        products.extend({"id": product["id"]} for product in product_rows)
+        variants.extend({"id": variant["id"], "price": variant["price"]} for variant in variant_rows)
+
+    users = [{
+        "id": uuid.uuid4(), "email": ADMIN_EMAIL, "password_hash": password_hash,
+        "full_name": "Bench Admin", "is_active": True, "is_staff": True,
+    }]
+    users += [{
+        "id": uuid.uuid4(), "email": USER_EMAIL.format(i), "password_hash": password_hash,
+        "full_name": f"Bench User {i}", "is_active": True, "is_staff": False,
+    } for i in range(scale.users)]
+    await _bulk_insert(db, models.User, users)
+
+    carts, cart_items = [], []
+    for user in users[1:]:
+        cart_id = uuid.uuid4()
+        carts.append({"id": cart_id, "user_id": user["id"]})
+        for variant in rng.sample(variants, scale.cart_items):
+            cart_items.append({
+                "id": uuid.uuid4(), "cart_id": cart_id, "variant_id": variant["id"],
+                "quantity": rng.randint(1, 3), "price_at_add": variant["price"],
+            })
+    await _bulk_insert(db, models.Cart, carts)
+    await _bulk_insert(db, models.CartItem, cart_items)
+
+    for chunk_start in range(0, len(products), PRODUCT_CHUNK):
+        reviews, rating_stats = [], []
+        for product in products[chunk_start:chunk_start + PRODUCT_CHUNK]:
+            ratings = [rng.randint(1, 5) for _ in range(min(scale.reviews_per_product, len(users) - 1))]
+            for user, rating in zip(rng.sample(users[1:], len(ratings)), ratings):
+                reviews.append({
+                    "id": uuid.uuid4(), "product_id": product["id"], "user_id": user["id"],
+                    "rating": rating, "title": " ".join(rng.sample(WORDS, 2)),
+                })
+            if ratings:
+                stats = {"product_id": product["id"], "review_count": len(ratings), "rating_sum": sum(ratings)}
+                stats.update({f"rating_{star}": ratings.count(star) for star in range(1, 6)})
+                rating_stats.append(stats)
+        await _bulk_insert(db, models.Review, reviews)
+        await _bulk_insert(db, models.ProductRatingStats, rating_stats)
+
+    orders, order_items = [], []
+    for i in range(scale.orders):
+        order_id = uuid.uuid4()
+        total = Decimal(0)
+        for variant in rng.sample(variants, scale.items_per_order):
+            quantity = rng.randint(1, 3)
+            line_total = variant["price"] * quantity
+            total += line_total
+            order_items.append({
+                "id": uuid.uuid4(), "order_id": order_id, "variant_id": variant["id"],
+                "quantity": quantity, "unit_price": variant["price"], "total_price": line_total,
+            })
+        orders.append({
+            "id": order_id,
+            "user_id": rng.choice(users[1:])["id"],
+            "status": rng.choice(["pending", "paid", "shipped", "delivered"]),
+            "total_amount": total,
+            "currency": "USD",
+            "created_at": now - timedelta(seconds=i * 30),
+        })
+    await _bulk_insert(db, models.Order, orders)
+    await _bulk_insert(db, models.OrderItem, order_items)
+
+    await db.commit()
+    await crud.backfill_order_summaries(db, batch_size=5000)
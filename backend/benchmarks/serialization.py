@@ -0,0 +1,126 @@
+# backend/benchmarks/serialization.py
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from app.core import serializers
+from app.models import models
+from app.schemas import schemas
+from benchmarks.runner import percentile
+
+BRANDS = ["acme", "globex", "initech", "umbrella"]
+SIZES = ["XS", "S", "M", "L", "XL"]
+
+
+def _variant(rng: random.Random, product_id: uuid.UUID) -> models.ProductVariant:
+    return models.ProductVariant(
+        id=uuid.uuid4(), product_id=product_id, sku=f"SKU-{uuid.uuid4().hex[:12]}",
+        price=Decimal(rng.randint(100, 99999)) / 100, stock=rng.randint(0, 500),
+        attributes={"size": rng.choice(SIZES), "color": rng.choice(["red", "blue", "black"])},
+    )
+
+
+def products(count: int, variants: int, seed: int = 7) -> List[models.Product]:
+    """Transient ORM products shaped like a listing page (category, variants, rating)."""
+    rng = random.Random(seed)
+    category = models.Category(id=uuid.uuid4(), name="Ropa", slug="ropa")
+    page = []
+    for i in range(count):
+        product = models.Product(
+            id=uuid.uuid4(), title=f"Producto {i} — edición ñ", slug=f"producto-{i}",
+            description="Descripción " * 10, category=category, attributes={"brand": rng.choice(BRANDS)},
+        )
+        product.variants = [_variant(rng, product.id) for _ in range(variants)]
+        stars = [rng.randint(0, 20) for _ in range(5)]
+        reviews = sum(stars)
+        product.rating = models.ProductRatingStats(
+            product_id=product.id, review_count=reviews,
+            rating_sum=sum(star * n for star, n in zip(range(1, 6), stars)),
+            average_rating=Decimal(sum(star * n for star, n in zip(range(1, 6), stars)) / reviews).quantize(
+                Decimal("0.01")) if reviews else Decimal(0),
+            **{f"rating_{star}": n for star, n in zip(range(1, 6), stars)},
+        )
+        page.append(product)
+    return page
+
+
+def order_summaries(count: int, seed: int = 7) -> List[models.OrderSummary]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        models.OrderSummary(
+            order_id=uuid.uuid4(), user_id=user_id, status=rng.choice(["pending", "paid", "shipped"]),
+            total_amount=Decimal(rng.randint(1000, 999999)) / 100, discount_amount=Decimal(0), currency="USD",
+            item_count=rng.randint(1, 12), first_item_title=f"Producto {i} — edición ñ",
+            first_item_thumbnail=f"https://cdn.example.com/p/{i}.jpg", created_at=start - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def response_model_path(response_type) -> Callable[[object], bytes]:
+    """What FastAPI does for response_model: validate from attributes, dump, json.dumps."""
+    adapter = TypeAdapter(response_type)
+
+    def serialize(content) -> bytes:
+        value = adapter.validate_python(content, from_attributes=True)
+        return json.dumps(
+            adapter.dump_python(value, mode="json"), ensure_ascii=False, allow_nan=False, indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    return serialize
+
+
+def _time(fn: Callable[[], bytes], rounds: int) -> List[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+
+def _compare(name: str, current: Callable[[], bytes], fast: Callable[[], bytes], rounds: int) -> dict:
+    identical = json.loads(current()) == json.loads(fast())
+    before, after = _time(current, rounds), _time(fast, rounds)
+    p50_before, p50_after = percentile(before, 50), percentile(after, 50)
+    return {
+        "case": name,
+        "identical_output": identical,
+        "response_model_p50_ms": round(p50_before * 1000, 3),
+        "fast_p50_ms": round(p50_after * 1000, 3),
+        "response_model_p99_ms": round(percentile(before, 99) * 1000, 3),
+        "fast_p99_ms": round(percentile(after, 99) * 1000, 3),
+        "speedup": round(p50_before / p50_after, 2) if p50_after else None,
+    }
+
+
+def run(page_size: int, variants: int, rounds: int) -> dict:
+    """
+    Serialize the same pages of transient ORM objects through the
+    response_model path and through app.core.serializers, and check both
+    produce the same JSON. Needs no database.
+    """
+    product_page = products(page_size, variants)
+    summary_page = order_summaries(page_size)
+    cursor = "eyJrIjoiMjAyNS0wMS0wMSJ9"
+    product_list = response_model_path(List[schemas.Product])
+    product_page_model = response_model_path(schemas.ProductPage)
+    summary_page_model = response_model_path(schemas.OrderSummaryPage)
+    cases = [
+        _compare("product_list", lambda: product_list(product_page),
+                 lambda: serializers.products_json(product_page), rounds),
+        _compare("product_page", lambda: product_page_model({"items": product_page, "next_cursor": cursor}),
+                 lambda: serializers.product_page_json(product_page, cursor), rounds),
+        _compare("order_summary_page", lambda: summary_page_model({"items": summary_page, "next_cursor": cursor}),
+                 lambda: serializers.order_summary_page_json(summary_page, cursor), rounds),
+    ]
+    return {"page_size": page_size, "nested_per_item": variants, "rounds": rounds, "cases": cases}
@@ -0,0 +1,114 @@
+# backend/benchmarks/snapshot.py
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from app.core.pagination import decode_cursor
+from app.schemas.schemas import ProductPage
+
+# cursor -> JSON body of that page
+PageFn = Callable[[Optional[str]], Awaitable[bytes]]
+
+
+async def _database_cursors(db: AsyncSession, pages: int, limit: int) -> List[Optional[str]]:
+    # Cursors of the first pages, so both paths serve the same pages
+    cursors: List[Optional[str]] = [None]
+    while len(cursors) < pages:
+        _, next_cursor = await crud.get_products_page(db, cursor=cursors[-1], limit=limit)
+        db.expunge_all()
+        if next_cursor is None:
+            break
+        cursors.append(next_cursor)
+    return cursors
+
+
+def _database_page(db: AsyncSession, limit: int) -> PageFn:
+    # The listing route's path: ORM load, Pydantic validation, JSON dump
+    async def page(cursor):
+        products, next_cursor = await crud.get_products_page(db, cursor=cursor, limit=limit)
+        body = ProductPage.model_validate(
+            {"items": products, "next_cursor": next_cursor}, from_attributes=True
+        ).model_dump_json().encode()
+        # Identity map growth would skew later pages
+        db.expunge_all()
+        return body
+    return page
+
+
+def _snapshot_page(snapshot: CatalogSnapshot, limit: int) -> PageFn:
+    async def page(cursor):
+        body = snapshot.page(decode_cursor(cursor) if cursor else None, limit)
+        if body is None:
+            raise RuntimeError("Page is past the snapshot; raise CATALOG_SNAPSHOT_MAX_PRODUCTS")
+        return body
+    return page
+
+
+async def _walk(page: PageFn, cursors: List[Optional[str]]) -> dict:
+    body_bytes = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    for cursor in cursors:
+        body_bytes += len(await page(cursor))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {
+        "pages": len(cursors),
+        "seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "cpu_ms_per_page": round(cpu * 1000 / len(cursors), 3),
+        "bytes": body_bytes,
+    }
+
+
+async def _page_peak(page: PageFn) -> int:
+    # Peak Python allocations while producing the first page
+    tracemalloc.start()
+    try:
+        await page(None)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def run(db: AsyncSession, pages: int, limit: int) -> dict:
+    """
+    Walk the first `pages` listing pages through the database path and the
+    snapshot, then measure the snapshot's resident size and the peak
+    allocations of one page on each path. CPU time is this process only;
+    database server time is excluded.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    snapshot = await catalog_snapshot.rebuild()
+    build_seconds = time.perf_counter() - start
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    database = _database_page(db, limit)
+    in_memory = _snapshot_page(snapshot, limit)
+    # Also warms the pool and prepared statements before timing
+    cursors = await _database_cursors(db, pages, limit)
+
+    database_result = await _walk(database, cursors)
+    snapshot_result = await _walk(in_memory, cursors)
+    database_result["page_peak_bytes"] = await _page_peak(database)
+    snapshot_result["page_peak_bytes"] = await _page_peak(in_memory)
+    return {
+        "limit": limit,
+        "snapshot": {
+            "products": len(snapshot),
+            "complete": snapshot.complete,
+            "build_seconds": round(build_seconds, 3),
+            "resident_bytes": resident,
+            "body_bytes": snapshot.body_bytes,
+        },
+        "database": database_result,
+        "snapshot_pages": snapshot_result,
+        "cpu_speedup": (
+            round(database_result["cpu_seconds"] / snapshot_result["cpu_seconds"], 1)
+            if snapshot_result["cpu_seconds"] else None
+        ),
+    }
@@ -0,0 +1,221 @@
+# backend/tests/test_cache.py
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy import update
+from starlette.requests import Request
+
+from app import crud
+from app.core import cache
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend, json_response, product_key
+from app.core.config import settings
+from app.models import models
+from app.schemas import schemas
+from app.utils.inventory_ledger import reconcile_inventory
+from tests.conftest import auth_headers
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCacheBackend(maxsize=100)
+    return RedisCacheBackend(fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    """The app's response cache replaced by a fakeredis-backed one."""
+    backend = RedisCacheBackend(fakeredis.FakeAsyncRedis())
+    monkeypatch.setattr(cache, "response_cache", backend)
+    monkeypatch.setattr(crud.crud, "response_cache", backend)
+    return backend
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+async def test_get_set_delete(backend):
+    assert await backend.get("a") is None
+    await backend.set("a", b"one", ttl=60)
+    await backend.set("b", b"two", ttl=60)
+    assert await backend.get("a") == b"one"
+    await backend.delete("a", "b", "missing")
+    assert await backend.get("a") is None
+    assert await backend.get("b") is None
+
+
+async def test_entries_expire_after_ttl(backend):
+    await backend.set("a", b"one", ttl=0.05)
+    assert await backend.get("a") == b"one"
+    await asyncio.sleep(0.1)
+    assert await backend.get("a") is None
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(maxsize=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    await backend.get("a")
+    await backend.set("c", b"3", ttl=60)
+    assert await backend.get("a") == b"1"
+    assert await backend.get("b") is None
+
+
+async def test_redis_errors_fail_open():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    backend = RedisCacheBackend(fakeredis.FakeAsyncRedis(server=server))
+    await backend.set("a", b"one", ttl=60)
+    assert await backend.get("a") is None
+    await backend.delete("a")
+
+
+async def test_get_or_build_caches_until_deleted(redis_cache):
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return b'{"n": 1}'
+
+    assert await cache.get_or_build("k", build) == b'{"n": 1}'
+    assert await cache.get_or_build("k", build) == b'{"n": 1}'
+    assert len(builds) == 1
+    await redis_cache.delete("k")
+    await cache.get_or_build("k", build)
+    assert len(builds) == 2
+
+
+async def test_get_or_build_does_not_cache_misses(redis_cache):
+    async def build():
+        return None
+
+    assert await cache.get_or_build("k", build) is None
+    assert await redis_cache.get("k") is None
+
+
+def test_json_response_sets_etag():
+    response = json_response(_request(), b'{"a":1}')
+    assert response.status_code == 200
+    assert response.body == b'{"a":1}'
+    assert response.headers["etag"].startswith('"')
+
+
+def test_json_response_answers_304_for_matching_etag():
+    etag = json_response(_request(), b'{"a":1}').headers["etag"]
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = json_response(_request(if_none_match), b'{"a":1}')
+        assert response.status_code == 304, if_none_match
+        assert response.headers["etag"] == etag
+        assert response.body == b""
+    assert json_response(_request('"other"'), b'{"a":1}').status_code == 200
+    assert json_response(_request(etag), b'{"a":2}').status_code == 200
+
+
+async def test_product_detail_is_cached_with_etag(client, make_product, redis_cache):
+    product = await make_product()
+    url = f"{settings.API_V1_STR}/products/{product.slug}"
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert await redis_cache.get(product_key(product.slug)) == response.content
+
+    revalidated = await client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+async def test_update_product_invalidates_cached_detail(client, db, make_product, make_user, redis_cache):
+    product = await make_product()
+    url = f"{settings.API_V1_STR}/products/{product.slug}"
+    etag = (await client.get(url)).headers["etag"]
+
+    admin = await make_user(is_staff=True)
+    response = await client.put(
+        f"{settings.API_V1_STR}/admin/products/{product.id}",
+        json={"title": product.title, "description": "Updated", "category_id": str(product.category_id)},
+        headers=auth_headers(admin),
+    )
+    assert response.status_code == 200
+    assert await redis_cache.get(product_key(product.slug)) is None
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["description"] == "Updated"
+
+
+async def test_checkout_invalidates_cached_detail(client, db, make_product, make_user, redis_cache):
+    product = await make_product(variants=1, stock=10)
+    url = f"{settings.API_V1_STR}/products/{product.slug}"
+    etag = (await client.get(url)).headers["etag"]
+
+    user = await make_user()
+    await crud.add_item_to_cart(db, user.id, schemas.CartItemCreate(variant_id=product.variants[0].id, quantity=3))
+    response = await client.post(f"{settings.API_V1_STR}/orders/checkout", headers=auth_headers(user))
+    assert response.status_code == 201
+    assert await redis_cache.get(product_key(product.slug)) is None
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["variants"][0]["stock"] == 7
+
+
+async def test_stock_adjustment_invalidates_cached_detail(client, make_product, make_user, redis_cache):
+    product = await make_product(variants=1, stock=10)
+    url = f"{settings.API_V1_STR}/products/{product.slug}"
+    etag = (await client.get(url)).headers["etag"]
+
+    admin = await make_user(is_staff=True)
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/inventory/adjustments",
+        json={"reason": "recount", "items": [{"variant_id": str(product.variants[0].id), "delta": 5}]},
+        headers=auth_headers(admin),
+    )
+    assert response.status_code == 200
+    assert await redis_cache.get(product_key(product.slug)) is None
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["variants"][0]["stock"] == 15
+
+
+async def test_ledger_rebuild_invalidates_cached_detail(client, db, make_product, redis_cache):
+    product = await make_product(variants=1, stock=10)
+    url = f"{settings.API_V1_STR}/products/{product.slug}"
+    # A stock snapshot that drifted from its ledger
+    await db.execute(
+        update(models.ProductVariant).filter(models.ProductVariant.id == product.variants[0].id).values(stock=3)
+    )
+    await db.commit()
+    assert (await client.get(url)).json()["variants"][0]["stock"] == 3
+
+    async for _ in reconcile_inventory(db, "rebuild"):
+        pass
+    assert await redis_cache.get(product_key(product.slug)) is None
+    assert (await client.get(url)).json()["variants"][0]["stock"] == 10
+
+
+async def test_update_product_invalidates_old_and_new_slug(db, make_product, redis_cache):
+    product = await make_product()
+    new_title = f"Renamed {product.slug}"
+    new_slug = crud.slugify(new_title)
+    await redis_cache.set(product_key(product.slug), b"stale", ttl=60)
+    await redis_cache.set(product_key(new_slug), b"stale", ttl=60)
+
+    await crud.update_product(db, product.id, schemas.ProductUpdate(
+        title=new_title, description=product.description, category_id=product.category_id,
+    ))
+    assert await redis_cache.get(product_key(product.slug)) is None
+    assert await redis_cache.get(product_key(new_slug)) is None
+
+
+async def test_create_product_invalidates_cached_slug(db, make_product, redis_cache):
+    category_id = (await make_product()).category_id
+    title = f"New {category_id.hex[:12]}"
+    # e.g. a cached 404 body or a deleted product's page under the same slug
+    await redis_cache.set(product_key(crud.slugify(title)), b"stale", ttl=60)
+
+    product = await crud.create_product(db, schemas.ProductCreate(
+        title=title, description="Fresh", category_id=category_id,
+    ))
+    assert await redis_cache.get(product_key(product.slug)) is None
@@ -0,0 +1,41 @@
+# backend/tests/test_catalog_snapshot.py
+"""
+Writes that change what a product looks like in the listing refresh its
+row in the catalog snapshot, so unfiltered GET /products/ pages (served from
+the snapshot) do not wait for the next periodic rebuild.
+"""
+from app import crud
+from app.core.catalog_snapshot import catalog_snapshot
+from app.core.config import settings
+from app.schemas import schemas
+from tests.conftest import auth_headers
+
+API = settings.API_V1_STR
+
+
+async def _listed(client, product_id) -> dict:
+    # The newest products, which the snapshot serves without SQL
+    response = await client.get(f"{API}/products/", params={"limit": 10})
+    assert response.status_code == 200
+    return next(item for item in response.json()["items"] if item["id"] == str(product_id))
+
+
+async def test_checkout_refreshes_listed_stock(client, db, make_product, make_user):
+    product = await make_product(variants=1, stock=10)
+    await catalog_snapshot.refresh(db, [product.id])
+    user = await make_user()
+    await crud.add_item_to_cart(db, user.id, schemas.CartItemCreate(variant_id=product.variants[0].id, quantity=3))
+
+    response = await client.post(f"{API}/orders/checkout", headers=auth_headers(user))
+    assert response.status_code == 201
+
+    assert (await _listed(client, product.id))["variants"][0]["stock"] == 7
+
+
+async def test_category_update_refreshes_listed_products(client, db, make_product):
+    product = await make_product()
+    await catalog_snapshot.refresh(db, [product.id])
+
+    await crud.update_category(db, product.category.id, schemas.CategoryUpdate(name="Renamed"))
+
+    assert (await _listed(client, product.id))["category"]["name"] == "Renamed"
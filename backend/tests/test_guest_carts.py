@@ -0,0 +1,67 @@
+# backend/tests/test_guest_carts.py
+import asyncio
+import uuid
+from decimal import Decimal
+
+import fakeredis
+import pytest
+
+from app import crud
+from app.core import guest_carts
+from app.core.config import settings
+from app.core.guest_carts import GuestCart, GuestCartStore, RedisGuestCartStore, new_session_id
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    """The app's guest cart store replaced by a fakeredis-backed one."""
+    store = RedisGuestCartStore(fakeredis.FakeAsyncRedis(), ttl=60)
+    monkeypatch.setattr(guest_carts, "guest_carts", store)
+    monkeypatch.setattr(crud.crud, "guest_carts", store)
+    return store
+
+
+def test_redis_is_the_default_backend_when_configured(monkeypatch):
+    monkeypatch.setattr(settings, "GUEST_CART_BACKEND", None)
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+    assert isinstance(guest_carts._create_store(), RedisGuestCartStore)
+    monkeypatch.setattr(settings, "GUEST_CART_BACKEND", "memory")
+    assert type(guest_carts._create_store()) is GuestCartStore
+
+
+async def test_concurrent_updates_are_not_lost(redis_store):
+    session_id, variant_id = new_session_id(), uuid.uuid4()
+
+    def add_one(cart: GuestCart) -> None:
+        line = cart.lines.get(variant_id)
+        cart.set_quantity(variant_id, (line.quantity if line else 0) + 1, Decimal("1.00"))
+
+    await asyncio.gather(*(redis_store.update(session_id, add_one) for _ in range(8)))
+    assert (await redis_store.get(session_id)).lines[variant_id].quantity == 8
+
+
+async def test_update_without_create_leaves_no_cart(redis_store):
+    session_id = new_session_id()
+    assert await redis_store.update(session_id, lambda cart: "changed", create=False) is None
+    assert await redis_store.get(session_id) is None
+    assert await redis_store.update(None, lambda cart: "changed", create=False) is None
+
+
+async def test_guest_cart_round_trip(client, make_product, redis_store):
+    product = await make_product(variants=2)
+    api = f"{settings.API_V1_STR}/cart"
+    first, second = product.variants
+
+    response = await client.post(f"{api}/items", json={"variant_id": str(first.id), "quantity": 2})
+    assert response.status_code == 200
+    cookies = {settings.GUEST_CART_COOKIE: response.cookies[settings.GUEST_CART_COOKIE]}
+    await client.post(f"{api}/items", json={"variant_id": str(first.id), "quantity": 1}, cookies=cookies)
+    await client.post(f"{api}/items", json={"variant_id": str(second.id), "quantity": 1}, cookies=cookies)
+    line_id = next(
+        item["id"] for item in (await client.get(f"{api}/", cookies=cookies)).json()["items"]
+        if item["variant_id"] == str(second.id)
+    )
+    assert (await client.delete(f"{api}/items/{line_id}", cookies=cookies)).status_code == 204
+
+    items = (await client.get(f"{api}/", cookies=cookies)).json()["items"]
+    assert [(item["variant_id"], item["quantity"]) for item in items] == [(str(first.id), 3)]
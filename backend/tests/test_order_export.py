@@ -0,0 +1,133 @@
+# backend/tests/test_order_export.py
+"""
+GET /admin/orders/export streams every selected order as NDJSON or CSV.
+
+The memory ceiling test exports a large order history and checks that the
+app process's resident memory does not grow with the number of orders. It
+takes minutes, so it runs only when TEST_EXPORT_ORDERS sets the number of
+orders (1000000 is the reference size), and is marked `slow`:
+
+    TEST_EXPORT_ORDERS=1000000 poetry run pytest tests/test_order_export.py
+
+It drives the app over raw ASGI rather than through httpx, whose ASGI
+transport collects the whole response body before returning it.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from tests.conftest import auth_headers
+
+EXPORT_URL = f"{settings.API_V1_STR}/admin/orders/export"
+# Orders exported by the default (correctness) test
+SMALL_ORDERS = 500
+# Growth of the process's resident set allowed while exporting
+RSS_CEILING_BYTES = 64 * 1024 * 1024
+STATUS = "export-test"
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture
+async def make_order_history(db, make_product, make_user):
+    """`count` orders of one item each, with their own status so the export can select them."""
+    async def make(count: int) -> None:
+        user = await make_user()
+        variant = (await make_product(variants=1)).variants[0]
+        await db.execute(text(
+            "INSERT INTO orders (id, user_id, status, total_amount, currency, created_at) "
+            "SELECT gen_random_uuid(), :user_id, :status, 10.00, 'USD', now() - n * interval '1 second' "
+            "FROM generate_series(1, :orders) AS n"
+        ), {"user_id": user.id, "status": STATUS, "orders": count})
+        await db.execute(text(
+            "INSERT INTO order_items (id, order_id, variant_id, quantity, unit_price, total_price) "
+            "SELECT gen_random_uuid(), id, :variant_id, 1, 10.00, 10.00 FROM orders WHERE status = :status"
+        ), {"variant_id": variant.id, "status": STATUS})
+        await db.commit()
+
+    yield make
+    await db.execute(text("DELETE FROM orders WHERE status = :status"), {"status": STATUS})
+    await db.commit()
+
+
+async def test_export_includes_every_order(client, make_order_history, make_user):
+    await make_order_history(SMALL_ORDERS)
+    headers = auth_headers(await make_user(is_staff=True))
+
+    response = await client.get(EXPORT_URL, params={"format": "ndjson", "status": STATUS}, headers=headers)
+    assert response.status_code == 200
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert len(orders) == SMALL_ORDERS
+    assert len({order["id"] for order in orders}) == SMALL_ORDERS
+    assert all(order["status"] == STATUS and len(order["items"]) == 1 for order in orders)
+
+    response = await client.get(EXPORT_URL, params={"format": "csv", "status": STATUS}, headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == SMALL_ORDERS
+    assert {row["status"] for row in rows} == {STATUS}
+
+
+async def _export(app, query: str, headers: dict) -> dict:
+    """Run one export request, discarding the body as it arrives and sampling RSS per chunk."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": EXPORT_URL, "raw_path": b"", "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80), "root_path": "",
+    }
+    stats = {"status": None, "bytes": 0, "lines": 0, "start_rss": _rss(), "peak_rss": 0, "tail": b""}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+            if body:
+                stats["tail"] = body
+            stats["peak_rss"] = max(stats["peak_rss"], _rss())
+
+    await app(scope, receive, send)
+    return stats
+
+
+@pytest.mark.slow
+@pytest.mark.skipif("TEST_EXPORT_ORDERS" not in os.environ, reason="set TEST_EXPORT_ORDERS to run")
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads RSS from /proc")
+async def test_export_memory_is_flat(client, make_order_history, make_user):
+    from app.main import app
+
+    orders = int(os.environ["TEST_EXPORT_ORDERS"])
+    await make_order_history(orders)
+    admin = await make_user(is_staff=True)
+    for format in ("ndjson", "csv"):
+        stats = await _export(app, f"format={format}&status={STATUS}", auth_headers(admin))
+
+        assert stats["status"] == 200
+        # CSV adds a header line
+        assert stats["lines"] == orders + (format == "csv")
+        if format == "ndjson":
+            assert json.loads(stats["tail"].splitlines()[-1])["status"] == STATUS
+        growth = stats["peak_rss"] - stats["start_rss"]
+        assert growth < RSS_CEILING_BYTES, f"{format}: RSS grew {growth / 2**20:.1f} MiB exporting {orders} orders"
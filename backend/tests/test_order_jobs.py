@@ -0,0 +1,52 @@
+# backend/tests/test_order_jobs.py
+"""
+The order post-processing jobs may run more than once for an order (a retry
+after a crash between the work and the job's deletion, or two workers
+claiming it): each still records one payment, one shipment and queues the
+shipment job once.
+"""
+import asyncio
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app import crud
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import models
+from app.schemas import schemas
+from tests.conftest import auth_headers
+
+
+async def _run_concurrently(handler, payload: dict, runs: int = 2) -> None:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await handler(db, payload)
+            await db.commit()
+
+    await asyncio.gather(*(run() for _ in range(runs)))
+
+
+async def _count(db, query) -> int:
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def test_payment_and_shipment_jobs_are_idempotent(client, db, make_product, make_user):
+    product = await make_product(variants=1)
+    user = await make_user()
+    await crud.add_item_to_cart(db, user.id, schemas.CartItemCreate(variant_id=product.variants[0].id, quantity=1))
+    response = await client.post(f"{settings.API_V1_STR}/orders/checkout", headers=auth_headers(user))
+    assert response.status_code == 201
+    payload = {"order_id": response.json()["id"]}
+
+    await _run_concurrently(crud.create_order_payment, payload)
+    await _run_concurrently(crud.create_order_payment, payload)
+    assert await _count(db, select(models.Payment).filter(models.Payment.order_id == payload["order_id"])) == 1
+    shipment_jobs = select(models.Job).filter(
+        models.Job.kind == "order.shipment", models.Job.payload["order_id"].astext == payload["order_id"]
+    )
+    assert await _count(db, shipment_jobs) == 1
+
+    await _run_concurrently(crud.create_order_shipment, payload)
+    await _run_concurrently(crud.create_order_shipment, payload)
+    assert await _count(db, select(models.Shipment).filter(models.Shipment.order_id == payload["order_id"])) == 1
@@ -0,0 +1,39 @@
+# backend/tests/test_pagination.py
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    _raw_cursor(["2024-05-01T12:30:00+00:00"]),
+    _raw_cursor(["yesterday", str(uuid.uuid4())]),
+    _raw_cursor(["2024-05-01T12:30:00+00:00", "not-a-uuid"]),
+    # Without an offset the timestamp cannot be compared with created_at
+    _raw_cursor(["2024-05-01T12:30:00", str(uuid.uuid4())]),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+async def test_listing_answers_400_for_naive_cursor(client):
+    # Unfiltered pages come from the catalog snapshot
+    cursor = _raw_cursor(["2024-05-01T12:30:00", str(uuid.uuid4())])
+    response = await client.get(f"{settings.API_V1_STR}/products/", params={"cursor": cursor})
+    assert response.status_code == 400
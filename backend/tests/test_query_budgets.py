@@ -0,0 +1,118 @@
+# backend/tests/test_query_budgets.py
+"""
+The budgeted routes under QUERY_BUDGET_STRICT: any request that issues more
+SQL than its query_budget() raises QueryBudgetExceeded, which the in-process
+client re-raises. Pages hold several products and orders, so an N+1 (one
+query per row or per relationship) overruns the budget.
+"""
+import pytest
+from sqlalchemy import text
+
+from app import crud
+from app.core.config import settings
+from app.core.instrumentation import QueryBudgetExceeded, RequestStats, _current_request
+from app.schemas import schemas
+from tests.conftest import auth_headers
+
+API = settings.API_V1_STR
+
+
+@pytest.fixture(autouse=True)
+def strict_budgets(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+
+
+@pytest.fixture
+async def catalog(make_product):
+    """Five products with three variants each in one category."""
+    first = await make_product(variants=3)
+    return [first] + [await make_product(variants=3, category=first.category) for _ in range(4)]
+
+
+@pytest.fixture
+async def customer(client, db, catalog, make_user):
+    """A user with three orders of several lines each."""
+    user = await make_user()
+    orders = []
+    for _ in range(3):
+        for product in catalog:
+            await crud.add_item_to_cart(db, user.id, schemas.CartItemCreate(variant_id=product.variants[0].id, quantity=1))
+        response = await client.post(f"{API}/orders/checkout", headers=auth_headers(user))
+        assert response.status_code == 201
+        orders.append(response.json()["id"])
+    return user, orders
+
+
+async def test_strict_mode_raises_on_overrun(client, db):
+    # `client` builds the app, which instruments the engine
+    stats = RequestStats("GET", "/test")
+    stats.budget = 1
+    token = _current_request.set(stats)
+    try:
+        await db.execute(text("SELECT 1"))
+        with pytest.raises(QueryBudgetExceeded):
+            await db.execute(text("SELECT 2"))
+    finally:
+        _current_request.reset(token)
+        await db.rollback()
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"limit": 2},
+    {"skip": 0, "limit": 10},
+    {"sort": "rating"},
+    {"attr": "brand:acme", "vattr": "size:M", "min_price": 1, "facets": True},
+])
+async def test_product_listing(client, catalog, params):
+    # Scoped to a category: unfiltered pages come from the catalog snapshot, without SQL
+    response = await client.get(f"{API}/products/", params={**params, "category": catalog[0].category.slug})
+    assert response.status_code == 200
+
+
+async def test_product_listing_next_page(client, catalog):
+    category = catalog[0].category.slug
+    first = (await client.get(f"{API}/products/", params={"category": category, "limit": 2})).json()
+    response = await client.get(
+        f"{API}/products/", params={"category": category, "limit": 2, "cursor": first["next_cursor"]}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+
+
+async def test_product_detail(client, catalog):
+    for product in catalog[:2]:
+        response = await client.get(f"{API}/products/{product.slug}")
+        assert response.status_code == 200
+    assert (await client.get(f"{API}/products/no-such-product")).status_code == 404
+
+
+async def test_product_batch(client, catalog):
+    response = await client.post(f"{API}/products/batch", json={
+        "ids": [str(product.id) for product in catalog[:3]],
+        "slugs": [product.slug for product in catalog[2:]] + ["no-such-product"],
+        "variant_ids": [str(variant.id) for product in catalog for variant in product.variants],
+    })
+    assert response.status_code == 200
+    assert response.json()["missing"]["slugs"] == ["no-such-product"]
+
+
+async def test_order_history(client, customer):
+    user, orders = customer
+    response = await client.get(f"{API}/orders/", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert [order["order_id"] for order in response.json()["items"]] == orders[::-1]
+
+
+async def test_order_detail(client, customer):
+    user, orders = customer
+    response = await client.get(f"{API}/orders/{orders[0]}", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+
+
+async def test_admin_orders(client, customer, make_user):
+    admin = await make_user(is_staff=True)
+    for params in ({}, {"limit": 2}, {"status": "pending"}):
+        response = await client.get(f"{API}/admin/orders", params=params, headers=auth_headers(admin))
+        assert response.status_code == 200
@@ -0,0 +1,123 @@
+# backend/tests/test_read_replicas.py
+"""
+Replica routing against two database URLs: the primary at TEST_DATABASE_URL
+and a "replica" database next to it with the same schema but none of the
+primary's rows, i.e. a replica that has not replayed anything yet. A read
+that finds a row written on the primary was routed to the primary.
+"""
+import asyncio
+import os
+from uuid import UUID
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app import crud, main
+from app.core.cache import MemoryCacheBackend
+from app.core.config import settings
+from app.db import routing
+from app.db.base import Base
+from app.db.routing import PIN_COOKIE, ReplicaRouter
+from app.schemas import schemas
+from tests.conftest import auth_headers
+
+
+@pytest.fixture(scope="module")
+async def replica_url(database):
+    url = make_url(os.environ["DATABASE_URL"])
+    replica = url.set(database=f"{url.database}_replica")
+    try:
+        async with database.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": replica.database}
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{replica.database}"'))
+    except SQLAlchemyError as e:
+        pytest.skip(f"Cannot create the replica database: {e}")
+    engine = create_async_engine(replica)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    return replica.render_as_string(hide_password=False)
+
+
+@pytest.fixture
+async def replica_client(replica_url, monkeypatch):
+    """A client for an app built with one read replica, so ReadYourWritesMiddleware is installed."""
+    router = ReplicaRouter([replica_url], selection="round_robin", max_lag=10.0, interval=60.0)
+    monkeypatch.setattr(routing, "replica_router", router)
+    monkeypatch.setattr(main, "replica_router", router)
+    monkeypatch.setattr(routing, "primary_pins", MemoryCacheBackend())
+    await router.start()
+    try:
+        transport = httpx.ASGITransport(app=main.create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+    finally:
+        await router.stop()
+
+
+@pytest.fixture
+def checkout(db, make_product, make_user):
+    """A user who just placed an order through `client`, and the order's URL."""
+    async def place(client: httpx.AsyncClient):
+        user = await make_user()
+        product = await make_product()
+        await crud.add_item_to_cart(db, user.id, schemas.CartItemCreate(variant_id=product.variants[0].id, quantity=1))
+        response = await client.post(f"{settings.API_V1_STR}/orders/checkout", headers=auth_headers(user))
+        assert response.status_code == 201
+        return user, f"{settings.API_V1_STR}/orders/{response.json()['id']}"
+
+    return place
+
+
+def _request(headers) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+async def test_reads_use_the_replica(replica_client, checkout, client, db):
+    # Placed through app.main.app, built without replicas: nothing pins the user
+    user, url = await checkout(client)
+    client.cookies.clear()
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 404
+    assert await crud.get_order(db, UUID(url.rsplit("/", 1)[1]), user.id) is not None
+
+
+async def test_cookie_pins_reads_to_the_primary(replica_client, checkout, monkeypatch):
+    user, url = await checkout(replica_client)
+    assert PIN_COOKIE in replica_client.cookies
+    # Only the cookie: forget the pin by user
+    monkeypatch.setattr(routing, "primary_pins", MemoryCacheBackend())
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 200
+
+    replica_client.cookies.clear()
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 404
+
+
+async def test_user_pin_holds_without_the_cookie(replica_client, checkout, make_user):
+    user, url = await checkout(replica_client)
+    replica_client.cookies.clear()
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 200
+
+    assert await routing.pinned_to_primary(_request(auth_headers(user))) is True
+    # Pinned by user, not for everyone
+    assert await routing.pinned_to_primary(_request(auth_headers(await make_user()))) is False
+    assert await routing.pinned_to_primary(_request({})) is False
+
+
+async def test_user_pin_expires(replica_client, checkout, monkeypatch):
+    monkeypatch.setattr(settings, "DB_READ_YOUR_WRITES_SECONDS", 0.2)
+    user, url = await checkout(replica_client)
+    replica_client.cookies.clear()
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 200
+    await asyncio.sleep(0.3)
+    assert (await replica_client.get(url, headers=auth_headers(user))).status_code == 404
@@ -0,0 +1,58 @@
+# backend/tests/test_search.py
+import uuid
+from types import SimpleNamespace
+
+from app.core.search import InvertedIndexSearchBackend
+
+
+def _product(title: str, is_active: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(), title=title, description=None, attributes=None, category_id=None, is_active=is_active
+    )
+
+
+class _StreamingDB:
+    """Streams `rows` to rebuild(), running `during` after the first row."""
+
+    def __init__(self, rows, during):
+        self.rows = rows
+        self.during = during
+
+    async def stream(self, query):
+        async def rows():
+            for i, row in enumerate(self.rows):
+                yield row
+                if i == 0:
+                    await self.during()
+        return rows()
+
+
+def _row(product) -> tuple:
+    return (product.id, product.title, product.description, product.attributes, product.category_id)
+
+
+async def _ids(index, q) -> set:
+    return {product_id for product_id, _ in (await index.search(None, q)).hits}
+
+
+async def test_rebuild_keeps_products_indexed_while_it_runs():
+    index = InvertedIndexSearchBackend()
+    stored, renamed, hidden = _product("plain mug"), _product("blue kettle"), _product("red teapot")
+    # Rows as the rebuild read them, before the writes below
+    rows = [_row(stored), _row(renamed), _row(hidden)]
+    created = _product("green kettle")
+
+    async def writes():
+        await index.index_product(created)
+        renamed.title = "yellow kettle"
+        await index.index_product(renamed)
+        hidden.is_active = False
+        await index.index_product(hidden)
+
+    await index.rebuild(_StreamingDB(rows, writes))
+
+    assert await _ids(index, "kettle") == {created.id, renamed.id}
+    assert await _ids(index, "yellow") == {renamed.id}
+    assert await _ids(index, "blue") == set()
+    assert await _ids(index, "teapot") == set()
+    assert await _ids(index, "mug") == {stored.id}